@@ -0,0 +1,340 @@
+"""
+api.py — Service HTTP local (ASGI) : évaluation JSON, rapport Markdown, rapport PDF.
+
+    POST /assessment   {"answers": {...}, "dims": [...]}            → JSON
+    POST /report.md    {"answers": {...}, "dims": [...], "org": ""}  → text/markdown
+    POST /report.pdf   {"answers": {...}, "dims": [...], "org": ""}  → application/pdf
+    GET  /health                                                     → état, cache, PDF en cours
+
+Le scoring et le Markdown (moins d'une milliseconde) s'exécutent dans la
+boucle d'événements ; les PDF partent dans un pool de processus gardé
+chaud (polices, kaleido), la boucle ne bloque jamais. Les réponses sont
+mises en cache (LRU borné en entrées et en octets) sous la forme
+canonique de la requête, et les requêtes PDF identiques en cours
+partagent le même travail. Au-delà de ``max_pdf_jobs`` PDF en cours et
+``max_pdf_queue`` en attente, le service répond 503.
+
+Lancer avec :  python main.py serve   (ou  uvicorn api:app)
+"""
+
+import asyncio
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from assessor import run_assessment
+from bulk_reports import _build_pdf, _init_worker
+from config import ALL_DIMENSION_KEYS
+from report_generator import generate_report
+
+DEFAULT_PDF_WORKERS = 2
+DEFAULT_MAX_PDF_JOBS = 4
+DEFAULT_MAX_PDF_QUEUE = 64
+DEFAULT_CACHE_ENTRIES = 2048
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+DEFAULT_MAX_BODY_BYTES = 256 * 1024
+DEFAULT_ORG = "Bellepros"
+
+Response = Tuple[int, bytes, bytes]  # (status, content type, body)
+
+JSON_TYPE = b"application/json"
+MARKDOWN_TYPE = b"text/markdown; charset=utf-8"
+PDF_TYPE = b"application/pdf"
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_body(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _error(status: int, message: str) -> Response:
+    return status, JSON_TYPE, _json_body({"error": message})
+
+
+class ResponseCache:
+    """LRU borné en nombre d'entrées et en octets ; sûr entre threads."""
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, str], Response]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Response]:
+        with self._lock:
+            response = self._entries.get(key)
+            if response is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def put(self, key: Tuple[str, str], response: Response) -> None:
+        size = len(response[2])
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[2])
+            self._entries[key] = response
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted[2])
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+
+def _canonical(*parts: Any) -> str:
+    return json.dumps(parts, sort_keys=True, ensure_ascii=False)
+
+
+def _parse_request(body: bytes) -> Tuple[Dict[str, Any], Optional[List[str]], str]:
+    """(réponses, dimensions, organisation) d'un corps JSON."""
+    try:
+        payload = json.loads(body or b"{}")
+    except ValueError as exc:
+        raise HTTPError(400, f"JSON invalide : {exc}")
+    if not isinstance(payload, dict) or not isinstance(payload.get("answers"), dict):
+        raise HTTPError(400, "Le corps doit être un objet JSON avec une clé « answers » (objet).")
+    dims = payload.get("dims")
+    if dims is not None:
+        if not isinstance(dims, list) or not all(isinstance(d, str) for d in dims):
+            raise HTTPError(400, "« dims » doit être une liste de clés de dimension.")
+        unknown = [d for d in dims if d not in ALL_DIMENSION_KEYS]
+        if unknown:
+            raise HTTPError(422, f"Dimensions inconnues : {', '.join(unknown)}")
+    org = payload.get("org", DEFAULT_ORG)
+    if not isinstance(org, str):
+        raise HTTPError(400, "« org » doit être une chaîne.")
+    return payload["answers"], dims or None, org
+
+
+def _assess(answers: Dict[str, Any], dims: Optional[List[str]]) -> Dict[str, Any]:
+    try:
+        return run_assessment(answers, dims)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPError(422, f"Réponses invalides : {type(exc).__name__}: {exc}")
+
+
+class ScoringAPI:
+    """Application ASGI ; le pool PDF démarre au premier rapport PDF."""
+
+    def __init__(
+        self,
+        pdf_workers: int = DEFAULT_PDF_WORKERS,
+        max_pdf_jobs: int = DEFAULT_MAX_PDF_JOBS,
+        max_pdf_queue: int = DEFAULT_MAX_PDF_QUEUE,
+        cache_entries: int = DEFAULT_CACHE_ENTRIES,
+        cache_bytes: int = DEFAULT_CACHE_BYTES,
+        max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+    ):
+        self.pdf_workers = max(1, pdf_workers)
+        self.max_pdf_jobs = max(1, max_pdf_jobs)
+        self.max_pdf_queue = max(0, max_pdf_queue)
+        self.max_body_bytes = max_body_bytes
+        self.cache = ResponseCache(cache_entries, cache_bytes)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pdf_slots: Optional[asyncio.Semaphore] = None
+        self._pdf_waiting = 0
+        self._pdf_running = 0
+        # Identical PDF requests in progress share one job
+        self._pdf_inflight: Dict[Tuple[str, str], "asyncio.Task[Response]"] = {}
+        self._routes: Dict[Tuple[str, str], Callable[[bytes], Awaitable[Response]]] = {
+            ("POST", "/assessment"): self._assessment,
+            ("POST", "/report.md"): self._markdown,
+            ("POST", "/report.pdf"): self._pdf,
+            ("GET", "/health"): self._health,
+        }
+
+    # -- ASGI ---------------------------------------------------------------
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        handler = self._routes.get((scope["method"], scope["path"]))
+        try:
+            if handler is None:
+                known = any(path == scope["path"] for _, path in self._routes)
+                raise HTTPError(405 if known else 404, "Méthode non permise" if known else "Route inconnue")
+            response = await handler(await self._read_body(receive))
+        except HTTPError as exc:
+            response = _error(exc.status, str(exc))
+        status, content_type, body = response
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _read_body(self, receive: Callable) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                raise HTTPError(400, "Client déconnecté")
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_bytes:
+                raise HTTPError(413, f"Corps de requête trop volumineux (max {self.max_body_bytes} octets)")
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.close()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    # -- handlers -----------------------------------------------------------
+
+    async def _health(self, body: bytes) -> Response:
+        return 200, JSON_TYPE, _json_body({
+            "status": "ok",
+            "cache": self.cache.stats(),
+            "pdf": {"running": self._pdf_running, "waiting": self._pdf_waiting, "workers": self.pdf_workers},
+        })
+
+    async def _assessment(self, body: bytes) -> Response:
+        answers, dims, _ = _parse_request(body)
+        # The org doesn't change the scores: leave it out of the key
+        key = ("assessment", _canonical(answers, dims))
+        response = self.cache.get(key)
+        if response is None:
+            response = 200, JSON_TYPE, _json_body(_assess(answers, dims))
+            self.cache.put(key, response)
+        return response
+
+    async def _markdown(self, body: bytes) -> Response:
+        answers, dims, org = _parse_request(body)
+        key = ("report.md", _canonical(answers, dims, org))
+        response = self.cache.get(key)
+        if response is None:
+            report = generate_report(_assess(answers, dims), org_name=org)
+            response = 200, MARKDOWN_TYPE, report.encode("utf-8")
+            self.cache.put(key, response)
+        return response
+
+    async def _pdf(self, body: bytes) -> Response:
+        answers, dims, org = _parse_request(body)
+        key = ("report.pdf", _canonical(answers, dims, org))
+        response = self.cache.get(key)
+        if response is not None:
+            return response
+        task = self._pdf_inflight.get(key)
+        if task is None:
+            if self._pdf_running >= self.max_pdf_jobs and self._pdf_waiting >= self.max_pdf_queue:
+                raise HTTPError(503, "Trop de rapports PDF en cours, réessayez plus tard")
+            # Validate in the event loop: bad answers fail fast, not in a worker
+            _assess(answers, dims)
+            # A task of its own: a requester that disconnects, the first one
+            # included, cancels only its wait, never the shared render
+            task = self._pdf_inflight[key] = asyncio.get_running_loop().create_task(
+                self._shared_pdf(key, answers, dims, org)
+            )
+            task.add_done_callback(lambda done: self._pdf_done(key, done))
+        return await asyncio.shield(task)
+
+    async def _shared_pdf(self, key: Tuple[str, str], answers: Dict[str, Any], dims: Optional[List[str]], org: str) -> Response:
+        response = await self._run_pdf(answers, dims, org)
+        if response[0] == 200:
+            self.cache.put(key, response)
+        return response
+
+    def _pdf_done(self, key: Tuple[str, str], task: "asyncio.Task[Response]") -> None:
+        if self._pdf_inflight.get(key) is task:
+            del self._pdf_inflight[key]
+        if not task.cancelled():
+            # Retrieved here so a render whose requesters all left doesn't log a warning
+            task.exception()
+
+    async def _run_pdf(self, answers: Dict[str, Any], dims: Optional[List[str]], org: str) -> Response:
+        if self._pdf_slots is None:
+            self._pdf_slots = asyncio.Semaphore(self.max_pdf_jobs)
+        self._pdf_waiting += 1
+        try:
+            await self._pdf_slots.acquire()
+        finally:
+            self._pdf_waiting -= 1
+        self._pdf_running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            for attempt in (0, 1):
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.pdf_workers, initializer=_init_worker)
+                pool = self._pool
+                try:
+                    _, _, data, error = await loop.run_in_executor(pool, _build_pdf, ("api", org, answers, ""), dims)
+                    break
+                except BrokenProcessPool:
+                    # A worker died (e.g. Chromium crash): new pool, retry once
+                    if self._pool is pool:
+                        self._pool = None
+                        pool.shutdown(wait=False, cancel_futures=True)
+                    if attempt:
+                        return _error(503, "Processus de rendu PDF interrompu")
+        finally:
+            self._pdf_running -= 1
+            self._pdf_slots.release()
+        if data is None:
+            return _error(500, f"Échec de la génération du PDF : {error}")
+        return 200, PDF_TYPE, data
+
+
+def create_app(**kwargs: Any) -> ScoringAPI:
+    """Application configurée par arguments, sinon par ``BELLEPROS_API_*``."""
+    env = {
+        "pdf_workers": "BELLEPROS_API_PDF_WORKERS",
+        "max_pdf_jobs": "BELLEPROS_API_MAX_PDF_JOBS",
+        "max_pdf_queue": "BELLEPROS_API_MAX_PDF_QUEUE",
+        "cache_entries": "BELLEPROS_API_CACHE_ENTRIES",
+        "cache_bytes": "BELLEPROS_API_CACHE_BYTES",
+        "max_body_bytes": "BELLEPROS_API_MAX_BODY_BYTES",
+    }
+    for name, var in env.items():
+        if kwargs.get(name) is None and os.environ.get(var):
+            kwargs[name] = int(os.environ[var])
+    return ScoringAPI(**{name: value for name, value in kwargs.items() if value is not None})
+
+
+def serve(host: str = "127.0.0.1", port: int = 8000, **kwargs: Any) -> None:
+    """Démarre le service avec uvicorn (un seul processus de boucle, pool PDF à part)."""
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError("uvicorn est requis pour le service HTTP (pip install uvicorn).")
+    uvicorn.run(create_app(**kwargs), host=host, port=port, log_level="warning")
+
+
+# ``uvicorn api:app`` ; configured from the environment
+app = create_app()
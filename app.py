@@ -4,19 +4,34 @@ app.py — Console de Croissance Bellepros — Interface Web Streamlit.
 Lancer avec :  streamlit run app.py
 """
 
+from __future__ import annotations
+
 import streamlit as st
-import plotly.graph_objects as go
-import plotly.express as px
-import pandas as pd
+import hashlib
+import json
 import re
+import sqlite3
+import time
 import unicodedata
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 
 from questionnaire import QUESTIONS, default_answers
-from assessor import run_assessment
+from assessor import run_assessment, run_monte_carlo
 from report_generator import generate_report
-from pdf_generator import generate_pdf
-from config import DIMENSIONS, ALL_DIMENSION_KEYS, QUEBEC_REGIONS, COMPETITORS
+from sensitivity import WhatIf, answer_label
+from expansion_optimizer import DEFAULT_ANNUAL_BUDGET, DEFAULT_MAX_OPENINGS, DEFAULT_YEARS, optimize_expansion
+from job_queue import get_job_queue
+from storage import get_store
+from market_data import get_market_data
+from config import DIMENSIONS, ALL_DIMENSION_KEYS, GROWTH_TIERS, QUEBEC_REGIONS, COMPETITORS
+from lazy_imports import lazy_module
+import tracing
+
+# Charts and tables only appear on the results page: the questionnaire
+# page starts without plotly and pandas
+go = lazy_module("plotly.graph_objects")
+pd = lazy_module("pandas")
+portfolio = lazy_module("portfolio")
 
 # ---------------------------------------------------------------------------
 # Config page
@@ -54,6 +69,47 @@ def _safe_download_basename(name: str) -> str:
     return slug or "organisation"
 
 
+def _canonical_answers(answers: Dict[str, Any]) -> str:
+    return json.dumps(answers, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _pdf_cache_key(answers: Dict[str, Any], dims: List[str], org_name: str, show_bands: bool = False) -> str:
+    payload = json.dumps([_canonical_answers(answers), dims, org_name, show_bands], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Cache — keyed on canonical answers JSON + selected dimensions, bounded in
+# size and age so session churn doesn't grow memory without limit
+# ---------------------------------------------------------------------------
+CACHE_TTL_SECONDS = 3600
+CACHE_MAX_ENTRIES = 256
+
+ResultsKey = Tuple[str, Tuple[str, ...]]
+PDF_POLL_SECONDS = 1.0
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_assessment(answers_key: str, dims: Tuple[str, ...]) -> Dict[str, Any]:
+    return run_assessment(json.loads(answers_key), list(dims) if dims else None)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_monte_carlo(answers_key: str, dims: Tuple[str, ...]) -> Dict[str, Any]:
+    # Fixed seed: the bands don't flicker between reruns
+    return run_monte_carlo(json.loads(answers_key), list(dims) if dims else None, seed=0)
+
+
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_report(answers_key: str, dims: Tuple[str, ...], org_name: str) -> str:
+    return generate_report(_cached_assessment(answers_key, dims), org_name=org_name)
+
+
+# Figures are shared read-only across reruns (st.plotly_chart doesn't mutate
+# them), so cache_resource avoids a pickle round-trip on every rerun
+_cache_figure = st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+
+
 def main():
     st.markdown("""
     <div class="main-header">
@@ -65,6 +121,7 @@ def main():
     # Sidebar
     st.sidebar.image("https://img.icons8.com/emoji/96/french-fries-emoji.png", width=80)
     st.sidebar.header("⚙️ Configuration")
+    view = st.sidebar.radio("Vue", ["🏪 Évaluation", "🌐 Portefeuille du réseau"], horizontal=True)
     org_name = st.sidebar.text_input("Nom de l'organisation", value="Bellepros")
 
     st.sidebar.subheader("Dimensions à évaluer")
@@ -73,6 +130,11 @@ def main():
         if st.sidebar.checkbox(info["short"], value=True, key=f"dim_{key}"):
             selected_dims.append(key)
 
+    show_bands = st.sidebar.checkbox(
+        "📉 Bandes d'incertitude (Monte Carlo)", value=True,
+        help="Chaque réponse peut glisser vers une réponse voisine ; les graphiques montrent l'intervalle P5–P95.",
+    )
+
     use_defaults = st.sidebar.button("🚀 Démo Rapide (Réponses par défaut)")
 
     # State management
@@ -85,10 +147,37 @@ def main():
     if "answers" not in st.session_state:
         st.session_state["answers"] = {}
 
-    if st.session_state["step"] == "questionnaire":
+    if view == "🌐 Portefeuille du réseau":
+        render_portfolio(selected_dims)
+    elif st.session_state["step"] == "questionnaire":
         render_questionnaire()
     elif st.session_state["step"] == "results":
-        render_results(org_name, selected_dims)
+        render_results(org_name, selected_dims, show_bands)
+
+    # Rendered last so the spans of this run are included
+    if tracing.is_enabled():
+        render_timing_panel()
+
+
+def render_timing_panel():
+    """Temps par étape (BELLEPROS_TRACE=1) ; les résultats en cache n'ont pas de span."""
+    with st.sidebar.expander("⏱️ Temps d'exécution"):
+        rows = tracing.summarize(tracing.recent_spans())
+        if not rows:
+            st.caption("Aucune étape mesurée pour l'instant.")
+            return
+        df = pd.DataFrame([{
+            "Étape": row["name"],
+            "N": row["count"],
+            "p50 (ms)": round(row["p50_s"] * 1000, 1),
+            "p95 (ms)": round(row["p95_s"] * 1000, 1),
+            "CPU (ms)": round(row["cpu_mean_s"] * 1000, 1),
+            "Mémoire max (Mo)": round(row["mem_peak_max_bytes"] / 1e6, 1) if row["mem_peak_max_bytes"] is not None else None,
+        } for row in rows])
+        st.dataframe(df, hide_index=True, use_container_width=True)
+        if st.button("Effacer les mesures", key="clear_spans"):
+            tracing.clear()
+            st.rerun()
 
 
 def render_questionnaire():
@@ -162,7 +251,7 @@ def render_questionnaire():
             st.rerun()
 
 
-def render_results(org_name: str, selected_dims: List[str]):
+def render_results(org_name: str, selected_dims: List[str], show_bands: bool = True):
     answers = st.session_state.get("answers", {})
     if not answers:
         st.warning("Aucune réponse trouvée. Veuillez remplir le questionnaire.")
@@ -171,7 +260,9 @@ def render_results(org_name: str, selected_dims: List[str]):
             st.rerun()
         return
 
-    assessment = run_assessment(answers, selected_dims if selected_dims else None)
+    results_key: ResultsKey = (_canonical_answers(answers), tuple(selected_dims))
+    assessment = _cached_assessment(*results_key)
+    uncertainty = _cached_monte_carlo(*results_key) if show_bands else None
     tier = assessment["tier"]
     overall = assessment["overall_score"]
     stars_str = "★" * assessment["stars"] + "☆" * (5 - assessment["stars"])
@@ -188,17 +279,21 @@ def render_results(org_name: str, selected_dims: List[str]):
     col4.metric("Dimensions", len(assessment["dimensions_assessed"]))
 
     st.info(f"**{tier['label']}** — {tier['desc']}")
+    if uncertainty:
+        render_uncertainty_summary(uncertainty, tier)
     st.divider()
 
     # =====================================================================
     # TABS
     # =====================================================================
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
+    tab1, tab2, tab3, tab4, tab5, tab6, tab7 = st.tabs([
         "📊 Vue d'ensemble",
         "🗺️ Carte d'expansion",
         "🏆 Analyse concurrentielle",
         "📋 Feuille de route",
         "📑 Détails par dimension",
+        "🎯 Et si ?",
+        "📈 Historique",
     ])
 
     # --- TAB 1: VUE D'ENSEMBLE ---
@@ -207,11 +302,11 @@ def render_results(org_name: str, selected_dims: List[str]):
 
         with col_radar:
             st.subheader("Radar de Croissance")
-            render_radar(assessment)
+            render_radar(results_key, show_bands)
 
         with col_bars:
             st.subheader("Scores par Dimension")
-            render_dimension_bars(assessment)
+            render_dimension_bars(results_key, show_bands)
 
         st.divider()
         st.subheader("Matrice des Lacunes")
@@ -220,12 +315,12 @@ def render_results(org_name: str, selected_dims: List[str]):
     # --- TAB 2: CARTE D'EXPANSION ---
     with tab2:
         st.subheader("🗺️ Marchés Prioritaires au Québec")
-        render_region_analysis(assessment)
+        render_region_analysis(assessment, results_key)
 
     # --- TAB 3: ANALYSE CONCURRENTIELLE ---
     with tab3:
         st.subheader("🏆 Positionnement vs Concurrents QSR")
-        render_competitive(assessment)
+        render_competitive(assessment, results_key)
 
     # --- TAB 4: FEUILLE DE ROUTE ---
     with tab4:
@@ -248,24 +343,25 @@ def render_results(org_name: str, selected_dims: List[str]):
                     for r in res["recommendations"]:
                         st.markdown(f"- 💡 {r}")
 
+    # --- TAB 6: ET SI ? ---
+    with tab6:
+        st.subheader("🎯 Analyse de Sensibilité")
+        render_what_if(answers, selected_dims)
+
+    # --- TAB 7: HISTORIQUE ---
+    with tab7:
+        st.subheader("📈 Évolution et Comparaison aux Pairs")
+        render_history(org_name, answers, assessment)
+
     st.divider()
 
     # Downloads
-    report_md = generate_report(assessment, org_name=org_name)
+    report_md = _cached_report(*results_key, org_name)
 
     safe_org = _safe_download_basename(org_name)
     col_pdf, col_md, col_new = st.columns(3)
     with col_pdf:
-        with st.spinner("Génération du PDF..."):
-            pdf_bytes = bytes(generate_pdf(assessment, org_name=org_name))
-        st.download_button(
-            "📥 Télécharger le Rapport PDF",
-            data=pdf_bytes,
-            file_name=f"bellepros_croissance_{safe_org}.pdf",
-            mime="application/pdf",
-            use_container_width=True,
-            type="primary",
-        )
+        render_pdf_download(answers, selected_dims, org_name, show_bands, safe_org)
     with col_md:
         st.download_button(
             "📄 Télécharger en Markdown",
@@ -278,14 +374,84 @@ def render_results(org_name: str, selected_dims: List[str]):
         if st.button("🔄 Nouvelle Évaluation", use_container_width=True):
             st.session_state["step"] = "questionnaire"
             st.session_state["answers"] = {}
+            st.session_state.pop("pdf_jobs", None)
+            st.rerun()
+
+
+def render_pdf_download(answers: Dict[str, Any], selected_dims: List[str], org_name: str, show_bands: bool, safe_org: str):
+    """Le PDF est construit par la file de tâches ; la page reste réactive pendant le rendu."""
+    queue = get_job_queue()
+    pdf_key = _pdf_cache_key(answers, selected_dims, org_name, show_bands)
+    # Only the current report's job is tracked for the session
+    job_id = st.session_state.get("pdf_jobs", {}).get(pdf_key)
+    job = queue.status(job_id) if job_id else None
+
+    if job is None:
+        if st.button("🖨️ Préparer le Rapport PDF", use_container_width=True, type="primary"):
+            job_id = queue.submit({"answers": answers, "dims": selected_dims, "org": org_name, "bands": show_bands})
+            st.session_state["pdf_jobs"] = {pdf_key: job_id}
+            st.rerun()
+    elif job["status"] == "done":
+        pdf_bytes = queue.result(job_id)
+        if pdf_bytes is None:  # evicted between the two reads
+            st.session_state.pop("pdf_jobs", None)
+            st.rerun()
+        st.download_button(
+            "📥 Télécharger le Rapport PDF",
+            data=pdf_bytes,
+            file_name=f"bellepros_croissance_{safe_org}.pdf",
+            mime="application/pdf",
+            use_container_width=True,
+            type="primary",
+        )
+    elif job["status"] == "failed":
+        st.error(f"Échec de la génération du PDF : {job['error']}")
+        if st.button("🔁 Réessayer", use_container_width=True):
+            st.session_state["pdf_jobs"] = {pdf_key: queue.submit(
+                {"answers": answers, "dims": selected_dims, "org": org_name, "bands": show_bands}
+            )}
             st.rerun()
+    else:
+        _pdf_job_progress(job_id)
+
+
+@st.fragment(run_every=PDF_POLL_SECONDS)
+def _pdf_job_progress(job_id: str):
+    # Only this fragment reruns while the job is pending; the whole page
+    # reruns once, when the download button can replace it
+    queue = get_job_queue()
+    job = queue.status(job_id)
+    if job is None or job["status"] not in ("queued", "running"):
+        st.rerun(scope="app")
+    if job["status"] == "running":
+        st.info(f"⏳ Génération du PDF en cours… ({time.time() - job['started_at']:.0f} s)")
+    else:
+        ahead = queue.position(job_id)
+        st.info("⏳ PDF en file d'attente" + (f" ({ahead} avant vous)" if ahead else "") + "…")
 
 
 # =========================================================================
 # VISUALIZATION COMPONENTS
 # =========================================================================
 
-def render_radar(assessment: Dict[str, Any]):
+def render_uncertainty_summary(uncertainty: Dict[str, Any], tier: Dict[str, Any]):
+    band = uncertainty["overall"]
+    probs = uncertainty["tier_probabilities"]
+    tier_key = next((k for k, t in GROWTH_TIERS.items() if t == tier), None)
+    st.caption(
+        f"📉 Intervalle à 90 % du score global : **{band['p5']:.0f} – {band['p95']:.0f}** "
+        f"(médiane {band['p50']:.0f}, {uncertainty['n_samples']:,} simulations) · "
+        f"probabilité du niveau actuel : **{probs.get(tier_key, 0.0):.0%}**"
+    )
+    others = [
+        f"{GROWTH_TIERS[key]['label']} {p:.0%}"
+        for key, p in probs.items() if key != tier_key and p >= 0.005
+    ]
+    if others:
+        st.caption("Autres niveaux possibles : " + " · ".join(others))
+
+
+def _build_radar_figure(assessment: Dict[str, Any], uncertainty: Optional[Dict[str, Any]] = None) -> go.Figure:
     names, scores = [], []
     for dim_key in assessment["dimensions_assessed"]:
         res = assessment["dimension_results"][dim_key]
@@ -301,16 +467,35 @@ def render_radar(assessment: Dict[str, Any]):
         line_color="#c41e3a",
         name="Score",
     ))
+    if uncertainty:
+        for pct, label in (("p5", "P5"), ("p95", "P95")):
+            band = [uncertainty["dimensions"][d][pct] for d in assessment["dimensions_assessed"]]
+            fig.add_trace(go.Scatterpolar(
+                r=band + [band[0]],
+                theta=names + [names[0]],
+                line=dict(color="#1e3a5f", dash="dot", width=1),
+                name=label,
+            ))
     fig.update_layout(
         polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
         showlegend=False,
         height=400,
         margin=dict(l=40, r=40, t=20, b=20),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@_cache_figure
+def _radar_figure(results_key: ResultsKey, show_bands: bool = False) -> go.Figure:
+    uncertainty = _cached_monte_carlo(*results_key) if show_bands else None
+    return _build_radar_figure(_cached_assessment(*results_key), uncertainty)
+
 
+def render_radar(results_key: ResultsKey, show_bands: bool = False):
+    st.plotly_chart(_radar_figure(results_key, show_bands), use_container_width=True)
 
-def render_dimension_bars(assessment: Dict[str, Any]):
+
+def _build_bars_figure(assessment: Dict[str, Any], uncertainty: Optional[Dict[str, Any]] = None) -> go.Figure:
     data = []
     for dim_key in assessment["dimensions_assessed"]:
         res = assessment["dimension_results"][dim_key]
@@ -318,6 +503,15 @@ def render_dimension_bars(assessment: Dict[str, Any]):
         data.append({"Dimension": res["short"], "Score": res["score"], "color": color})
 
     df = pd.DataFrame(data)
+    error_x = None
+    if uncertainty:
+        bands = [uncertainty["dimensions"][d] for d in assessment["dimensions_assessed"]]
+        error_x = dict(
+            type="data", symmetric=False,
+            array=[max(b["p95"] - s, 0) for b, s in zip(bands, df["Score"])],
+            arrayminus=[max(s - b["p5"], 0) for b, s in zip(bands, df["Score"])],
+            color="#1e3a5f", thickness=1.5,
+        )
     fig = go.Figure(go.Bar(
         x=df["Score"],
         y=df["Dimension"],
@@ -325,6 +519,7 @@ def render_dimension_bars(assessment: Dict[str, Any]):
         marker_color=df["color"],
         text=[f"{s:.0f}%" for s in df["Score"]],
         textposition="outside",
+        error_x=error_x,
     ))
     fig.update_layout(
         xaxis=dict(range=[0, 105], title="Score (%)"),
@@ -332,7 +527,17 @@ def render_dimension_bars(assessment: Dict[str, Any]):
         height=400,
         margin=dict(l=10, r=40, t=10, b=10),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@_cache_figure
+def _bars_figure(results_key: ResultsKey, show_bands: bool = False) -> go.Figure:
+    uncertainty = _cached_monte_carlo(*results_key) if show_bands else None
+    return _build_bars_figure(_cached_assessment(*results_key), uncertainty)
+
+
+def render_dimension_bars(results_key: ResultsKey, show_bands: bool = False):
+    st.plotly_chart(_bars_figure(results_key, show_bands), use_container_width=True)
 
 
 def render_gap_matrix(assessment: Dict[str, Any]):
@@ -349,11 +554,9 @@ def render_gap_matrix(assessment: Dict[str, Any]):
             col.error(f"**{res['short']}**\n\n{pct:.0f}%")
 
 
-def render_region_analysis(assessment: Dict[str, Any]):
-    regions = assessment["regions"]
-
-    # Summary table
-    df = pd.DataFrame([
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _region_table(results_key: ResultsKey) -> pd.DataFrame:
+    return pd.DataFrame([
         {
             "Région": r["name"],
             "Population": f"{r['population']:,}",
@@ -363,13 +566,12 @@ def render_region_analysis(assessment: Dict[str, Any]):
             "Priorité": r["priority"],
             "Ciblée": "✅" if r["targeted"] else "",
         }
-        for r in regions
+        for r in _cached_assessment(*results_key)["regions"]
     ])
-    st.dataframe(df, use_container_width=True, hide_index=True)
 
-    st.divider()
 
-    # Bar chart of region scores
+def _build_regions_figure(assessment: Dict[str, Any]) -> go.Figure:
+    regions = assessment["regions"]
     fig = go.Figure(go.Bar(
         x=[r["name"] for r in regions],
         y=[r["score"] for r in regions],
@@ -383,7 +585,24 @@ def render_region_analysis(assessment: Dict[str, Any]):
         xaxis=dict(title=""),
         height=400,
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@_cache_figure
+def _regions_figure(results_key: ResultsKey) -> go.Figure:
+    return _build_regions_figure(_cached_assessment(*results_key))
+
+
+def render_region_analysis(assessment: Dict[str, Any], results_key: ResultsKey):
+    regions = assessment["regions"]
+
+    # Summary table
+    st.dataframe(_region_table(results_key), use_container_width=True, hide_index=True)
+
+    st.divider()
+
+    # Bar chart of region scores
+    st.plotly_chart(_regions_figure(results_key), use_container_width=True)
 
     st.divider()
 
@@ -399,11 +618,72 @@ def render_region_analysis(assessment: Dict[str, Any]):
         - {reg['notes']}
         """)
 
+    st.divider()
+    st.subheader("📅 Plan d'Ouverture Optimisé")
+    render_expansion_plan(results_key)
 
-def render_competitive(assessment: Dict[str, Any]):
-    competitors = assessment["competitors"]
 
-    # Bubble chart
+@st.cache_data(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _cached_expansion_plan(answers_key: str, budget: float, years: int, max_per_year: int) -> Dict[str, Any]:
+    return optimize_expansion(json.loads(answers_key), budget, years, max_per_year)
+
+
+def _build_expansion_figure(plan: Dict[str, Any]) -> go.Figure:
+    counts: Dict[str, Dict[int, int]] = {}
+    for year in plan["schedule"]:
+        for o in year["openings"]:
+            counts.setdefault(o["name"], {}).setdefault(year["year"], 0)
+            counts[o["name"]][year["year"]] += 1
+    years = [y["year"] for y in plan["schedule"]]
+    fig = go.Figure([
+        go.Bar(x=[f"An {y}" for y in years], y=[by_year.get(y, 0) for y in years], name=name)
+        for name, by_year in counts.items()
+    ])
+    fig.update_layout(
+        barmode="stack",
+        yaxis=dict(title="Ouvertures", dtick=1),
+        height=350,
+        margin=dict(l=10, r=10, t=10, b=10),
+    )
+    return fig
+
+
+def render_expansion_plan(results_key: ResultsKey):
+    col_budget, col_years, col_max = st.columns(3)
+    budget = col_budget.number_input(
+        "Budget d'investissement annuel ($)", min_value=0, value=DEFAULT_ANNUAL_BUDGET, step=250_000,
+    )
+    years = col_years.slider("Horizon (années)", 1, 10, DEFAULT_YEARS)
+    max_per_year = col_max.slider("Ouvertures max. par année", 1, 10, DEFAULT_MAX_OPENINGS)
+
+    plan = _cached_expansion_plan(results_key[0], float(budget), years, max_per_year)
+    if not plan["total_units"]:
+        st.warning("Budget insuffisant pour ouvrir une unité.")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Unités ouvertes", plan["total_units"])
+    col2.metric("Investissement total", f"{plan['total_capex'] / 1e6:.1f} M$")
+    col3.metric(
+        "Score attendu", f"{plan['expected_score']:,.0f}",
+        help=f"Borne supérieure {plan['upper_bound']:,.0f} — écart à l'optimum ≤ {plan['gap']:.1%}",
+    )
+    st.plotly_chart(_build_expansion_figure(plan), use_container_width=True)
+    st.dataframe(pd.DataFrame([
+        {
+            "Année": year["year"],
+            "Région": o["name"],
+            "Unité n°": o["unit"],
+            "Investissement": f"{o['capex']:,.0f}$",
+            "Valeur annuelle": f"{o['value']:.1f}",
+        }
+        for year in plan["schedule"]
+        for o in year["openings"]
+    ]), use_container_width=True, hide_index=True)
+
+
+def _build_competitive_figure(assessment: Dict[str, Any]) -> go.Figure:
+    competitors = assessment["competitors"]
     fig = go.Figure()
     for comp in competitors:
         color = "#dc3545" if comp["niveau_menace"] == "Élevé" else "#ffc107" if "Moyen" in comp["niveau_menace"] else "#28a745"
@@ -431,7 +711,19 @@ def render_competitive(assessment: Dict[str, Any]):
         showlegend=False,
         height=450,
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
+
+
+@_cache_figure
+def _competitive_figure(results_key: ResultsKey) -> go.Figure:
+    return _build_competitive_figure(_cached_assessment(*results_key))
+
+
+def render_competitive(assessment: Dict[str, Any], results_key: ResultsKey):
+    competitors = assessment["competitors"]
+
+    # Bubble chart
+    st.plotly_chart(_competitive_figure(results_key), use_container_width=True)
 
     st.divider()
 
@@ -473,5 +765,338 @@ def render_roadmap(assessment: Dict[str, Any]):
         st.success("Aucune lacune majeure identifiée — maintenir les pratiques actuelles!")
 
 
+def _change_label(qid: str, current: Any, value: Any) -> str:
+    if isinstance(value, list):
+        added = [v for v in value if v not in (current or [])]
+        return "+ " + answer_label(qid, added)
+    return answer_label(qid, value)
+
+
+def render_what_if(answers: Dict[str, Any], selected_dims: List[str]):
+    # Incremental re-scoring: cheap enough to rebuild on every rerun
+    what_if = WhatIf(answers, selected_dims or None)
+    question_map = {q.qid: q for q in QUESTIONS}
+    ranking = what_if.rank_improvements()
+
+    st.markdown("**Changements d'une seule réponse classés par gain sur le score global**")
+    if not ranking:
+        st.success("Aucune réponse ne peut améliorer le score global — profil déjà optimal sur ces dimensions.")
+    else:
+        df = pd.DataFrame([{
+            "Question": question_map[row["qid"]].text if row["qid"] in question_map else row["qid"],
+            "Réponse actuelle": answer_label(row["qid"], row["current"]),
+            "Changement": _change_label(row["qid"], row["current"], row["best_value"]),
+            "Score global": round(row["overall_score"], 1),
+            "Gain (pts)": round(row["gain"], 2),
+            "Niveau": row["tier"]["label"],
+        } for row in ranking])
+        st.dataframe(df, hide_index=True, use_container_width=True)
+
+    st.divider()
+    st.markdown("**Simulateur**")
+    qids = [qid for qid in question_map if qid in what_if.questions]
+    col_q, col_v = st.columns(2)
+    with col_q:
+        qid = st.selectbox(
+            "Question",
+            qids,
+            format_func=lambda q: question_map[q].text,
+            key="whatif_qid",
+        )
+    sweep = what_if.sweep(qid)
+    current = what_if.answers.get(qid)
+    with col_v:
+        value_index = st.selectbox(
+            "Nouvelle réponse",
+            range(len(sweep)),
+            index=next((i for i, row in enumerate(sweep) if row["value"] == current), 0),
+            format_func=lambda i: _change_label(qid, current, sweep[i]["value"]),
+            key=f"whatif_value_{qid}",
+        ) if sweep else None
+
+    if value_index is not None:
+        scenario = what_if.what_if({qid: sweep[value_index]["value"]})
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Score global", f"{scenario['overall_score']:.1f}/100", f"{scenario['delta']:+.2f}")
+        col2.metric("Niveau", scenario["tier"]["label"])
+        col3.metric("Réponse actuelle", answer_label(qid, current))
+        for dim_key, score in scenario["dimension_scores"].items():
+            base = what_if.dimension_scores[what_if.dims.index(dim_key)]
+            st.caption(f"{DIMENSIONS[dim_key]['name']} : {base:.0f}% → {score:.0f}%")
+
+
+def _build_history_figure(history: List[Dict[str, Any]], dims: List[str]) -> go.Figure:
+    dates = [pd.Timestamp(round(row["created_at"]), unit="s") for row in history]
+    fig = go.Figure(go.Scatter(
+        x=dates, y=[row["overall_score"] for row in history],
+        name="Score global", mode="lines+markers", line=dict(color="#c41e3a", width=3),
+    ))
+    for dim_key in dims:
+        fig.add_trace(go.Scatter(
+            x=dates, y=[row[f"{dim_key}_score"] for row in history],
+            name=DIMENSIONS[dim_key]["short"], mode="lines", visible="legendonly",
+        ))
+    fig.update_layout(
+        yaxis=dict(title="Score", range=[0, 100]),
+        height=380,
+        margin=dict(l=10, r=10, t=10, b=10),
+    )
+    return fig
+
+
+def render_history(org_name: str, answers: Dict[str, Any], assessment: Dict[str, Any]):
+    try:
+        store = get_store()
+        if st.button("💾 Enregistrer cette évaluation", key="store_assessment"):
+            store.add(org_name, assessment, answers)
+            st.success(f"Évaluation enregistrée pour {org_name}.")
+        history = store.history(org_name)
+        total = store.org_count()
+    except sqlite3.Error as exc:
+        st.warning(f"Historique indisponible ({exc}).")
+        return
+
+    overall = assessment["overall_score"]
+    percentile = store.percentile(overall)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Évaluations enregistrées", len(history))
+    if len(history) >= 2:
+        col2.metric(
+            "Dernier score enregistré", f"{history[-1]['overall_score']:.0f}/100",
+            f"{history[-1]['overall_score'] - history[-2]['overall_score']:+.1f}",
+        )
+    elif history:
+        col2.metric("Dernier score enregistré", f"{history[-1]['overall_score']:.0f}/100")
+    if percentile is not None:
+        col3.metric("Rang centile (score actuel)", f"{percentile:.0f}", help=f"Parmi {total:,} organisations (dernière évaluation de chacune)")
+
+    if history:
+        st.plotly_chart(_build_history_figure(history, assessment["dimensions_assessed"]), use_container_width=True)
+    else:
+        st.info("Aucune évaluation enregistrée pour cette organisation.")
+
+    if total:
+        st.markdown("**Rang centile par dimension (dernière évaluation de chaque organisation)**")
+        st.dataframe(pd.DataFrame([
+            {
+                "Dimension": res["name"],
+                "Score": round(res["score"], 1),
+                "Rang centile": round(p, 0) if p is not None else None,
+                "Médiane des pairs": quartiles[1] if quartiles else None,
+            }
+            for dim_key, res in assessment["dimension_results"].items()
+            for p, quartiles in ((store.percentile(res["score"], dim_key), store.quantiles(metric=dim_key)),)
+        ]), hide_index=True, use_container_width=True)
+
+
+# ---------------------------------------------------------------------------
+# Portefeuille du réseau — frames cached per source, aggregates per filter;
+# every chart gets a bounded number of points (bins, tiers, regions, sample)
+# ---------------------------------------------------------------------------
+PORTFOLIO_MAX_FRAMES = 4
+PORTFOLIO_SOURCES = ["💾 Historique enregistré", "📂 Résultats de lot (main.py batch)"]
+
+
+# Read-only once loaded, like the figures: no pickle copy of 100k rows per rerun
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=PORTFOLIO_MAX_FRAMES, show_spinner="Chargement des évaluations…")
+def _store_frame(path: str, count: int, latest_only: bool) -> pd.DataFrame:
+    # ``count`` is part of the key: newly stored assessments reload the frame
+    return portfolio.store_frame(get_store(), latest_only)
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=PORTFOLIO_MAX_FRAMES, show_spinner="Lecture du fichier…")
+def _results_frame(digest: str, name: str, _data: bytes) -> pd.DataFrame:
+    return portfolio.results_frame(_data, name)
+
+
+@st.cache_resource(ttl=CACHE_TTL_SECONDS, max_entries=CACHE_MAX_ENTRIES, show_spinner=False)
+def _portfolio_view(source_key: str, tiers: Tuple[str, ...], dims: Tuple[str, ...], _frame: pd.DataFrame) -> Dict[str, Any]:
+    frame = _frame[_frame["tier"].isin(tiers)] if len(tiers) < len(GROWTH_TIERS) else _frame
+    return portfolio.portfolio_view(frame, dims)
+
+
+def _region_label(key: str) -> str:
+    territory = get_market_data().get(key)
+    return territory["name"] if territory else key
+
+
+def _build_tier_figure(tiers: pd.Series) -> go.Figure:
+    fig = go.Figure(go.Bar(
+        x=[GROWTH_TIERS[k]["label"] for k in tiers.index],
+        y=tiers.to_numpy(),
+        marker_color="#1e3a5f",
+        text=[f"{n:,}" for n in tiers.to_numpy()],
+        textposition="outside",
+    ))
+    fig.update_layout(yaxis=dict(title="Évaluations"), height=360, margin=dict(l=10, r=10, t=30, b=10))
+    return fig
+
+
+def _build_score_histogram_figure(counts: pd.Series, mean: Optional[float]) -> go.Figure:
+    fig = go.Figure(go.Bar(
+        x=counts.index + portfolio.SCORE_BIN_WIDTH / 2, y=counts.to_numpy(), width=portfolio.SCORE_BIN_WIDTH,
+        marker_color="#c41e3a",
+    ))
+    if mean is not None:
+        fig.add_vline(x=mean, line_dash="dash", annotation_text=f"Moyenne {mean:.0f}")
+    fig.update_layout(
+        xaxis=dict(title="Score global", range=[0, 100]), yaxis=dict(title="Évaluations"),
+        bargap=0.05, height=360, margin=dict(l=10, r=10, t=30, b=10),
+    )
+    return fig
+
+
+def _build_dimension_histograms_figure(histograms: pd.DataFrame, dims: List[str]) -> go.Figure:
+    from plotly.subplots import make_subplots
+
+    cols = 3
+    rows = max(1, -(-len(dims) // cols))
+    fig = make_subplots(rows=rows, cols=cols, subplot_titles=[DIMENSIONS[d]["short"] for d in dims],
+                        shared_xaxes=True, vertical_spacing=0.25 / rows)
+    width = portfolio.SCORE_BIN_WIDTH
+    x = histograms.index + width / 2
+    for i, dim_key in enumerate(dims):
+        fig.add_trace(
+            go.Bar(x=x, y=histograms[dim_key].to_numpy(), width=width,
+                   marker_color="#1e3a5f", name=DIMENSIONS[dim_key]["short"]),
+            row=i // cols + 1, col=i % cols + 1,
+        )
+    fig.update_xaxes(range=[0, 100])
+    fig.update_layout(showlegend=False, bargap=0.05, height=220 * rows, margin=dict(l=10, r=10, t=40, b=10))
+    return fig
+
+
+def _build_heatmap_figure(matrix: pd.DataFrame, y_labels: List[str], title: str, colorscale: str) -> go.Figure:
+    fig = go.Figure(go.Heatmap(
+        z=matrix.to_numpy(), x=[_region_label(k) for k in matrix.columns], y=y_labels,
+        colorscale=colorscale, zmin=0, zmax=100, colorbar=dict(title="%"),
+        hovertemplate="%{y} — %{x}<br>%{z:.1f}<extra></extra>",
+    ))
+    fig.update_layout(
+        title=title, yaxis=dict(autorange="reversed"),
+        height=120 + 32 * len(y_labels), margin=dict(l=10, r=10, t=40, b=10),
+    )
+    return fig
+
+
+def _build_sample_scatter_figure(sample: pd.DataFrame, dim_key: str, total: int) -> go.Figure:
+    fig = go.Figure(go.Scattergl(
+        x=sample[f"{dim_key}_score"], y=sample["overall_score"], mode="markers",
+        marker=dict(size=5, opacity=0.5, color=sample["tier"].cat.codes, colorscale="RdBu"),
+        text=sample["org"], hovertemplate="%{text}<br>%{x:.0f} / %{y:.0f}<extra></extra>",
+    ))
+    fig.update_layout(
+        xaxis=dict(title=DIMENSIONS[dim_key]["name"], range=[0, 100]),
+        yaxis=dict(title="Score global", range=[0, 100]),
+        title=f"{len(sample):,} évaluations sur {total:,}" if len(sample) < total else None,
+        height=420, margin=dict(l=10, r=10, t=40, b=10),
+    )
+    return fig
+
+
+@_cache_figure
+def _portfolio_figures(view_key: Tuple[Any, ...], region_label: str, _view: Dict[str, Any]) -> Dict[str, go.Figure]:
+    dims = _view["dimensions"]
+    heatmaps = _view["regions"]
+    figures = {
+        "tiers": _build_tier_figure(_view["tiers"]),
+        "overall": _build_score_histogram_figure(_view["histograms"]["overall"], _view["mean"]),
+    }
+    if dims:
+        figures["dimensions"] = _build_dimension_histograms_figure(_view["histograms"], dims)
+    if len(heatmaps["counts"]):
+        figures["tier_regions"] = _build_heatmap_figure(
+            heatmaps["tier_share"], [GROWTH_TIERS[k]["label"] for k in heatmaps["tier_share"].index],
+            f"{region_label} — part de chaque niveau (%)", "Reds",
+        )
+        if dims:
+            figures["dimension_regions"] = _build_heatmap_figure(
+                heatmaps["dimension_means"], [DIMENSIONS[d]["short"] for d in dims],
+                f"Score moyen par dimension selon les {region_label.lower()}", "RdYlGn",
+            )
+    return figures
+
+
+def render_portfolio(selected_dims: List[str]):
+    st.header("🌐 Portefeuille du Réseau")
+    source = st.radio("Source", PORTFOLIO_SOURCES, horizontal=True, label_visibility="collapsed")
+
+    if source == PORTFOLIO_SOURCES[0]:
+        latest_only = st.checkbox("Dernière évaluation par organisation", value=True)
+        try:
+            store = get_store()
+            count = store.count()
+            frame = _store_frame(store.path, count, latest_only)
+        except sqlite3.Error as exc:
+            st.warning(f"Historique indisponible ({exc}).")
+            return
+        source_key = f"store:{store.path}:{count}:{latest_only}"
+        region_label = "Régions ciblées"
+    else:
+        upload = st.file_uploader("Fichier de résultats (CSV ou JSONL)", type=["csv", "jsonl", "ndjson"])
+        if upload is None:
+            st.info("Chargez la sortie de `python main.py batch reponses.csv -o resultats.csv`.")
+            return
+        data = upload.getvalue()
+        digest = hashlib.sha256(data).hexdigest()
+        try:
+            frame = _results_frame(digest, upload.name, data)
+        except ValueError as exc:
+            st.error(f"Fichier illisible : {exc}")
+            return
+        source_key = f"results:{digest}"
+        region_label = "Régions recommandées"
+
+    if frame.empty:
+        st.info("Aucune évaluation à afficher. Enregistrez des évaluations ou lancez un lot avec `--store`.")
+        return
+
+    tiers = st.multiselect(
+        "Niveaux", list(GROWTH_TIERS), default=list(GROWTH_TIERS),
+        format_func=lambda key: GROWTH_TIERS[key]["label"],
+    )
+    view_key = (source_key, tuple(tiers), tuple(selected_dims))
+    view = _portfolio_view(*view_key, frame)
+    if not view["count"]:
+        st.info("Aucune évaluation pour ces niveaux.")
+        return
+    figures = _portfolio_figures(view_key, region_label, view)
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Évaluations", f"{view['count']:,}")
+    col2.metric("Organisations", f"{view['orgs']:,}")
+    col3.metric("Score moyen", f"{view['mean']:.1f}/100")
+    col4.metric("Score médian", f"{view['median']:.1f}/100")
+    st.divider()
+
+    col_tiers, col_overall = st.columns(2)
+    with col_tiers:
+        st.subheader("Répartition par Niveau")
+        st.plotly_chart(figures["tiers"], use_container_width=True)
+    with col_overall:
+        st.subheader("Distribution du Score Global")
+        st.plotly_chart(figures["overall"], use_container_width=True)
+
+    if "dimensions" in figures:
+        st.subheader("Distribution par Dimension")
+        st.plotly_chart(figures["dimensions"], use_container_width=True)
+
+    st.subheader(f"🗺️ {region_label}")
+    if "tier_regions" in figures:
+        st.plotly_chart(figures["tier_regions"], use_container_width=True)
+        if "dimension_regions" in figures:
+            st.plotly_chart(figures["dimension_regions"], use_container_width=True)
+    else:
+        st.info("Aucune région dans ces évaluations.")
+
+    if view["dimensions"]:
+        st.subheader("Score Global selon une Dimension")
+        dim_key = st.selectbox(
+            "Dimension", view["dimensions"], format_func=lambda key: DIMENSIONS[key]["name"],
+            key="portfolio_scatter_dim",
+        )
+        st.plotly_chart(_build_sample_scatter_figure(view["sample"], dim_key, view["count"]), use_container_width=True)
+
+
 if __name__ == "__main__":
     main()
@@ -5,8 +5,17 @@ Prend les réponses au questionnaire et produit un score par dimension,
 un score global, des lacunes, des recommandations et une feuille de route.
 """
 
-from typing import Any, Dict, List, Optional
-from config import DIMENSIONS, ALL_DIMENSION_KEYS, QUEBEC_REGIONS, COMPETITORS, get_growth_tier
+from itertools import repeat
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from competitor_rules import DEFAULT_RULES, CompetitorRules
+from config import DIMENSIONS, ALL_DIMENSION_KEYS, GROWTH_TIERS, get_growth_tier
+from market_data import MarketData, get_market_data
+from scoring_schema import SCHEMA, Schema, validate_scoring_tables
+from tracing import traced
 
 
 # ---------------------------------------------------------------------------
@@ -255,41 +264,147 @@ GAPS_DB = {
 }
 
 
-def _score_single(qid: str, answer: Any) -> float:
-    if qid == "maturite_globale":
-        return float(answer) / 5.0 * 100.0 if isinstance(answer, (int, float)) else 50.0
-    mapping = SCORE_MAPS.get(qid, {})
-    return float(mapping.get(str(answer), 50))
-
+# ---------------------------------------------------------------------------
+# Compiled scoring model — the tables above, resolved once into a plan
+# ---------------------------------------------------------------------------
 
-def _score_multi(qid: str, answer: Any) -> float:
-    config = MULTI_SCORE_CONFIG.get(qid)
-    if not config or not isinstance(answer, list):
-        return 50.0
-    total_options = {
-        "regions_cibles": 10,
-        "differenciateur": 7,
-        "techno_niveau": 6,
-        "conformite_qc": 5,
-    }
-    max_opts = total_options.get(qid, 5)
-    ratio = min(len(answer) / max_opts, 1.0)
-    return ratio * config["max"]
-
-
-def _compute_dimension_score(dim_key: str, answers: Dict[str, Any]) -> float:
-    questions = DIMENSION_QUESTIONS.get(dim_key, [])
-    if not questions:
-        return 50.0
-    scores = []
-    for qid in questions:
-        if qid not in answers:
-            continue
-        if qid in MULTI_SCORE_CONFIG:
-            scores.append(_score_multi(qid, answers[qid]))
-        else:
-            scores.append(_score_single(qid, answers[qid]))
-    return sum(scores) / len(scores) if scores else 50.0
+# Questions scored on a numeric scale (answer / max * 100) instead of a map
+SCALE_QUESTIONS = {"maturite_globale": 5}
+
+_SINGLE, _MULTI, _SCALE = 0, 1, 2
+_MISSING = object()
+
+
+class ScoringModel:
+    """Plan de scoring compilé : questions indexées, table plate et poids.
+
+    Les tables sources ne sont lues qu'à la construction, après validation
+    contre le schéma du questionnaire (``SchemaError`` sinon) ; le nombre
+    d'options des choix multiples vient du schéma. Pour un test A/B,
+    construire un modèle avec d'autres tables et le passer à
+    ``run_assessment(..., model=...)`` ou ``run_assessment_batch``.
+    """
+
+    def __init__(
+        self,
+        score_maps: Optional[Dict[str, Dict[str, float]]] = None,
+        multi_config: Optional[Dict[str, Dict[str, Any]]] = None,
+        dimension_questions: Optional[Dict[str, List[str]]] = None,
+        scale_questions: Optional[Dict[str, int]] = None,
+        weights: Optional[Dict[str, float]] = None,
+        schema: Optional[Schema] = None,
+    ):
+        score_maps = SCORE_MAPS if score_maps is None else score_maps
+        multi_config = MULTI_SCORE_CONFIG if multi_config is None else multi_config
+        dimension_questions = DIMENSION_QUESTIONS if dimension_questions is None else dimension_questions
+        scale_questions = SCALE_QUESTIONS if scale_questions is None else scale_questions
+        if weights is None:
+            weights = {key: dim["weight"] for key, dim in DIMENSIONS.items()}
+        self.schema = schema or SCHEMA
+        validate_scoring_tables(self.schema, score_maps, multi_config, dimension_questions, scale_questions)
+        multi_total_options = self.schema.option_counts("multi")
+
+        question_ids: List[str] = []
+        for qids in dimension_questions.values():
+            question_ids.extend(q for q in qids if q not in question_ids)
+        self.question_ids = tuple(question_ids)
+        self.question_index = MappingProxyType({qid: i for i, qid in enumerate(question_ids)})
+
+        # Flat table: every single-choice answer score, each question's block
+        # followed by its default (50) slot; codes map answer -> table index
+        flat: List[float] = []
+        kinds, payloads, codes, default_codes = [], [], [], []
+        for qid in question_ids:
+            if qid in multi_config:
+                kind = _MULTI
+                payload = (multi_total_options[qid], multi_config[qid]["max"])
+            elif qid in scale_questions:
+                kind, payload = _SCALE, scale_questions[qid]
+            else:
+                kind = _SINGLE
+                payload = {value: float(score) for value, score in score_maps.get(qid, {}).items()}
+            offset = len(flat)
+            if kind == _SINGLE:
+                flat.extend(payload.values())
+            codes.append({value: offset + i for i, value in enumerate(payload)} if kind == _SINGLE else {})
+            default_codes.append(len(flat))
+            flat.append(50.0)
+            kinds.append(kind)
+            payloads.append(payload)
+        self.table = np.array(flat, dtype=np.float64)
+        self.table.setflags(write=False)
+        self.kinds = tuple(kinds)
+        self.payloads = tuple(payloads)
+        self.codes = tuple(codes)
+        self.default_codes = tuple(default_codes)
+
+        self.dimension_plans = MappingProxyType({
+            dim_key: tuple(self.question_index[q] for q in qids)
+            for dim_key, qids in dimension_questions.items()
+        })
+        # (qid, kind, payload) triples: no index indirection on the per-call path
+        self._plans = {
+            dim_key: tuple((question_ids[i], kinds[i], payloads[i]) for i in plan)
+            for dim_key, plan in self.dimension_plans.items()
+        }
+        self.weights = MappingProxyType(dict(weights))
+
+    def score_question(self, qid: str, answer: Any) -> float:
+        i = self.question_index[qid]
+        return _score_answer(self.kinds[i], self.payloads[i], answer)
+
+    def dimension_score(self, dim_key: str, answers: Dict[str, Any]) -> float:
+        plan = self._plans.get(dim_key)
+        if not plan:
+            return 50.0
+        scores = []
+        for qid, kind, payload in plan:
+            answer = answers.get(qid, _MISSING)
+            if answer is not _MISSING:
+                scores.append(_score_answer(kind, payload, answer))
+        return sum(scores) / len(scores) if scores else 50.0
+
+
+def _score_answer(kind: int, payload: Any, answer: Any) -> float:
+    if kind == _SINGLE:
+        try:
+            score = payload.get(answer)
+        except TypeError:  # unhashable answer, e.g. a list
+            score = None
+        # Non-string answers (ints, ...) match through str(), default 50
+        return score if score is not None else payload.get(str(answer), 50.0)
+    if kind == _MULTI:
+        count = _multi_count(answer)
+        if count < 0:
+            return 50.0
+        max_opts, max_score = payload
+        return min(count / max_opts, 1.0) * max_score
+    return float(answer) / payload * 100.0 if isinstance(answer, (int, float)) else 50.0
+
+
+def _multi_count(answer: Any) -> int:
+    """Options cochées : liste, ou entier codé bit à bit (voir scoring_schema) ; -1 sinon."""
+    if isinstance(answer, list):
+        return len(answer)
+    if isinstance(answer, int) and not isinstance(answer, bool) and answer >= 0:
+        return answer.bit_count()
+    return -1
+
+
+def _decode_bitsets(answers: Dict[str, Any], schema: Schema) -> Dict[str, Any]:
+    """Copie des réponses où les choix multiples codés en entier redeviennent des listes."""
+    decoded = answers
+    for qid in schema.multi_qids:
+        value = answers.get(qid)
+        if isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            if decoded is answers:
+                decoded = dict(answers)
+            decoded[qid] = schema.decode_multi(qid, value)
+    return decoded
+
+
+# Built at import: a scoring table out of sync with the questionnaire fails here
+DEFAULT_MODEL = ScoringModel()
 
 
 def _get_gaps_and_recs(dim_key: str, score: float) -> Dict[str, List[str]]:
@@ -305,119 +420,114 @@ def _get_gaps_and_recs(dim_key: str, score: float) -> Dict[str, List[str]]:
     return {"gaps": gaps, "recommendations": recs}
 
 
-def _recommend_regions(answers: Dict[str, Any], overall_score: float) -> List[Dict[str, Any]]:
-    """Recommande les meilleures régions pour l'expansion basées sur le profil."""
-    targeted = answers.get("regions_cibles", [])
-    nb = answers.get("nb_unites", "1")
+# Region fit: bonuses by market category, scored for every territory at once
+_POTENTIAL_BONUS = {"Élevé": 25, "Moyen-Élevé": 20, "Moyen": 10}
+_POTENTIAL_DEFAULT = 5
+_DENSITY_BONUS = {"Très faible": 20, "Faible": 18, "Faible-Moyen": 15, "Moyen": 10, "Moyen-Élevé": 5, "Élevée": 0, "Très élevée": -5}
+_CHAIN_SIZE_FACTOR = {"1": 0, "2-5": 1, "6-15": 2, "16-30": 3, "30+": 4}
+REGIONS_LISTED = 15
 
-    # Smaller chains should start with lower-competition regions
-    size_factor = {"1": 0, "2-5": 1, "6-15": 2, "16-30": 3, "30+": 4}.get(nb, 0)
 
-    region_scores = []
-    for key, region in QUEBEC_REGIONS.items():
-        score = 50.0
-        is_targeted = key in targeted
+def _as_market(regions: Union[None, MarketData, Dict[str, Dict[str, Any]]]) -> MarketData:
+    if regions is None:
+        return get_market_data()
+    return regions if isinstance(regions, MarketData) else MarketData.from_mapping(regions)
 
-        # Bonus for targeted regions
-        if is_targeted:
-            score += 15
 
-        # Score based on potential
-        pot_map = {"Élevé": 25, "Moyen-Élevé": 20, "Moyen": 10}
-        score += pot_map.get(region["potentiel"], 5)
+def _targeted_mask(market: MarketData, targeted: Any) -> np.ndarray:
+    """Territoires ciblés : la clé elle-même ou sa région parente."""
+    if isinstance(targeted, list) and all(isinstance(k, str) for k in targeted):
+        mask = np.zeros(len(market), dtype=bool)
+        for key in targeted:
+            mask[market.target_rows(key)] = True
+        return mask
+    # Malformed answers keep the membership semantics (and errors) of ``in``
+    return np.fromiter((key in targeted for key in market.keys), dtype=bool, count=len(market))
 
-        # Smaller chains benefit more from low-density markets
-        density_map = {"Très faible": 20, "Faible": 18, "Faible-Moyen": 15, "Moyen": 10, "Moyen-Élevé": 5, "Élevée": 0, "Très élevée": -5}
-        density_bonus = density_map.get(region["densite_qsr"], 0)
-        if size_factor < 2:
-            score += density_bonus
-        else:
-            score += density_bonus * 0.5
 
+def _region_scores(answers: Dict[str, Any], market: MarketData) -> Tuple[np.ndarray, np.ndarray]:
+    """(scores, ciblés) pour tous les territoires, en une passe vectorisée."""
+    targeted = answers.get("regions_cibles", [])
+    nb = answers.get("nb_unites", "1")
+
+    # Smaller chains should start with lower-competition regions
+    size_factor = _CHAIN_SIZE_FACTOR.get(nb, 0)
+    is_targeted = _targeted_mask(market, targeted)
+
+    small_chain = size_factor < 2
+    base = market.derived.get(("region_fit", small_chain))
+    if base is None:
+        # Profile-independent part, computed once per market and chain size
+        base = 50.0 + market.lookup("potentiel", _POTENTIAL_BONUS, _POTENTIAL_DEFAULT)
+        # Smaller chains benefit more from low-density markets
+        density_bonus = market.lookup("densite_qsr", _DENSITY_BONUS, 0)
+        base += density_bonus if small_chain else density_bonus * 0.5
         # Cost advantage
-        if region["loyer_moyen_pied2"] < 20:
-            score += 10
+        base += np.where(market.loyer < 20, 10.0, 0.0)
+        market.derived[("region_fit", small_chain)] = base
+    # Bonus for targeted regions
+    score = np.where(is_targeted, base + 15.0, base)
+    return np.clip(score, 0, 100), is_targeted
 
-        # Clamp
-        score = max(0, min(100, score))
 
-        priority = "Prioritaire" if score >= 75 else "Recommandée" if score >= 60 else "Secondaire" if score >= 45 else "À long terme"
+def _recommend_regions(
+    answers: Dict[str, Any],
+    overall_score: float,
+    regions: Union[None, MarketData, Dict[str, Dict[str, Any]]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """Recommande les meilleures régions pour l'expansion basées sur le profil."""
+    market = _as_market(regions)
+    scores, is_targeted = _region_scores(answers, market)
+    # Stable on ties, like list.sort(reverse=True)
+    order = np.argsort(-scores, kind="stable")[:limit]
+
+    columns = market.scalars()
+    names, notes, population = columns["name"], columns["notes"], columns["population"]
+    loyer, densite, potentiel = columns["loyer_moyen_pied2"], columns["densite_qsr"], columns["potentiel"]
+    scores, is_targeted = scores.tolist(), is_targeted.tolist()
 
+    region_scores = []
+    for i in order.tolist():
+        score = scores[i]
+        priority = "Prioritaire" if score >= 75 else "Recommandée" if score >= 60 else "Secondaire" if score >= 45 else "À long terme"
         region_scores.append({
-            "key": key,
-            "name": region["name"],
+            "key": market.keys[i],
+            "name": names[i],
             "score": score,
             "priority": priority,
-            "population": region["population"],
-            "loyer": region["loyer_moyen_pied2"],
-            "densite": region["densite_qsr"],
-            "potentiel": region["potentiel"],
-            "notes": region["notes"],
-            "targeted": is_targeted,
+            "population": population[i],
+            "loyer": loyer[i],
+            "densite": densite[i],
+            "potentiel": potentiel[i],
+            "notes": notes[i],
+            "targeted": is_targeted[i],
         })
-
-    region_scores.sort(key=lambda x: x["score"], reverse=True)
     return region_scores
 
 
-def _competitive_analysis(answers: Dict[str, Any]) -> List[Dict[str, Any]]:
-    """Analyse concurrentielle contextuelle."""
-    diffs = answers.get("differenciateur", [])
-    prix = answers.get("positionnement_prix", "competitif")
-
-    analysis = []
-    for key, comp in COMPETITORS.items():
-        vulnerability = 50  # baseline
-        opportunities = []
-
-        # Price positioning creates different competitive dynamics
-        if prix == "valeur" and comp["niveau_menace"] in ("Élevé", "Moyen-Élevé"):
-            vulnerability += 10
-            opportunities.append(f"Positionnement valeur vs {comp['name']} en hausse de prix")
-
-        if "identite_qc" in diffs and key in ("mcdonalds", "subway", "aw"):
-            vulnerability += 15
-            opportunities.append(f"Identité québécoise authentique vs {comp['name']} (marque internationale)")
-
-        if "qualite" in diffs and key in ("tim_hortons", "subway", "harveys"):
-            vulnerability += 15
-            opportunities.append(f"Qualité supérieure vs {comp['name']} ({comp['faiblesse']})")
-
-        if "menu_unique" in diffs and key in ("mcdonalds", "subway", "tim_hortons"):
-            vulnerability += 10
-            opportunities.append(f"Menu distinctif vs l'offre générique de {comp['name']}")
-
-        if key in ("valentine", "harveys"):
-            vulnerability += 10
-            opportunities.append(f"{comp['name']} en déclin — territoire à prendre")
-
-        analysis.append({
-            "name": comp["name"],
-            "unites_qc": comp["unites_qc"],
-            "force": comp["force"],
-            "faiblesse": comp["faiblesse"],
-            "niveau_menace": comp["niveau_menace"],
-            "vulnerabilite": min(vulnerability, 100),
-            "opportunites": opportunities,
-        })
-
-    analysis.sort(key=lambda x: x["vulnerabilite"], reverse=True)
-    return analysis
+def _competitive_analysis(answers: Dict[str, Any], rules: Optional[CompetitorRules] = None) -> List[Dict[str, Any]]:
+    """Analyse concurrentielle contextuelle (règles de ``config.COMPETITOR_RULES``)."""
+    return (rules or DEFAULT_RULES).analyze(answers)
 
 
+@traced("assessment.run")
 def run_assessment(
     answers: Dict[str, Any],
     dimensions: Optional[List[str]] = None,
+    model: Optional[ScoringModel] = None,
 ) -> Dict[str, Any]:
     """Execute l'évaluation complète et retourne les résultats."""
 
     dims = dimensions or ALL_DIMENSION_KEYS
+    model = model or DEFAULT_MODEL
+    answers = _decode_bitsets(answers, model.schema)
 
     # Score each dimension
     dim_results = {}
     for dim_key in dims:
         dim_info = DIMENSIONS[dim_key]
-        score = _compute_dimension_score(dim_key, answers)
+        score = model.dimension_score(dim_key, answers)
         gaps_recs = _get_gaps_and_recs(dim_key, score)
 
         if score >= 70:
@@ -433,23 +543,24 @@ def run_assessment(
             "name": dim_info["name"],
             "short": dim_info["short"],
             "score": score,
-            "weight": dim_info["weight"],
+            "weight": model.weights[dim_key],
             "priority": priority,
             "gaps": gaps_recs["gaps"],
             "recommendations": gaps_recs["recommendations"],
         }
 
     # Weighted overall score
-    total_weight = sum(DIMENSIONS[d]["weight"] for d in dims)
+    weights = model.weights
+    total_weight = sum(weights[d] for d in dims)
     overall = sum(
-        dim_results[d]["score"] * DIMENSIONS[d]["weight"]
+        dim_results[d]["score"] * weights[d]
         for d in dims
     ) / total_weight if total_weight > 0 else 0
 
     tier = get_growth_tier(overall)
 
     # Regional analysis
-    regions = _recommend_regions(answers, overall)
+    regions = _recommend_regions(answers, overall, limit=REGIONS_LISTED)
 
     # Competitive analysis
     competitors = _competitive_analysis(answers)
@@ -494,3 +605,285 @@ def _build_roadmap(dim_results: Dict[str, Any]) -> Dict[str, List[str]]:
         "moyen_terme": moyen_terme,
         "long_terme": long_terme,
     }
+
+
+# ---------------------------------------------------------------------------
+# Batch scoring — vectorized over the ScoringModel flat table
+# ---------------------------------------------------------------------------
+
+_UNKNOWN = -2
+
+GROWTH_TIER_KEYS = list(GROWTH_TIERS.keys())
+
+
+_TIER_MINS = np.array([t["min"] for t in GROWTH_TIERS.values()], dtype=np.float64)
+
+
+def _popcount(bits: np.ndarray) -> np.ndarray:
+    if hasattr(np, "bitwise_count"):  # NumPy >= 2.0
+        return np.bitwise_count(bits)
+    return np.fromiter(map(int.bit_count, bits.tolist()), dtype=np.int64, count=len(bits))
+
+
+def _safe_code(get, value: Any) -> int:
+    try:
+        return get(value, _UNKNOWN)
+    except TypeError:  # unhashable answer, e.g. a list
+        return _UNKNOWN
+
+
+def _batch_single_scores(answers_list, qid: str, column: Sequence[Any], model: ScoringModel):
+    """Scores (N,) + présence (N,) pour une question à choix unique."""
+    n = len(column)
+    i = model.question_index[qid]
+    if model.kinds[i] == _SCALE:
+        present = np.fromiter(
+            (v is not None or qid in answers for v, answers in zip(column, answers_list)),
+            dtype=bool, count=n,
+        )
+        scores = np.fromiter(
+            map(_score_answer, repeat(_SCALE, n), repeat(model.payloads[i], n), column),
+            dtype=np.float64, count=n,
+        )
+        return scores, present
+
+    get = model.codes[i].get
+    try:
+        codes = np.fromiter(map(get, column, repeat(_UNKNOWN, n)), dtype=np.intp, count=n)
+    except TypeError:
+        codes = np.array([_safe_code(get, v) for v in column], dtype=np.intp)
+    # Missing answers and non-string values (ints, None, ...) are resolved
+    # one by one, through str() like _score_answer
+    default = model.default_codes[i]
+    for row in np.flatnonzero(codes == _UNKNOWN):
+        answers = answers_list[row]
+        codes[row] = get(str(answers[qid]), default) if qid in answers else -1
+    present = codes >= 0
+    return model.table[np.where(present, codes, default)], present
+
+
+def _batch_multi_scores(answers_list, qid: str, column: Sequence[Any], model: ScoringModel):
+    """Scores (N,) + présence (N,) pour une question à choix multiples."""
+    n = len(column)
+    column_types = set(map(type, column))
+    if int in column_types and qid in model.schema.multi_qids:
+        # Out-of-range bits raise like _decode_bitsets on the per-call path
+        limit = 1 << len(model.schema[qid].values)
+        ints = column if column_types == {int} else [v for v in column if type(v) is int]
+        if max(ints) >= limit:
+            model.schema.decode_multi(qid, next(v for v in ints if v >= limit))
+    if column_types == {list}:
+        present = np.ones(n, dtype=bool)
+        is_list = present
+        counts = np.fromiter(map(len, column), dtype=np.float64, count=n)
+    elif column_types == {int} and min(column, default=0) >= 0:
+        # Bitset-encoded answers: popcount instead of list length
+        present = np.ones(n, dtype=bool)
+        is_list = present
+        counts = _popcount(np.fromiter(column, dtype=np.uint64, count=n)).astype(np.float64)
+    else:
+        present = np.fromiter(
+            (v is not None or qid in answers for v, answers in zip(column, answers_list)),
+            dtype=bool, count=n,
+        )
+        codes = np.fromiter(map(_multi_count, column), dtype=np.int64, count=n)
+        is_list = codes >= 0
+        counts = np.maximum(codes, 0).astype(np.float64)
+    # Mirrors _score_answer: min(count / max_opts, 1.0) * max, 50 otherwise
+    max_opts, max_score = model.payloads[model.question_index[qid]]
+    scores = np.minimum(counts / max_opts, 1.0) * max_score
+    return np.where(is_list, scores, 50.0), present
+
+
+@traced("assessment.batch")
+def run_assessment_batch(
+    answers_list: Sequence[Dict[str, Any]],
+    dimensions: Optional[List[str]] = None,
+    model: Optional[ScoringModel] = None,
+) -> Dict[str, Any]:
+    """Score N questionnaires d'un coup (scores, score global et niveau).
+
+    Produit exactement les mêmes valeurs que ``run_assessment`` pour chaque
+    réponse, sans les lacunes, régions, concurrents ni feuille de route.
+    """
+    dims = dimensions or ALL_DIMENSION_KEYS
+    for dim_key in dims:
+        if dim_key not in DIMENSIONS:
+            raise KeyError(dim_key)
+    model = model or DEFAULT_MODEL
+    n = len(answers_list)
+
+    # Score each question once, as a column over all respondents
+    question_scores: Dict[str, Any] = {}
+    plans = {dim_key: [model.question_ids[i] for i in model.dimension_plans.get(dim_key, ())] for dim_key in dims}
+    for dim_key in dims:
+        for qid in plans[dim_key]:
+            if qid in question_scores:
+                continue
+            column = [answers.get(qid) for answers in answers_list]
+            if model.kinds[model.question_index[qid]] == _MULTI:
+                question_scores[qid] = _batch_multi_scores(answers_list, qid, column, model)
+            else:
+                question_scores[qid] = _batch_single_scores(answers_list, qid, column, model)
+
+    dim_scores = np.empty((n, len(dims)), dtype=np.float64)
+    for j, dim_key in enumerate(dims):
+        total = np.zeros(n, dtype=np.float64)
+        count = np.zeros(n, dtype=np.int64)
+        for qid in plans[dim_key]:
+            scores, present = question_scores[qid]
+            # Accumulate in question order so float sums match the per-call path
+            total += np.where(present, scores, 0.0)
+            count += present
+        dim_scores[:, j] = np.where(count > 0, total / np.maximum(count, 1), 50.0)
+
+    weights = model.weights
+    total_weight = sum(weights[d] for d in dims)
+    overall = np.zeros(n, dtype=np.float64)
+    if total_weight > 0:
+        for j, dim_key in enumerate(dims):
+            overall += dim_scores[:, j] * weights[dim_key]
+        overall /= total_weight
+
+    # First tier whose minimum is reached, in GROWTH_TIERS order
+    tier_mins = _TIER_MINS
+    tier_codes = np.full(n, len(tier_mins) - 1, dtype=np.intp)
+    for i in range(len(tier_mins) - 1, -1, -1):
+        tier_codes[overall >= tier_mins[i]] = i
+    tier_list = list(GROWTH_TIERS.values())
+    stars = np.array([t["stars"] for t in tier_list], dtype=np.int64)[tier_codes]
+
+    return {
+        "dimensions_assessed": dims,
+        "dimension_scores": dim_scores,
+        "overall_scores": overall,
+        "tier_codes": tier_codes,
+        "tiers": [tier_list[c] for c in tier_codes],
+        "stars": stars,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Monte Carlo — uncertainty on answers propagated to scores and tiers
+# ---------------------------------------------------------------------------
+
+DEFAULT_UNCERTAINTY = 0.2
+MONTE_CARLO_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def _neighbor_scores(model: ScoringModel, qid: str, answer: Any):
+    """(score bas, score actuel, score haut) pour les réponses adjacentes ; None si absent."""
+    i = model.question_index[qid]
+    kind, payload = model.kinds[i], model.payloads[i]
+    current = _score_answer(kind, payload, answer)
+    if kind == _MULTI:
+        count = _multi_count(answer)
+        if count < 0:
+            return None, current, None
+        # Scored from the option count: an int answer here would read as a bitset
+        max_opts, max_score = payload
+        lower = min((count - 1) / max_opts, 1.0) * max_score if count > 0 else None
+        upper = min((count + 1) / max_opts, 1.0) * max_score if count < max_opts else None
+        return lower, current, upper
+    if kind == _SCALE:
+        if isinstance(answer, bool) or not isinstance(answer, int) or not 1 <= answer <= payload:
+            return None, current, None
+        lower = _score_answer(kind, payload, answer - 1) if answer > 1 else None
+        upper = _score_answer(kind, payload, answer + 1) if answer < payload else None
+        return lower, current, upper
+    # Single choice: adjacent options in questionnaire order
+    values = model.schema[qid].values if qid in model.schema else tuple(payload)
+    try:
+        pos = values.index(answer)
+    except ValueError:
+        return None, current, None
+    lower = payload.get(values[pos - 1], 50.0) if pos > 0 else None
+    upper = payload.get(values[pos + 1], 50.0) if pos + 1 < len(values) else None
+    return lower, current, upper
+
+
+def _sample_question(rng, n: int, p: float, lower, current: float, upper) -> np.ndarray:
+    """N scores : la réponse glisse vers une réponse adjacente avec probabilité p."""
+    scores = np.full(n, current, dtype=np.float64)
+    if p <= 0 or (lower is None and upper is None):
+        return scores
+    u = rng.random(n)
+    if lower is not None and upper is not None:
+        scores[u < p / 2] = lower
+        scores[(u >= p / 2) & (u < p)] = upper
+    else:
+        scores[u < p] = lower if lower is not None else upper
+    return scores
+
+
+@traced("assessment.monte_carlo")
+def run_monte_carlo(
+    answers: Dict[str, Any],
+    dimensions: Optional[List[str]] = None,
+    n_samples: int = 10_000,
+    uncertainty: Optional[Dict[str, float]] = None,
+    default_uncertainty: float = DEFAULT_UNCERTAINTY,
+    seed: Optional[int] = None,
+    model: Optional[ScoringModel] = None,
+) -> Dict[str, Any]:
+    """Distribution du score global et des niveaux si les réponses sont incertaines.
+
+    ``uncertainty[qid]`` est la probabilité que la vraie réponse soit une
+    réponse adjacente (option voisine, ±1 sur l'échelle, une option de plus
+    ou de moins pour un choix multiple) ; ``default_uncertainty`` sinon.
+    Retourne moyenne, écart-type et percentiles du score global, bandes par
+    dimension et probabilité de chaque niveau de ``GROWTH_TIERS``.
+    """
+    dims = dimensions or ALL_DIMENSION_KEYS
+    model = model or DEFAULT_MODEL
+    answers = _decode_bitsets(answers, model.schema)
+    uncertainty = uncertainty or {}
+    rng = np.random.default_rng(seed)
+    n = n_samples
+
+    # One draw per question, shared by every dimension it feeds
+    question_samples: Dict[str, np.ndarray] = {}
+    dim_samples = np.empty((n, len(dims)), dtype=np.float64)
+    for j, dim_key in enumerate(dims):
+        if dim_key not in DIMENSIONS:
+            raise KeyError(dim_key)
+        total = np.zeros(n, dtype=np.float64)
+        count = 0
+        for i in model.dimension_plans.get(dim_key, ()):
+            qid = model.question_ids[i]
+            if qid not in answers:
+                continue
+            if qid not in question_samples:
+                p = uncertainty.get(qid, default_uncertainty)
+                question_samples[qid] = _sample_question(rng, n, p, *_neighbor_scores(model, qid, answers[qid]))
+            total += question_samples[qid]
+            count += 1
+        dim_samples[:, j] = total / count if count else 50.0
+
+    weights = np.array([model.weights[d] for d in dims], dtype=np.float64)
+    total_weight = weights.sum()
+    overall = dim_samples @ weights / total_weight if total_weight > 0 else np.zeros(n)
+
+    tier_codes = np.full(n, len(_TIER_MINS) - 1, dtype=np.intp)
+    for i in range(len(_TIER_MINS) - 1, -1, -1):
+        tier_codes[overall >= _TIER_MINS[i]] = i
+    tier_counts = np.bincount(tier_codes, minlength=len(GROWTH_TIER_KEYS))
+
+    overall_pct = np.percentile(overall, MONTE_CARLO_PERCENTILES)
+    dim_pct = np.percentile(dim_samples, MONTE_CARLO_PERCENTILES, axis=0)
+    return {
+        "n_samples": n,
+        "overall": {
+            "mean": float(overall.mean()),
+            "std": float(overall.std()),
+            **{f"p{q}": float(v) for q, v in zip(MONTE_CARLO_PERCENTILES, overall_pct)},
+        },
+        "dimensions": {
+            dim_key: {
+                "mean": float(dim_samples[:, j].mean()),
+                **{f"p{q}": float(dim_pct[k, j]) for k, q in enumerate(MONTE_CARLO_PERCENTILES)},
+            }
+            for j, dim_key in enumerate(dims)
+        },
+        "tier_probabilities": {key: float(c) / n for key, c in zip(GROWTH_TIER_KEYS, tier_counts)},
+    }
@@ -0,0 +1,364 @@
+"""
+batch.py — Évaluation en lot de questionnaires (CSV, JSONL ou Parquet).
+
+Les réponses sont lues en flux par paquets, scorées dans un pool de
+processus avec un nombre borné de paquets en vol, puis écrites dans l'ordre
+d'entrée : la mémoire reste constante quelle que soit la taille du fichier.
+
+Format d'entrée : une colonne (ou clé JSON) par question de
+``questionnaire.QUESTIONS``, plus ``id`` et ``org`` optionnelles. En CSV,
+les choix multiples sont séparés par ``;`` (ou donnés en liste JSON) ; en
+JSONL/Parquet, ils peuvent aussi être un entier codé bit à bit
+(``scoring_schema.SCHEMA.encode_multi``).
+Une ligne JSONL peut aussi être ``{"id": ..., "org": ..., "answers": {...}}``.
+Une ligne illisible (p. ex. bits hors des options) ne bloque pas le lot :
+elle sort sans scores, avec la cause dans la colonne ``decode_error``.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from questionnaire import QUESTION_MAP
+from scoring_schema import SCHEMA
+from assessor import run_assessment, run_assessment_batch, _recommend_regions, GROWTH_TIER_KEYS
+from config import ALL_DIMENSION_KEYS
+from market_data import MarketData, get_market_data
+
+if TYPE_CHECKING:
+    from storage import AssessmentStore
+
+DEFAULT_CHUNK_SIZE = 1000
+TOP_REGIONS = 3
+TOP_REGIONS_CACHE_SIZE = 4096  # distinct (targeted regions, chain size) profiles kept
+
+Record = Tuple[str, str, Dict[str, Any], str]  # (id, org, answers, decode_error)
+
+
+# ---------------------------------------------------------------------------
+# Lecture en flux
+# ---------------------------------------------------------------------------
+
+def _decode_value(qid: str, value: Any) -> Any:
+    """Convertit une valeur brute (texte CSV, JSON, Parquet) en réponse."""
+    q = QUESTION_MAP[qid]
+    if q.answer_type == "multi":
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        if isinstance(value, int) and not isinstance(value, bool):
+            return SCHEMA.decode_multi(qid, value)  # bitset column (Parquet/JSONL)
+        text = str(value).strip()
+        if text.startswith("["):
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"Liste JSON invalide pour {qid} : {exc}") from None
+        return [v.strip() for v in re.split(r"[;|]", text) if v.strip()]
+    if q.answer_type == "scale" and isinstance(value, str):
+        try:
+            return int(float(value))
+        except (ValueError, OverflowError):  # "abc", "inf": scored like any non-number
+            return value
+    # Interned option values are shared objects: less memory per row and
+    # identity hits in the scoring lookup tables
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def decode_answers(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Garde les questions connues et décode leurs valeurs ; vide = absent."""
+    answers = {}
+    for qid, value in raw.items():
+        if qid not in QUESTION_MAP or value is None or value == "":
+            continue
+        answers[qid] = _decode_value(qid, value)
+    return answers
+
+
+def _record(raw: Any, row_number: int) -> Record:
+    if not isinstance(raw, dict):
+        # Unreadable JSONL line: the error itself, or a non-object value
+        error = f"{type(raw).__name__}: {raw}" if isinstance(raw, Exception) else f"Ligne sans objet JSON : {raw!r}"
+        return str(row_number), str(row_number), {}, error
+    respondent_id = str(raw.get("id") or row_number)
+    org = str(raw.get("org") or respondent_id)
+    try:
+        if isinstance(raw.get("answers"), dict):
+            answers = decode_answers(raw["answers"])
+        else:
+            answers = decode_answers(raw)
+    except ValueError as exc:  # one unreadable row must not sink the run
+        return respondent_id, org, {}, f"{type(exc).__name__}: {exc}"
+    return respondent_id, org, answers, ""
+
+
+def _iter_raw_rows(path: Path) -> Iterator[Any]:
+    """Lignes brutes (dict) ; une ligne JSONL illisible donne son erreur de décodage."""
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+    elif suffix in (".jsonl", ".ndjson"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as exc:
+                        yield exc
+    elif suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("pyarrow est requis pour lire les fichiers Parquet (pip install pyarrow).")
+        for record_batch in pq.ParquetFile(path).iter_batches(batch_size=DEFAULT_CHUNK_SIZE):
+            yield from record_batch.to_pylist()
+    else:
+        raise ValueError(f"Format d'entrée non supporté : {path.suffix} (CSV, JSONL ou Parquet)")
+
+
+def iter_records(path: str) -> Iterator[Record]:
+    """Lit un fichier de réponses en flux, un répondant à la fois."""
+    for row_number, raw in enumerate(_iter_raw_rows(Path(path)), 1):
+        yield _record(raw, row_number)
+
+
+def iter_chunks(records: Iterable[Record], size: int) -> Iterator[List[Record]]:
+    it = iter(records)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+# ---------------------------------------------------------------------------
+# Scoring (exécuté dans les processus du pool)
+# ---------------------------------------------------------------------------
+
+def report_basename(name: str) -> str:
+    normalized = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", normalized.strip().lower()).strip("_")
+    return slug or "organisation"
+
+
+def report_stem(respondent_id: str) -> str:
+    """Nom de fichier (sans extension) du rapport d'un répondant, unique par identifiant.
+
+    Distinct ids can share a slug ("A-1", "a 1"): a short hash of the raw id
+    keeps their reports apart.
+    """
+    digest = hashlib.sha256(respondent_id.encode("utf-8")).hexdigest()[:8]
+    return f"bellepros_croissance_{report_basename(respondent_id)}_{digest}"
+
+
+def _write_reports(record: Record, dims: Optional[List[str]], reports_dir: str, formats: Sequence[str]) -> None:
+    respondent_id, org, answers, _ = record
+    assessment = run_assessment(answers, dims)
+    base = Path(reports_dir) / report_stem(respondent_id)
+    if "md" in formats:
+        from report_generator import generate_report
+        base.with_suffix(".md").write_text(generate_report(assessment, org_name=org), encoding="utf-8")
+    if "pdf" in formats:
+        from pdf_generator import generate_pdf
+        base.with_suffix(".pdf").write_bytes(bytes(generate_pdf(assessment, org_name=org)))
+
+
+def _join_top_regions(answers: Dict[str, Any], overall: float) -> str:
+    return ";".join(r["key"] for r in _recommend_regions(answers, overall)[:TOP_REGIONS])
+
+
+_top_regions_market: Optional[MarketData] = None  # market the profile cache was filled from
+
+
+@lru_cache(maxsize=TOP_REGIONS_CACHE_SIZE)
+def _profile_top_regions(targeted: FrozenSet[Any], nb: Any) -> str:
+    return _join_top_regions({"regions_cibles": list(targeted), "nb_unites": nb}, 0.0)
+
+
+def _top_regions(answers: Dict[str, Any], overall: float) -> str:
+    """Top régions (clés séparées par ``;``), en cache borné par profil.
+
+    _recommend_regions only depends on the targeted regions and the chain
+    size, so most respondents share one of a few hundred rankings.
+    The cache is emptied when ``market_data.set_market_data`` swaps the market.
+    """
+    global _top_regions_market
+    market = get_market_data()
+    if market is not _top_regions_market:
+        _profile_top_regions.cache_clear()
+        _top_regions_market = market
+    targeted = answers.get("regions_cibles", [])
+    if isinstance(targeted, list):
+        try:
+            return _profile_top_regions(frozenset(targeted), answers.get("nb_unites", "1"))
+        except TypeError:  # unhashable values
+            pass
+    return _join_top_regions(answers, overall)
+
+
+def score_chunk(
+    chunk: List[Record],
+    dims: Optional[List[str]] = None,
+    reports_dir: Optional[str] = None,
+    report_formats: Sequence[str] = (),
+) -> List[Dict[str, Any]]:
+    """Score un paquet de répondants et retourne une ligne de sortie chacun.
+
+    Les lignes illisibles gardent toutes les colonnes, scores vides.
+    """
+    batch = run_assessment_batch([answers for _, _, answers, _ in chunk], dims)
+    dim_columns = [f"{dim_key}_score" for dim_key in batch["dimensions_assessed"]]
+    overall_scores = batch["overall_scores"].tolist()
+    dim_scores = batch["dimension_scores"].round(4).tolist()
+    tier_codes = batch["tier_codes"].tolist()
+    stars = batch["stars"].tolist()
+    rows = []
+    for i, record in enumerate(chunk):
+        respondent_id, org, answers, decode_error = record
+        if decode_error:
+            row = {"id": respondent_id, "org": org, "overall_score": None, "tier": "", "stars": None}
+            row.update(dict.fromkeys(dim_columns))
+            row["top_regions"] = ""
+            row["decode_error"] = decode_error
+            if reports_dir and report_formats:
+                row["report_error"] = ""
+            rows.append(row)
+            continue
+        row = {
+            "id": respondent_id,
+            "org": org,
+            "overall_score": round(overall_scores[i], 4),
+            "tier": GROWTH_TIER_KEYS[tier_codes[i]],
+            "stars": stars[i],
+        }
+        row.update(zip(dim_columns, dim_scores[i]))
+        row["top_regions"] = _top_regions(answers, overall_scores[i])
+        row["decode_error"] = ""
+        if reports_dir and report_formats:
+            try:
+                _write_reports(record, dims, reports_dir, report_formats)
+                row["report_error"] = ""
+            except Exception as exc:  # one bad report must not sink the chunk
+                row["report_error"] = f"{type(exc).__name__}: {exc}"
+        rows.append(row)
+    return rows
+
+
+def _init_worker(render_inline: bool) -> None:
+    if render_inline:
+        # Already a worker process: render charts here instead of nesting a pool
+        from chart_renderer import ChartRenderer, set_renderer
+        set_renderer(ChartRenderer(workers=0))
+
+
+# ---------------------------------------------------------------------------
+# Écriture en flux
+# ---------------------------------------------------------------------------
+
+class _ResultWriter:
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.is_csv = self.path.suffix.lower() == ".csv"
+        if not self.is_csv and self.path.suffix.lower() not in (".jsonl", ".ndjson"):
+            raise ValueError(f"Format de sortie non supporté : {self.path.suffix} (CSV ou JSONL)")
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._csv = None
+
+    def write(self, rows: List[Dict[str, Any]]) -> None:
+        if not self.is_csv:
+            for row in rows:
+                self._file.write(json.dumps(row, ensure_ascii=False) + "\n")
+            return
+        if self._csv is None and rows:
+            self._csv = csv.DictWriter(self._file, fieldnames=list(rows[0].keys()))
+            self._csv.writeheader()
+        self._csv.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    dims: Optional[List[str]] = None,
+    reports_dir: Optional[str] = None,
+    report_formats: Sequence[str] = (),
+    progress: Optional[Callable[[int, float], None]] = None,
+    store: Optional["AssessmentStore"] = None,
+) -> Dict[str, Any]:
+    """Score tout un fichier et écrit les résultats ; retourne un résumé.
+
+    Au plus ``2 * workers`` paquets sont en vol : la lecture attend que
+    l'écriture rattrape, d'où une mémoire plate sur des millions de lignes.
+    Avec ``store``, chaque paquet est aussi
+    inséré dans l'historique, réponses comprises. Les lignes illisibles sont
+    écrites avec ``decode_error`` et comptées dans ``errors``, sans entrer
+    dans l'historique ni dans la répartition par niveau.
+    """
+    workers = workers or os.cpu_count() or 1
+    if dims:
+        unknown = [d for d in dims if d not in ALL_DIMENSION_KEYS]
+        if unknown:
+            raise ValueError(f"Dimensions inconnues : {', '.join(unknown)}")
+    if reports_dir:
+        Path(reports_dir).mkdir(parents=True, exist_ok=True)
+
+    max_in_flight = 2 * workers
+    writer = _ResultWriter(output_path)
+    done = errors = 0
+    tier_counts = {key: 0 for key in GROWTH_TIER_KEYS}
+    start = time.perf_counter()
+    started_at = time.time()
+
+    def drain(chunk: List[Record], future) -> None:
+        nonlocal done, errors
+        rows = future.result()
+        writer.write(rows)
+        scored = [(row, answers) for row, (_, _, answers, decode_error) in zip(rows, chunk) if not decode_error]
+        if store is not None:
+            store.add_many((row for row, _ in scored), (answers for _, answers in scored), created_at=started_at)
+        for row, _ in scored:
+            tier_counts[row["tier"]] += 1
+        errors += len(rows) - len(scored)
+        done += len(rows)
+        if progress:
+            progress(done, time.perf_counter() - start)
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=("pdf" in report_formats,),
+        ) as pool:
+            pending = deque()
+            for chunk in iter_chunks(iter_records(input_path), chunk_size):
+                if len(pending) >= max_in_flight:
+                    drain(*pending.popleft())
+                pending.append((chunk, pool.submit(score_chunk, chunk, dims, reports_dir, tuple(report_formats))))
+            while pending:
+                drain(*pending.popleft())
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "count": done,
+        "elapsed": elapsed,
+        "rate": done / elapsed if elapsed > 0 else 0.0,
+        "tiers": tier_counts,
+        "errors": errors,
+    }
@@ -0,0 +1,3 @@
+"""
+benchmarks — Mesures de performance (style asv), lancées par ``benchmarks/run.py``.
+"""
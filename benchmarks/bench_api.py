@@ -0,0 +1,42 @@
+"""
+bench_api.py — Service HTTP : requête d'évaluation JSON traitée par l'application ASGI, avec et sans cache.
+"""
+
+import asyncio
+import itertools
+import json
+
+from api import ScoringAPI
+from benchmarks.synthetic import synthetic_answers
+
+
+async def _call(app: ScoringAPI, path: str, body: bytes) -> int:
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    await app({"type": "http", "method": "POST", "path": path}, receive, send)
+    return sent[0]["status"]
+
+
+class ApiSuite:
+    def setup(self):
+        self.loop = asyncio.new_event_loop()
+        self.bodies = [json.dumps({"answers": a}).encode() for a in synthetic_answers(500, seed=4)]
+        self.uncached = ScoringAPI(cache_entries=0)
+        self.cached = ScoringAPI()
+        self.cycle = itertools.cycle(self.bodies)
+        self.loop.run_until_complete(_call(self.cached, "/assessment", self.bodies[0]))
+
+    def time_assessment_request(self):
+        self.loop.run_until_complete(_call(self.uncached, "/assessment", next(self.cycle)))
+
+    def time_assessment_request_cached(self):
+        self.loop.run_until_complete(_call(self.cached, "/assessment", self.bodies[0]))
+
+    def time_markdown_request(self):
+        self.loop.run_until_complete(_call(self.uncached, "/report.md", next(self.cycle)))
@@ -0,0 +1,117 @@
+"""
+bench_assessment.py — Scoring : évaluation unitaire, en lot, régions, concurrence, plan d'ouverture et sites.
+"""
+
+import random
+
+from assessor import _competitive_analysis, _recommend_regions, run_assessment, run_assessment_batch
+from benchmarks.synthetic import synthetic_answers, synthetic_points, synthetic_regions
+from competitor_rules import CompetitorRules
+from config import COMPETITORS
+from expansion_optimizer import optimize_expansion
+from market_data import MarketData
+from site_scoring import PointSet, score_sites
+
+
+class AssessmentSuite:
+    def setup(self):
+        self.answers = synthetic_answers(1)[0]
+        self.overall = run_assessment(self.answers)["overall_score"]
+
+    def time_run_assessment(self):
+        run_assessment(self.answers)
+
+    def time_recommend_regions(self):
+        _recommend_regions(self.answers, self.overall)
+
+    def time_competitive_analysis(self):
+        _competitive_analysis(self.answers)
+
+
+class MarketDataSuite:
+    """Scoring de ~1 100 municipalités (taille visée du jeu de données)."""
+
+    n = 1100
+
+    def setup(self):
+        self.answers = synthetic_answers(1)[0]
+        self.market = MarketData.from_mapping(synthetic_regions(self.n))
+
+    def time_recommend_regions_1100(self):
+        _recommend_regions(self.answers, 0.0, self.market)
+
+    def time_top_regions_1100(self):
+        _recommend_regions(self.answers, 0.0, self.market, limit=15)
+
+
+class BatchAssessmentSuite:
+    n = 1000
+
+    def setup(self):
+        self.answers_list = synthetic_answers(self.n, seed=1)
+
+    def time_run_assessment_loop_1000(self):
+        for answers in self.answers_list:
+            run_assessment(answers)
+
+    def time_run_assessment_batch_1000(self):
+        run_assessment_batch(self.answers_list)
+
+
+class CompetitorRulesSuite:
+    """60 chaînes régionales contre 5 000 profils de répondants."""
+
+    n = 5000
+    chains = 60
+
+    def setup(self):
+        rng = random.Random(0)
+        templates = list(COMPETITORS.values())
+        competitors = {}
+        for i in range(self.chains):
+            comp = dict(templates[i % len(templates)])
+            comp["name"] = f"{comp['name']} {i}"
+            comp["profil"] = tuple(t for t in ("qualite_en_baisse", "offre_generique", "en_declin", "marque_internationale") if rng.random() < 0.4)
+            competitors[f"chaine_{i}"] = comp
+        self.competitors = competitors
+        self.rules = CompetitorRules(competitors)
+        self.answers_list = synthetic_answers(self.n, seed=2)
+
+    def time_compile_rules_60_chains(self):
+        CompetitorRules(self.competitors)
+
+    def time_score_batch_5000(self):
+        self.rules.score_batch(self.answers_list)
+
+    def time_analyze_loop_5000(self):
+        for answers in self.answers_list:
+            self.rules.analyze(answers)
+
+
+class ExpansionSuite:
+    def setup(self):
+        self.answers = synthetic_answers(1)[0]
+        self.sub_regions = synthetic_regions(500)
+
+    def time_optimize_10_regions_5_years(self):
+        optimize_expansion(self.answers)
+
+    def time_optimize_500_sub_regions(self):
+        optimize_expansion(self.answers, annual_budget=5_000_000, max_openings_per_year=10, regions=self.sub_regions)
+
+
+class SiteScoringSuite:
+    """10 000 candidats contre 50 000 points d'intérêt (concurrents + grille de population)."""
+
+    repeat = 3
+
+    def setup(self):
+        rng = random.Random(0)
+        chains = list(COMPETITORS)
+        self.competitors = PointSet(*synthetic_points(20_000, seed=1), chain=[rng.choice(chains) for _ in range(20_000)])
+        self.population = PointSet(*synthetic_points(30_000, 0.3, seed=2), population=[rng.randint(0, 3000) for _ in range(30_000)])
+        self.own_units = PointSet(*synthetic_points(40, seed=3))
+        self.candidates = PointSet(*synthetic_points(10_000, 0.25, seed=4))
+
+    def time_score_10k_sites_50k_pois(self):
+        score_sites(self.candidates, self.competitors, self.population, self.own_units)
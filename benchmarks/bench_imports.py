@@ -0,0 +1,65 @@
+"""
+bench_imports.py — Démarrage à froid : ``python -X importtime`` sur chaque point d'entrée.
+
+Chaque mesure lance un interpréteur neuf. Les chemins de scoring (CLI,
+lot, API JSON) échouent s'ils chargent une dépendance de graphique ou de
+PDF : l'erreur apparaît dans les résultats au lieu d'un temps.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+# Only needed to draw charts, build PDFs or tables: scoring paths must not load them
+HEAVY_PACKAGES = ("plotly", "pandas", "fpdf", "kaleido", "fontTools", "PIL", "pyarrow")
+
+
+def import_times(module: str) -> Tuple[float, Dict[str, float]]:
+    """(secondes cumulées pour ``module``, secondes cumulées par paquet de premier niveau importé)."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    total = 0.0
+    packages: Dict[str, float] = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        seconds = int(cumulative) / 1e6
+        name = name.strip()
+        package = name.split(".")[0]
+        packages[package] = max(packages.get(package, 0.0), seconds)
+        if name == module:
+            total = seconds
+    return total, packages
+
+
+def _scoring_path(module: str) -> None:
+    _, packages = import_times(module)
+    heavy = sorted(p for p in HEAVY_PACKAGES if p in packages)
+    if heavy:
+        raise RuntimeError(f"{module} importe {', '.join(heavy)} au démarrage")
+
+
+class ImportTimeSuite:
+    repeat = 3
+
+    def time_import_assessor(self):
+        _scoring_path("assessor")
+
+    def time_import_main(self):
+        _scoring_path("main")
+
+    def time_import_batch(self):
+        _scoring_path("batch")
+
+    def time_import_api(self):
+        _scoring_path("api")
+
+    def time_import_app(self):
+        import_times("app")
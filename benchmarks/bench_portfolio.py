@@ -0,0 +1,78 @@
+"""
+bench_portfolio.py — Tableau de bord du réseau : chargement et agrégats sur 100 000 évaluations.
+"""
+
+import random
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import ALL_DIMENSION_KEYS, GROWTH_TIERS, QUEBEC_REGIONS
+from portfolio import portfolio_view, results_frame, store_frame
+from scoring_schema import SCHEMA
+from storage import AssessmentStore
+
+
+def _results_csv(n: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    regions = list(QUEBEC_REGIONS)
+    rankings = [";".join(rng.choice(regions, 3, replace=False)) for _ in range(300)]
+    frame = pd.DataFrame({
+        "id": np.arange(n).astype(str),
+        "org": [f"org_{i}" for i in rng.integers(0, n // 5, n)],
+        "overall_score": rng.uniform(0, 100, n).round(4),
+        "tier": rng.choice(list(GROWTH_TIERS), n),
+        "stars": rng.integers(1, 6, n),
+        **{f"{dim_key}_score": rng.uniform(0, 100, n).round(4) for dim_key in ALL_DIMENSION_KEYS},
+        "top_regions": rng.choice(rankings, n),
+    })
+    return frame.to_csv(index=False).encode("utf-8")
+
+
+def _stored_rows(n: int, orgs: int, seed: int = 0):
+    rng = random.Random(seed)
+    options = SCHEMA["regions_cibles"].values
+    tiers = list(GROWTH_TIERS)
+    for i in range(n):
+        row = {
+            "id": i,
+            "org": f"org_{rng.randrange(orgs)}",
+            "created_at": 1_700_000_000 + i * 60,
+            "overall_score": rng.uniform(0, 100),
+            "tier": rng.choice(tiers),
+        }
+        row.update((f"{dim_key}_score", rng.uniform(0, 100)) for dim_key in ALL_DIMENSION_KEYS)
+        yield row, {"regions_cibles": rng.sample(options, rng.randint(0, 4))}
+
+
+class PortfolioSuite:
+    """100 000 évaluations : fichier de lot et historique SQLite."""
+
+    n = 100_000
+    repeat = 3
+
+    def setup(self):
+        self.csv = _results_csv(self.n)
+        self.frame = results_frame(self.csv, "resultats.csv")
+        self.tiers = ["builder", "starter"]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = AssessmentStore(str(Path(self.tmp.name) / "bench.sqlite3"))
+        pairs = list(_stored_rows(self.n, 20_000))
+        self.store.add_many((row for row, _ in pairs), (answers for _, answers in pairs))
+
+    def time_load_results_csv(self):
+        results_frame(self.csv, "resultats.csv")
+
+    def time_load_store_latest(self):
+        store_frame(self.store, latest_only=True)
+
+    def time_load_store_all(self):
+        store_frame(self.store, latest_only=False)
+
+    def time_view(self):
+        portfolio_view(self.frame)
+
+    def time_view_filtered(self):
+        portfolio_view(self.frame[self.frame["tier"].isin(self.tiers)])
@@ -0,0 +1,71 @@
+"""
+bench_reports.py — Rapport Markdown, rendu des graphiques et PDF de bout en bout.
+
+Les graphiques sont rendus dans le processus courant et sans cache, pour
+mesurer le vrai coût de kaleido (et non un accès au cache d'images).
+"""
+
+from assessor import run_assessment
+from benchmarks.synthetic import synthetic_answers
+from chart_cache import ChartCache
+from chart_renderer import ChartRenderer, set_renderer
+from report_generator import generate_report, iter_network_report, write_report
+import io
+import pdf_generator
+
+
+def _uncached_renderer() -> ChartRenderer:
+    return ChartRenderer(workers=0, cache=ChartCache(max_items=0))
+
+
+class MarkdownSuite:
+    def setup(self):
+        self.assessment = run_assessment(synthetic_answers(1)[0])
+
+    def time_generate_report(self):
+        generate_report(self.assessment, org_name="Bench")
+
+
+class NetworkReportSuite:
+    """Rapport de réseau de 1 000 organisations (évaluations déjà calculées)."""
+
+    n = 1000
+
+    def setup(self):
+        assessments = [run_assessment(a) for a in synthetic_answers(50, seed=3)]
+        self.organizations = [(f"Franchisé {i}", assessments[i % len(assessments)]) for i in range(self.n)]
+
+    def time_network_report_1000(self):
+        write_report(iter_network_report(self.organizations, "Bench"), io.StringIO())
+
+    def time_network_report_1000_summary_last(self):
+        write_report(iter_network_report(self.organizations, "Bench", summary_first=False), io.StringIO())
+
+
+class ChartSuite:
+    def setup(self):
+        set_renderer(_uncached_renderer())
+        self.assessment = run_assessment(synthetic_answers(1)[0])
+
+    def time_render_radar_png(self):
+        pdf_generator._render_radar_png(self.assessment)
+
+    def time_render_bars_png(self):
+        pdf_generator._render_bars_png(self.assessment)
+
+    def time_render_regions_png(self):
+        pdf_generator._render_regions_png(self.assessment)
+
+    def time_render_competitive_png(self):
+        pdf_generator._render_competitive_png(self.assessment)
+
+
+class PdfSuite:
+    repeat = 3
+
+    def setup(self):
+        set_renderer(_uncached_renderer())
+        self.assessment = run_assessment(synthetic_answers(1)[0])
+
+    def time_generate_pdf(self):
+        pdf_generator.generate_pdf(self.assessment, org_name="Bench")
@@ -0,0 +1,54 @@
+"""
+bench_storage.py — Historique SQLite : insertion en lot, série temporelle et rangs centiles.
+"""
+
+import random
+import tempfile
+from pathlib import Path
+
+from config import ALL_DIMENSION_KEYS, GROWTH_TIERS
+from storage import AssessmentStore
+
+
+def _rows(n: int, orgs: int, seed: int = 0):
+    rng = random.Random(seed)
+    tiers = list(GROWTH_TIERS)
+    for i in range(n):
+        row = {
+            "id": i,
+            "org": f"org_{rng.randrange(orgs)}",
+            "created_at": 1_700_000_000 + i * 60,
+            "overall_score": rng.uniform(0, 100),
+            "tier": rng.choice(tiers),
+        }
+        row.update((f"{dim_key}_score", rng.uniform(0, 100)) for dim_key in ALL_DIMENSION_KEYS)
+        yield row
+
+
+class StorageSuite:
+    """200 000 évaluations de 2 000 organisations."""
+
+    n = 200_000
+    repeat = 3
+
+    def setup(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = AssessmentStore(str(Path(self.tmp.name) / "bench.sqlite3"))
+        self.store.add_many(_rows(self.n, 2_000))
+        self.batch = list(_rows(10_000, 2_000, seed=1))
+        self.row = self.store.latest("org_7")
+
+    def time_add_many_10000(self):
+        self.store.add_many(self.batch)
+
+    def time_org_history(self):
+        self.store.history("org_7")
+
+    def time_percentile(self):
+        self.store.percentile(62.5)
+
+    def time_peer_summary(self):
+        self.store.peer_summary(self.row)
+
+    def time_quantiles(self):
+        self.store.quantiles()
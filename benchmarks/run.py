@@ -0,0 +1,187 @@
+"""
+run.py — Exécute les benchmarks et écrit les résultats en JSON.
+
+Usage (depuis la racine du dépôt) :
+
+    python -m benchmarks.run -o bench_results.json
+    python -m benchmarks.run -k pdf --compare bench_baseline.json --threshold 1.5
+
+Chaque fichier ``benchmarks/bench_*.py`` contient des classes dont les
+méthodes ``time_*`` sont chronométrées après un ``setup()`` optionnel
+(même convention qu'asv). Avec ``--compare``, le code de sortie vaut 1 si
+une médiane dépasse ``threshold`` fois celle de la référence.
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+BENCH_DIR = Path(__file__).parent
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_THRESHOLD = 1.5
+TRACKED_PACKAGES = ("fpdf2", "fonttools", "kaleido", "plotly", "numpy", "pandas")
+
+
+def _iter_suites(name_filter: str = "") -> Iterator[Tuple[str, type, list]]:
+    """(préfixe, classe, méthodes time_*) pour chaque suite retenue par le filtre."""
+    for path in sorted(BENCH_DIR.glob("bench_*.py")):
+        module = importlib.import_module(f"benchmarks.{path.stem}")
+        for cls_name, cls in inspect.getmembers(module, inspect.isclass):
+            if cls.__module__ != module.__name__:
+                continue
+            prefix = f"{path.stem}.{cls_name}"
+            methods = [m for m in sorted(vars(cls)) if m.startswith("time_")]
+            methods = [m for m in methods if name_filter.lower() in f"{prefix}.{m}".lower()]
+            if methods:
+                yield prefix, cls, methods
+
+
+def _timed(fn: Callable[[], Any], number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    return time.perf_counter() - start
+
+
+def _measure(fn: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    """Calibre le nombre d'appels par échantillon (comme timeit), puis répète."""
+    fn()  # warm-up: imports, caches, kaleido/Chromium start
+    number = 1
+    for number in (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000):
+        first = _timed(fn, number)
+        if first >= min_time:
+            break
+    samples = [first / number] + [_timed(fn, number) / number for _ in range(repeat - 1)]
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": len(samples),
+    }
+
+
+def _error(exc: Exception) -> str:
+    # Keep multi-line messages (e.g. kaleido's Chrome hint) on one JSON/console line
+    return f"{type(exc).__name__}: {' '.join(str(exc).split())}"
+
+
+def _package_versions() -> Dict[str, Optional[str]]:
+    versions = {}
+    for name in TRACKED_PACKAGES:
+        try:
+            versions[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+
+def run_benchmarks(
+    name_filter: str = "",
+    repeat: int = DEFAULT_REPEAT,
+    min_time: float = DEFAULT_MIN_TIME,
+    progress: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+) -> Dict[str, Any]:
+    """Exécute les benchmarks et retourne le document JSON des résultats.
+
+    Un benchmark en échec (p. ex. kaleido sans Chrome) est consigné avec
+    son erreur au lieu d'interrompre la suite.
+    """
+    results: Dict[str, Dict[str, Any]] = {}
+    for prefix, cls, methods in _iter_suites(name_filter):
+        suite = cls()
+        suite_repeat = getattr(suite, "repeat", repeat)
+        try:
+            if hasattr(suite, "setup"):
+                suite.setup()
+            setup_error = None
+        except Exception as exc:
+            setup_error = _error(exc)
+        for method in methods:
+            name = f"{prefix}.{method}"
+            if setup_error:
+                result = {"error": setup_error}
+            else:
+                try:
+                    result = _measure(getattr(suite, method), suite_repeat, min_time)
+                except Exception as exc:
+                    result = {"error": _error(exc)}
+            results[name] = result
+            if progress:
+                progress(name, result)
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "processor": platform.processor() or platform.machine(),
+        },
+        "packages": _package_versions(),
+        "results": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> Dict[str, float]:
+    """Ratios médiane courante / référence au-delà du seuil (les régressions)."""
+    regressions = {}
+    for name, result in current["results"].items():
+        base = baseline.get("results", {}).get(name)
+        if not base or "median" not in base or "median" not in result or base["median"] <= 0:
+            continue
+        ratio = result["median"] / base["median"]
+        if ratio > threshold:
+            regressions[name] = ratio
+    return regressions
+
+
+def _format_seconds(seconds: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks Bellepros (évaluation, Markdown, PDF)")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="Fichier JSON des résultats")
+    parser.add_argument("-k", "--filter", default="", help="Ne garder que les benchmarks dont le nom contient ce texte")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Échantillons par benchmark")
+    parser.add_argument("--min-time", type=float, default=DEFAULT_MIN_TIME, help="Durée minimale d'un échantillon (s)")
+    parser.add_argument("--compare", metavar="BASELINE", help="Résultats JSON de référence")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Ratio de régression toléré")
+    args = parser.parse_args(argv)
+
+    def progress(name: str, result: Dict[str, Any]) -> None:
+        if "error" in result:
+            print(f"{name:<60} ERREUR  {result['error']}")
+        else:
+            print(f"{name:<60} {_format_seconds(result['median']):>10}  (×{result['number']})")
+
+    document = run_benchmarks(args.filter, args.repeat, args.min_time, progress)
+    Path(args.output).write_text(json.dumps(document, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"Résultats écrits dans {args.output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(baseline, document, args.threshold)
+        for name, ratio in sorted(regressions.items(), key=lambda item: -item[1]):
+            print(f"RÉGRESSION {name}: ×{ratio:.2f} vs {args.compare}")
+        if regressions:
+            return 1
+        print(f"Aucune régression au-delà de ×{args.threshold}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+synthetic.py — Jeux de réponses, sous-régions et points géographiques synthétiques pour les benchmarks.
+"""
+
+import random
+from typing import Any, Dict, List, Tuple
+
+from config import QUEBEC_REGIONS
+from questionnaire import QUESTIONS
+
+
+def synthetic_answers(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """N questionnaires complets et reproductibles (mêmes réponses à seed égal)."""
+    rng = random.Random(seed)
+    answers_list = []
+    for _ in range(n):
+        answers: Dict[str, Any] = {}
+        for q in QUESTIONS:
+            if q.answer_type == "scale":
+                answers[q.qid] = rng.randint(1, 5)
+            elif q.answer_type == "multi":
+                values = [opt["value"] for opt in q.options]
+                answers[q.qid] = rng.sample(values, rng.randint(0, len(values)))
+            else:
+                answers[q.qid] = rng.choice(q.options)["value"]
+        answers_list.append(answers)
+    return answers_list
+
+
+def synthetic_regions(n: int, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """N sous-régions au format de ``QUEBEC_REGIONS``, attributs tirés des régions réelles."""
+    rng = random.Random(seed)
+    densities = sorted({r["densite_qsr"] for r in QUEBEC_REGIONS.values()})
+    potentials = sorted({r["potentiel"] for r in QUEBEC_REGIONS.values()})
+    return {
+        f"sous_region_{i}": {
+            "name": f"Sous-région {i}",
+            "population": rng.randint(20_000, 400_000),
+            "densite_qsr": rng.choice(densities),
+            "loyer_moyen_pied2": round(rng.uniform(10.0, 35.0), 1),
+            "potentiel": rng.choice(potentials),
+            "notes": "",
+        }
+        for i in range(n)
+    }
+
+
+# Main urban centres, so synthetic points cluster like real ones
+_CITY_CENTRES = ((45.50, -73.57), (46.81, -71.21), (45.48, -75.70), (45.40, -71.89), (46.35, -72.55), (48.43, -71.07))
+
+
+def synthetic_points(n: int, spread_deg: float = 0.2, seed: int = 0) -> Tuple[List[float], List[float]]:
+    """(lat, lon) de N points répartis autour des grands centres urbains du Québec."""
+    rng = random.Random(seed)
+    lat, lon = [], []
+    for _ in range(n):
+        c_lat, c_lon = rng.choice(_CITY_CENTRES)
+        lat.append(rng.gauss(c_lat, spread_deg))
+        lon.append(rng.gauss(c_lon, spread_deg * 1.4))
+    return lat, lon
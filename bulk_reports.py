@@ -0,0 +1,181 @@
+"""
+bulk_reports.py — Génération massive de rapports PDF dans un pool de processus.
+
+Chaque processus garde ses polices et son moteur de rendu kaleido chauds ;
+les PDF terminés sont écrits au fil de l'eau dans un répertoire ou une
+archive ZIP. Un rapport en échec est consigné sans interrompre le lot.
+"""
+
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from batch import Record, iter_records, report_stem
+
+MAX_ERRORS_KEPT = 100
+
+
+def _init_worker() -> None:
+    """Prépare le processus : rendu local + polices chargées une fois."""
+    from chart_renderer import ChartRenderer, set_renderer
+    from pdf_generator import BelleprosPDF
+
+    # The worker is the render process: no nested pool, kaleido stays warm here
+    renderer = ChartRenderer(workers=0)
+    renderer.render_many([{"data": [], "layout": {"width": 10, "height": 10}}], return_exceptions=True)
+    set_renderer(renderer)
+    BelleprosPDF()
+
+
+def _build_pdf(record: Record, dims: Optional[List[str]]) -> Tuple[str, str, Optional[bytes], str]:
+    """(id, nom de fichier, PDF ou None, erreur) pour un répondant."""
+    from assessor import run_assessment
+    from pdf_generator import generate_pdf
+
+    respondent_id, org, answers, decode_error = record
+    filename = f"{report_stem(respondent_id)}.pdf"
+    if decode_error:
+        return respondent_id, filename, None, decode_error
+    try:
+        assessment = run_assessment(answers, dims)
+        return respondent_id, filename, bytes(generate_pdf(assessment, org_name=org)), ""
+    except Exception as exc:
+        return respondent_id, filename, None, f"{type(exc).__name__}: {exc}"
+
+
+class _PdfSink:
+    """Destination des PDF : répertoire, ou archive si le chemin finit par .zip."""
+
+    def __init__(self, output: str):
+        self.path = Path(output)
+        self._zip = None
+        if self.path.suffix.lower() == ".zip":
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # PDFs are already compressed: store them as-is
+            self._zip = zipfile.ZipFile(self.path, "w", compression=zipfile.ZIP_STORED)
+        else:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def write(self, filename: str, data: bytes) -> None:
+        if self._zip is not None:
+            self._zip.writestr(filename, data)
+        else:
+            (self.path / filename).write_bytes(data)
+
+    def close(self) -> None:
+        if self._zip is not None:
+            self._zip.close()
+
+
+def generate_reports_bulk(
+    records: Iterable[Record],
+    output: str,
+    workers: Optional[int] = None,
+    dims: Optional[List[str]] = None,
+    progress: Optional[Callable[[int, int, float], None]] = None,
+) -> Dict[str, Any]:
+    """Génère un PDF par répondant et retourne un résumé (débit, échecs).
+
+    ``progress(réussis, échoués, secondes)`` est appelé à chaque rapport.
+    Si un processus meurt (p. ex. plantage de Chromium), les rapports en
+    vol sont relancés un à un dans un processus isolé, puis le pool est
+    recréé : seul un rapport qui fait tomber ce processus à lui seul est
+    compté en échec.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = 2 * workers
+    sink = _PdfSink(output)
+    ok = failed = 0
+    errors: List[Dict[str, str]] = []
+    start = time.perf_counter()
+
+    def record_failure(respondent_id: str, error: str) -> None:
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_ERRORS_KEPT:
+            errors.append({"id": respondent_id, "error": error})
+
+    def record_result(respondent_id: str, filename: str, data: Optional[bytes], error: str) -> None:
+        nonlocal ok
+        if data is None:
+            record_failure(respondent_id, error)
+        else:
+            sink.write(filename, data)
+            ok += 1
+        if progress:
+            progress(ok, failed, time.perf_counter() - start)
+
+    def new_pool(size: int = workers) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=size, initializer=_init_worker)
+
+    def retry_alone(lost: List[Record]) -> None:
+        # One job at a time: a crash now can only come from that record
+        isolated = None
+        try:
+            for record in lost:
+                isolated = isolated or new_pool(1)
+                try:
+                    result = isolated.submit(_build_pdf, record, dims).result()
+                except BrokenProcessPool:
+                    isolated.shutdown(wait=False, cancel_futures=True)
+                    isolated = None
+                    result = (record[0], "", None, "BrokenProcessPool: processus de rendu interrompu")
+                record_result(*result)
+        finally:
+            if isolated is not None:
+                isolated.shutdown()
+
+    records = iter(records)
+    pool = new_pool()
+    pending: Dict[Future, Record] = {}
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < max_in_flight:
+                record = next(records, None)
+                if record is None:
+                    exhausted = True
+                    break
+                pending[pool.submit(_build_pdf, record, dims)] = record
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            lost = []
+            for future in done:
+                record = pending.pop(future)
+                try:
+                    result = future.result()
+                except BrokenProcessPool:
+                    lost.append(record)
+                    continue
+                record_result(*result)
+
+            if lost:
+                # Every in-flight job died with the pool: find the culprit, then restart
+                lost.extend(pending.values())
+                pending.clear()
+                pool.shutdown(wait=False, cancel_futures=True)
+                retry_alone(lost)
+                pool = new_pool()
+    finally:
+        pool.shutdown(cancel_futures=True)
+        sink.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "count": ok,
+        "failed": failed,
+        "errors": errors,
+        "elapsed": elapsed,
+        "docs_per_sec": ok / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def generate_reports_from_file(input_path: str, output: str, **kwargs: Any) -> Dict[str, Any]:
+    """Comme ``generate_reports_bulk``, à partir d'un fichier CSV/JSONL/Parquet."""
+    return generate_reports_bulk(iter_records(input_path), output, **kwargs)
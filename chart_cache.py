@@ -0,0 +1,170 @@
+"""
+chart_cache.py — Cache d'images de graphiques adressé par contenu.
+
+La clé est un hash SHA-256 de la spécification Plotly (données + mise en
+page) et du format : deux rapports aux graphiques identiques partagent la
+même image. Niveau mémoire LRU, plus un niveau disque optionnel plafonné.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+DEFAULT_MAX_ITEMS = 256
+DEFAULT_DISK_MAX_BYTES = 200 * 1024 * 1024
+
+
+def _json_default(value: Any) -> Any:
+    # numpy arrays / scalars that may appear in figure specs
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def chart_key(spec: Dict[str, Any], fmt: str = "png") -> str:
+    """Hash stable d'une spécification de figure et du format d'image."""
+    payload = json.dumps(spec, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(f"{fmt}:{payload}".encode("utf-8")).hexdigest()
+
+
+class ChartCache:
+    """LRU en mémoire + répertoire optionnel, éviction par taille totale."""
+
+    def __init__(
+        self,
+        max_items: int = DEFAULT_MAX_ITEMS,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = DEFAULT_DISK_MAX_BYTES,
+    ):
+        self.max_items = max_items
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(p.stat().st_size for p in self.disk_dir.glob("*/*.img"))
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.img"
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return data
+        data = self._disk_get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        with self._lock:
+            self._remember(key, data)
+        self._disk_put(key, data)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _remember(self, key: str, data: bytes) -> None:
+        self._items[key] = data
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_items:
+            self._items.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        if self.disk_dir is None:
+            return None
+        path = self._disk_path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mtime doubles as the disk tier's LRU clock
+        except OSError:
+            return None
+        return data
+
+    def _disk_put(self, key: str, data: bytes) -> None:
+        if self.disk_dir is None or len(data) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        if path.exists():
+            return
+        try:
+            path.parent.mkdir(exist_ok=True)
+            # Write-then-rename so readers in other processes never see partial files
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes += len(data)
+            over = self._disk_bytes > self.disk_max_bytes
+        if over:
+            self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        entries = []
+        for path in self.disk_dir.glob("*/*.img"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% of the cap so we don't rescan on every put
+        target = self.disk_max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                pass
+        with self._lock:
+            self._disk_bytes = total
+
+
+_cache: Optional[ChartCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ChartCache:
+    """Cache partagé ; ``BELLEPROS_CHART_CACHE_DIR`` active le niveau disque."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            disk_max_mb = os.environ.get("BELLEPROS_CHART_CACHE_MAX_MB")
+            _cache = ChartCache(
+                disk_dir=os.environ.get("BELLEPROS_CHART_CACHE_DIR") or None,
+                disk_max_bytes=int(float(disk_max_mb) * 1024 * 1024) if disk_max_mb else DEFAULT_DISK_MAX_BYTES,
+            )
+        return _cache
+
+
+def set_cache(cache: Optional[ChartCache]) -> None:
+    """Remplace le cache partagé (``None`` = recréé au prochain usage)."""
+    global _cache
+    with _cache_lock:
+        _cache = cache
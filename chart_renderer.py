@@ -0,0 +1,189 @@
+"""
+chart_renderer.py — Pool de rendu Plotly → PNG, gardé chaud entre les requêtes.
+
+Chaque processus du pool démarre kaleido une seule fois (Chromium pour
+kaleido >= 1.0) puis réutilise ce moteur pour tous les graphiques suivants.
+"""
+
+import atexit
+import multiprocessing as mp
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from chart_cache import ChartCache, chart_key, get_cache
+from tracing import span
+
+DEFAULT_WORKERS = 4
+DEFAULT_TIMEOUT = 45.0
+
+
+class RenderError(RuntimeError):
+    """Le rendu d'un graphique a échoué ou a dépassé le délai."""
+
+
+def _warm_up() -> None:
+    """Initialise kaleido dans le processus courant (initializer du pool)."""
+    try:
+        import kaleido
+        # kaleido >= 1.0 keeps one Chromium alive instead of one per image
+        start_server = getattr(kaleido, "start_sync_server", None)
+        if start_server is not None:
+            # Fails fast when Chrome is missing, where the server would hang
+            kaleido.Kaleido()
+            start_server(silence_warnings=True)
+        # kaleido 0.2 starts its subprocess lazily on the first export
+        _render_spec({"data": [], "layout": {"width": 10, "height": 10}}, "png")
+    except Exception:
+        # A cold worker is still usable; real errors surface on render
+        pass
+
+
+def _render_spec(spec: Dict[str, Any], fmt: str) -> bytes:
+    import plotly.io as pio
+    return pio.to_image(spec, format=fmt)
+
+
+class ChartRenderer:
+    """Pool de processus de rendu avec délai d'expiration et redémarrage.
+
+    ``workers=0`` rend les graphiques dans le processus courant (utile dans
+    un processus déjà dédié au rendu, p. ex. un worker de génération PDF).
+    Sans ``cache`` explicite, le cache partagé de ``chart_cache`` est utilisé.
+    """
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: Optional[ChartCache] = None,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.cache = cache
+        self._pool = None
+        self._lock = threading.Lock()
+        self._warm = False
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                ctx = mp.get_context("spawn")
+                self._pool = ctx.Pool(self.workers, initializer=_warm_up)
+            return self._pool
+
+    def restart(self) -> None:
+        """Termine les processus (bloqués ou morts) et repart à neuf."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    def render_many(
+        self,
+        figs: Sequence[Any],
+        fmt: str = "png",
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """Rend plusieurs figures en parallèle, dans l'ordre donné.
+
+        Avec ``return_exceptions=True``, un graphique en échec donne son
+        exception à sa position au lieu d'interrompre tout le lot.
+        """
+        with span("charts.render", figures=len(figs), fmt=fmt) as render_span:
+            specs = [fig.to_dict() if hasattr(fig, "to_dict") else fig for fig in figs]
+            # Identical figures are served from the content-addressed cache
+            cache = self.cache if self.cache is not None else get_cache()
+            keys = [chart_key(spec, fmt) for spec in specs]
+            results: List[Any] = [cache.get(key) for key in keys]
+            missing = [i for i, data in enumerate(results) if data is None]
+            render_span.set(cache_hits=len(specs) - len(missing))
+            if missing:
+                render = self._render_inline if self.workers == 0 else self._render_pool
+                rendered = render([specs[i] for i in missing], fmt, return_exceptions)
+                for i, data in zip(missing, rendered):
+                    results[i] = data
+                    if isinstance(data, bytes):
+                        cache.put(keys[i], data)
+            return results
+
+    def _render_pool(self, specs: List[Dict[str, Any]], fmt: str, return_exceptions: bool) -> List[Any]:
+        pool = self._get_pool()
+        pending = [pool.apply_async(_render_spec, (spec, fmt)) for spec in specs]
+        deadline = time.monotonic() + self.timeout
+        results: List[Any] = []
+        timed_out = False
+        for job in pending:
+            try:
+                results.append(job.get(timeout=max(deadline - time.monotonic(), 0)))
+            except mp.TimeoutError:
+                # A hung or crashed worker never answers: recycle the pool
+                timed_out = True
+                err = RenderError(f"Rendu {fmt} expiré après {self.timeout:.0f}s")
+                if not return_exceptions:
+                    self.restart()
+                    raise err
+                results.append(err)
+            except Exception as exc:
+                if not return_exceptions:
+                    raise RenderError(str(exc)) from exc
+                results.append(exc)
+        if timed_out:
+            self.restart()
+        return results
+
+    def _render_inline(self, specs: List[Dict[str, Any]], fmt: str, return_exceptions: bool) -> List[Any]:
+        if not self._warm:
+            _warm_up()
+            self._warm = True
+        results: List[Any] = []
+        for spec in specs:
+            try:
+                with span("charts.kaleido", fmt=fmt):
+                    results.append(_render_spec(spec, fmt))
+            except Exception as exc:
+                if not return_exceptions:
+                    raise RenderError(str(exc)) from exc
+                results.append(exc)
+        return results
+
+
+_renderer: Optional[ChartRenderer] = None
+_renderer_lock = threading.Lock()
+
+
+def get_renderer() -> ChartRenderer:
+    """Renderer partagé par le processus, créé au premier usage."""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ChartRenderer()
+        return _renderer
+
+
+def set_renderer(renderer: ChartRenderer) -> None:
+    """Remplace le renderer partagé (p. ex. ``ChartRenderer(workers=0)``)."""
+    global _renderer
+    with _renderer_lock:
+        previous, _renderer = _renderer, renderer
+    if previous is not None and previous is not renderer:
+        previous.shutdown()
+
+
+@atexit.register
+def _shutdown_renderer() -> None:
+    # One hook for the process: replaced renderers are shut down by set_renderer
+    if _renderer is not None:
+        _renderer.shutdown()
+
+
+def render_many(figs: Sequence[Any], fmt: str = "png", return_exceptions: bool = False) -> List[Any]:
+    return get_renderer().render_many(figs, fmt, return_exceptions=return_exceptions)
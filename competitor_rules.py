@@ -0,0 +1,163 @@
+"""
+competitor_rules.py — Moteur de règles concurrentielles précompilé.
+
+Les règles de ``config.COMPETITOR_RULES`` (réponse du répondant ×
+attribut du concurrent → hausse de vulnérabilité + opportunité) sont
+compilées une fois en tableaux : matrice règle × concurrent des hausses,
+textes d'opportunité déjà formatés. Une analyse se réduit alors à
+évaluer chaque règle sur les réponses puis à cumuler les effets des
+règles actives ; en lot, une colonne par règle et un produit matriciel
+répondants × règles × concurrents.
+"""
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from config import COMPETITOR_RULES, COMPETITORS
+from scoring_schema import SCHEMA, Schema
+
+BASE_VULNERABILITY = 50
+MAX_VULNERABILITY = 100
+
+
+def _matches(value: Any, accepted: Sequence[Any]) -> bool:
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return any(v in accepted for v in value)
+    return value in accepted
+
+
+class CompetitorRules:
+    """Règles compilées contre une liste de concurrents."""
+
+    def __init__(
+        self,
+        competitors: Optional[Mapping[str, Mapping[str, Any]]] = None,
+        rules: Optional[Sequence[Mapping[str, Any]]] = None,
+        schema: Optional[Schema] = None,
+    ):
+        competitors = COMPETITORS if competitors is None else competitors
+        rules = COMPETITOR_RULES if rules is None else rules
+        schema = schema or SCHEMA
+
+        self.keys: List[str] = list(competitors)
+        # Competitor fields copied into every analysis row
+        self.rows = [
+            {
+                "name": comp["name"],
+                "unites_qc": comp["unites_qc"],
+                "force": comp["force"],
+                "faiblesse": comp["faiblesse"],
+                "niveau_menace": comp["niveau_menace"],
+            }
+            for comp in competitors.values()
+        ]
+
+        problems = []
+        # (qid, value, is_multi) per rule; None for rules that always apply
+        self.conditions: List[Optional[tuple]] = []
+        applies = np.zeros((len(rules), len(self.keys)), dtype=bool)
+        self.deltas = np.array([rule["vulnerabilite"] for rule in rules], dtype=np.int64)
+        self.opportunities: List[List[Optional[str]]] = []
+        for r, rule in enumerate(rules):
+            when = rule.get("reponse")
+            if when is None:
+                self.conditions.append(None)
+            else:
+                qid, value = when
+                if qid not in schema:
+                    problems.append(f"règle {r + 1} : question inconnue {qid}")
+                elif value not in schema[qid].bits:
+                    problems.append(f"règle {r + 1} : option {value!r} absente de {qid}")
+                self.conditions.append((qid, value, qid in schema and schema[qid].answer_type == "multi"))
+            texts = []
+            for c, comp in enumerate(competitors.values()):
+                applies[r, c] = all(
+                    _matches(comp.get(attribute), accepted)
+                    for attribute, accepted in rule["concurrent"].items()
+                )
+                texts.append(rule["opportunite"].format(**comp) if applies[r, c] else None)
+            self.opportunities.append(texts)
+        if problems:
+            raise ValueError("Règles concurrentielles invalides :\n- " + "\n- ".join(problems))
+
+        self.applies = applies
+        # Vulnerability added by each rule to each competitor
+        self.impact = applies * self.deltas[:, None]
+        # Per rule, (competitor, delta, text) for the competitors it applies to:
+        # a single analysis only walks the rules that fired
+        self._effects = [
+            [(c, int(self.deltas[r]), self.opportunities[r][c]) for c in np.flatnonzero(applies[r]).tolist()]
+            for r in range(len(rules))
+        ]
+
+    # -- rule triggers --------------------------------------------------------
+
+    def triggers(self, answers: Mapping[str, Any]) -> List[int]:
+        """Indices des règles actives pour un répondant (même sémantique que ``==`` / ``in``)."""
+        fired = []
+        for r, cond in enumerate(self.conditions):
+            if cond is not None:
+                qid, value, is_multi = cond
+                if not (value in answers.get(qid, ()) if is_multi else answers.get(qid) == value):
+                    continue
+            fired.append(r)
+        return fired
+
+    def triggers_batch(self, answers_list: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Règles actives, une ligne par répondant ; une réponse malformée ne déclenche rien."""
+        fired = np.empty((len(answers_list), len(self.conditions)), dtype=bool)
+        for r, cond in enumerate(self.conditions):
+            if cond is None:
+                fired[:, r] = True
+                continue
+            qid, value, is_multi = cond
+            if is_multi:
+                column = [answers.get(qid, ()) for answers in answers_list]
+                fired[:, r] = [isinstance(a, (list, tuple, set, frozenset)) and value in a for a in column]
+            else:
+                fired[:, r] = [answers.get(qid) == value for answers in answers_list]
+        return fired
+
+    # -- scoring --------------------------------------------------------------
+
+    def vulnerability(self, fired: np.ndarray) -> np.ndarray:
+        """Vulnérabilité par concurrent (dernier axe) pour des règles actives."""
+        return np.minimum(BASE_VULNERABILITY + fired.astype(np.int64) @ self.impact, MAX_VULNERABILITY)
+
+    def analysis(self, fired: Sequence[int]) -> List[Dict[str, Any]]:
+        """Lignes d'analyse triées par vulnérabilité décroissante, pour les règles ``fired``."""
+        vulnerability = [BASE_VULNERABILITY] * len(self.keys)
+        opportunities: List[List[str]] = [[] for _ in self.keys]
+        for r in fired:
+            for c, delta, text in self._effects[r]:
+                vulnerability[c] += delta
+                opportunities[c].append(text)
+        vulnerability = [min(v, MAX_VULNERABILITY) for v in vulnerability]
+        order = sorted(range(len(self.keys)), key=lambda c: vulnerability[c], reverse=True)
+        return [
+            {
+                **self.rows[c],
+                "vulnerabilite": vulnerability[c],
+                "opportunites": opportunities[c],
+            }
+            for c in order
+        ]
+
+    def analyze(self, answers: Mapping[str, Any]) -> List[Dict[str, Any]]:
+        return self.analysis(self.triggers(answers))
+
+    def score_batch(self, answers_list: Sequence[Mapping[str, Any]]) -> Dict[str, Any]:
+        """Vulnérabilité de chaque concurrent pour chaque répondant, en une passe."""
+        fired = self.triggers_batch(answers_list)
+        vulnerability = self.vulnerability(fired)
+        return {
+            "competitors": self.keys,
+            "triggers": fired,
+            "vulnerability": vulnerability,
+            # First competitor in config order among the most vulnerable
+            "most_vulnerable": vulnerability.argmax(axis=1) if len(self.keys) else np.zeros(len(answers_list), dtype=np.intp),
+        }
+
+
+DEFAULT_RULES = CompetitorRules()
@@ -169,6 +169,7 @@ COMPETITORS = {
         "force": "Omniprésence, déjeuner, habitude café",
         "faiblesse": "Fatigue du menu, perception qualité en baisse",
         "niveau_menace": "Élevé",
+        "profil": ("qualite_en_baisse", "offre_generique"),
     },
     "mcdonalds": {
         "name": "McDonald's",
@@ -176,6 +177,7 @@ COMPETITORS = {
         "force": "Marque mondiale, investissement techno, uniformité",
         "faiblesse": "Pas 'local', prix en hausse",
         "niveau_menace": "Élevé",
+        "profil": ("marque_internationale", "offre_generique"),
     },
     "subway": {
         "name": "Subway",
@@ -183,6 +185,7 @@ COMPETITORS = {
         "force": "Nombre d'unités, faible coût de franchise",
         "faiblesse": "Déclin de la marque, fermetures en série",
         "niveau_menace": "Moyen",
+        "profil": ("marque_internationale", "qualite_en_baisse", "offre_generique"),
     },
     "st_hubert": {
         "name": "St-Hubert",
@@ -190,6 +193,7 @@ COMPETITORS = {
         "force": "Icône québécoise, salle à manger + livraison, niche rôtisserie",
         "faiblesse": "Prix plus élevé, service plus lent",
         "niveau_menace": "Moyen",
+        "profil": (),
     },
     "valentine": {
         "name": "Valentine",
@@ -197,6 +201,7 @@ COMPETITORS = {
         "force": "Nostalgie québécoise, patrimoine hot-dog + poutine",
         "faiblesse": "Marque vieillissante, peu d'innovation",
         "niveau_menace": "Moyen",
+        "profil": ("en_declin",),
     },
     "ashton": {
         "name": "Ashton",
@@ -204,6 +209,7 @@ COMPETITORS = {
         "force": "Culte à Québec, roi de la poutine",
         "faiblesse": "Régional seulement, pas de modèle franchise",
         "niveau_menace": "Faible (régional)",
+        "profil": (),
     },
     "dic_anns": {
         "name": "Dic Ann's",
@@ -211,6 +217,7 @@ COMPETITORS = {
         "force": "Classique culte montréalais, burgers pas chers",
         "faiblesse": "Minuscule empreinte, pas d'ambition de croissance",
         "niveau_menace": "Faible (régional)",
+        "profil": (),
     },
     "aw": {
         "name": "A&W",
@@ -218,6 +225,7 @@ COMPETITORS = {
         "force": "Positionnement qualité, boeuf sans hormones, bon branding",
         "faiblesse": "Empreinte plus petite, moins québécois",
         "niveau_menace": "Moyen-Élevé",
+        "profil": ("marque_internationale",),
     },
     "harveys": {
         "name": "Harvey's",
@@ -225,9 +233,52 @@ COMPETITORS = {
         "force": "Burgers personnalisables, marque canadienne",
         "faiblesse": "Pertinence en déclin, moins de points de vente",
         "niveau_menace": "Faible",
+        "profil": ("qualite_en_baisse", "en_declin"),
     },
 }
 
+# ---------------------------------------------------------------------------
+# Règles concurrentielles — réponse du répondant × attribut du concurrent
+#
+# "reponse" : (question, valeur) — égalité, ou appartenance pour un choix
+# multiple ; None = règle toujours active.
+# "concurrent" : {attribut: valeurs acceptées} — pour un attribut liste
+# (p. ex. "profil"), une valeur commune suffit.
+# L'opportunité est formatée avec les champs du concurrent ({name}, ...).
+# ---------------------------------------------------------------------------
+COMPETITOR_RULES = [
+    {
+        "reponse": ("positionnement_prix", "valeur"),
+        "concurrent": {"niveau_menace": ("Élevé", "Moyen-Élevé")},
+        "vulnerabilite": 10,
+        "opportunite": "Positionnement valeur vs {name} en hausse de prix",
+    },
+    {
+        "reponse": ("differenciateur", "identite_qc"),
+        "concurrent": {"profil": ("marque_internationale",)},
+        "vulnerabilite": 15,
+        "opportunite": "Identité québécoise authentique vs {name} (marque internationale)",
+    },
+    {
+        "reponse": ("differenciateur", "qualite"),
+        "concurrent": {"profil": ("qualite_en_baisse",)},
+        "vulnerabilite": 15,
+        "opportunite": "Qualité supérieure vs {name} ({faiblesse})",
+    },
+    {
+        "reponse": ("differenciateur", "menu_unique"),
+        "concurrent": {"profil": ("offre_generique",)},
+        "vulnerabilite": 10,
+        "opportunite": "Menu distinctif vs l'offre générique de {name}",
+    },
+    {
+        "reponse": None,
+        "concurrent": {"profil": ("en_declin",)},
+        "vulnerabilite": 10,
+        "opportunite": "{name} en déclin — territoire à prendre",
+    },
+]
+
 # ---------------------------------------------------------------------------
 # Niveaux de croissance
 # ---------------------------------------------------------------------------
@@ -0,0 +1,268 @@
+"""
+expansion_optimizer.py — Plan d'ouverture pluriannuel sous contrainte de budget.
+
+Chaque région offre une suite d'unités possibles : la k-ième unité vaut le
+score d'adéquation de la région (``assessor._region_scores``) diminué par la
+saturation du marché (population, densité QSR), et coûte un investissement
+qui dépend du loyer au pied carré. Une unité ouverte tôt rapporte plus
+longtemps : sa valeur est pondérée par les années d'exploitation restantes
+(actualisées).
+
+Année après année, un sac à dos exact (programmation dynamique numpy sur
+le budget discrétisé et le nombre d'ouvertures) choisit les unités ; le
+budget non dépensé est reporté. Une borne supérieure par relaxation
+fractionnaire mesure l'écart à l'optimum. 10 régions × 5 ans se résolvent
+en quelques millisecondes, plusieurs centaines de sous-régions en moins
+d'une seconde.
+"""
+
+import heapq
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from assessor import _as_market, _region_scores
+from market_data import DEFAULT_LEVEL, MarketData
+from tracing import traced
+
+# ---------------------------------------------------------------------------
+# Hypothèses économiques (par unité)
+# ---------------------------------------------------------------------------
+UNIT_CAPEX = 550_000          # aménagement + équipement, $
+UNIT_SURFACE_PI2 = 2_200      # surface type d'une unité, pi²
+LEASE_YEARS_UPFRONT = 1       # loyer engagé à la signature (dépôt + mesures incitatives)
+POPULATION_PER_UNIT = 40_000  # population qu'une unité dessert dans un marché vierge
+CAPEX_STEP = 10_000           # résolution du budget dans le sac à dos, $
+MAX_BUDGET_CELLS = 2_000      # au-delà, le pas est élargi pour borner la mémoire
+
+DEFAULT_ANNUAL_BUDGET = 2_000_000
+DEFAULT_YEARS = 5
+DEFAULT_MAX_OPENINGS = 3
+DEFAULT_DISCOUNT_RATE = 0.08
+
+# Share of the market left to a new entrant, by QSR density
+SATURATION = {
+    "Très faible": 1.0,
+    "Faible": 0.9,
+    "Faible-Moyen": 0.8,
+    "Moyen": 0.7,
+    "Moyen-Élevé": 0.55,
+    "Élevée": 0.45,
+    "Très élevée": 0.3,
+}
+DEFAULT_SATURATION = 0.6
+
+
+def unit_capex(market: MarketData) -> np.ndarray:
+    """Investissement d'ouverture d'une unité, par territoire."""
+    return UNIT_CAPEX + market.loyer * (UNIT_SURFACE_PI2 * LEASE_YEARS_UPFRONT)
+
+
+def market_capacity(market: MarketData) -> np.ndarray:
+    """Nombre d'unités que chaque marché peut absorber (au moins une)."""
+    share = market.lookup("densite_qsr", SATURATION, DEFAULT_SATURATION)
+    return np.maximum(1, (market.population * share / POPULATION_PER_UNIT).astype(np.int64))
+
+
+def year_weights(years: int, discount_rate: float = DEFAULT_DISCOUNT_RATE) -> np.ndarray:
+    """Poids d'une unité ouverte l'année y : années d'exploitation restantes, actualisées."""
+    discount = (1.0 + discount_rate) ** -np.arange(years)
+    return np.cumsum(discount[::-1])[::-1]
+
+
+# ---------------------------------------------------------------------------
+# Candidate units
+# ---------------------------------------------------------------------------
+
+def candidate_rows(market: MarketData, level: Optional[str] = None) -> np.ndarray:
+    """Territoires candidats, tous d'un même niveau.
+
+    A region and its municipalities cover the same population: mixing
+    levels would count that market twice. Without ``level``, the
+    ``region`` level is used when the data holds several.
+    """
+    levels = market.levels()
+    if level is None:
+        if len(levels) == 1:
+            return market.rows()
+        level = DEFAULT_LEVEL if DEFAULT_LEVEL in levels else levels[0]
+    rows = market.rows(level=level)
+    if not len(rows):
+        raise ValueError(f"Aucun territoire de niveau {level!r} (niveaux : {', '.join(levels)})")
+    return rows
+
+
+class _Units:
+    """Toutes les unités possibles, à plat : région, rang, valeur annuelle, coût."""
+
+    def __init__(self, market: MarketData, fit_scores: np.ndarray, rows: np.ndarray):
+        self.rows = rows
+        self.keys = [market.keys[r] for r in rows.tolist()]
+        self.names = [market.names[r] for r in rows.tolist()]
+        self.capacity = market_capacity(market)[rows]
+        self.capex = unit_capex(market)[rows]
+        fit_scores = fit_scores[rows]
+
+        # k-th unit of a region: fit * (1 - k / (capacity + 1)), decreasing in k
+        self.region = np.repeat(np.arange(len(self.keys)), self.capacity)
+        starts = np.cumsum(self.capacity) - self.capacity
+        self.rank = np.arange(len(self.region)) - np.repeat(starts, self.capacity)
+        self.value = fit_scores[self.region] * (1.0 - self.rank / (self.capacity[self.region] + 1.0))
+        self.cost = self.capex[self.region]
+
+
+def _undominated(value: np.ndarray, weights: np.ndarray, items: np.ndarray, max_items: int) -> np.ndarray:
+    """Retire les éléments dont ``max_items`` autres sont à la fois moins chers et meilleurs."""
+    order = items[np.lexsort((-value[items], weights[items]))]
+    top: List[float] = []  # min-heap of the best values seen at lower or equal cost
+    kept = []
+    for item in order:
+        v = value[item]
+        if len(top) == max_items and top[0] >= v:
+            continue
+        kept.append(item)
+        if len(top) < max_items:
+            heapq.heappush(top, v)
+        else:
+            heapq.heapreplace(top, v)
+    return np.sort(np.array(kept, dtype=np.int64))
+
+
+def _knapsack(value: np.ndarray, cost: np.ndarray, budget: float, max_items: int) -> np.ndarray:
+    """Indices maximisant la valeur sous ``budget`` avec au plus ``max_items`` éléments."""
+    step = max(CAPEX_STEP, budget / MAX_BUDGET_CELLS)
+    cells = int(budget // step)
+    # Costs round up: a plan never exceeds the real budget
+    weights = np.ceil(cost / step).astype(np.int64)
+    if cells <= 0 or max_items <= 0:
+        return np.empty(0, dtype=np.int64)
+    fits = _undominated(value, weights, np.flatnonzero((weights <= cells) & (value > 0)), max_items)
+    if not len(fits):
+        return np.empty(0, dtype=np.int64)
+
+    best = np.zeros((max_items + 1, cells + 1))
+    keep = np.zeros((len(fits), max_items + 1, cells + 1), dtype=bool)
+    for i, item in enumerate(fits):
+        w, v = weights[item], value[item]
+        candidate = best[:-1, : cells + 1 - w] + v
+        improved = candidate > best[1:, w:]
+        keep[i, 1:, w:] = improved
+        best[1:, w:] = np.where(improved, candidate, best[1:, w:])
+
+    chosen = []
+    n, b = max_items, cells
+    for i in range(len(fits) - 1, -1, -1):
+        if n and keep[i, n, b]:
+            chosen.append(fits[i])
+            n -= 1
+            b -= weights[fits[i]]
+    return np.array(chosen[::-1], dtype=np.int64)
+
+
+def _fractional_bound(value: np.ndarray, cost: np.ndarray, budget: float, max_items: int) -> float:
+    """Borne supérieure : min des relaxations fractionnaires par budget et par nombre."""
+    order = np.argsort(-value / cost, kind="stable")
+    cum_cost = np.cumsum(cost[order])
+    cum_value = np.cumsum(value[order])
+    whole = int(np.searchsorted(cum_cost, budget, side="right"))
+    by_budget = cum_value[whole - 1] if whole else 0.0
+    if whole < len(order):
+        spent = cum_cost[whole - 1] if whole else 0.0
+        by_budget += value[order[whole]] * (budget - spent) / cost[order[whole]]
+    by_count = np.sort(value)[::-1][:max_items].sum()
+    return float(min(by_budget, by_count))
+
+
+# ---------------------------------------------------------------------------
+# Optimizer
+# ---------------------------------------------------------------------------
+
+@traced("expansion.optimize")
+def optimize_expansion(
+    answers: Dict[str, Any],
+    annual_budget: float = DEFAULT_ANNUAL_BUDGET,
+    years: int = DEFAULT_YEARS,
+    max_openings_per_year: int = DEFAULT_MAX_OPENINGS,
+    regions: Union[None, MarketData, Dict[str, Dict[str, Any]]] = None,
+    discount_rate: float = DEFAULT_DISCOUNT_RATE,
+    carry_over: bool = True,
+    level: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Calendrier d'ouvertures maximisant le score attendu sous contrainte de budget.
+
+    ``regions`` : données de marché (``market_data.get_market_data()`` par
+    défaut) ou dict au format de ``config.QUEBEC_REGIONS`` ; des centaines
+    de sous-régions restent sous la seconde. Le score attendu est la somme,
+    sur les unités ouvertes, de leur valeur annuelle × années
+    d'exploitation actualisées restantes dans l'horizon. ``level`` : niveau
+    des territoires candidats (``region`` par défaut si plusieurs niveaux).
+    """
+    if years < 1:
+        raise ValueError("L'horizon doit compter au moins une année")
+    if annual_budget < 0 or max_openings_per_year < 0:
+        raise ValueError("Budget et nombre d'ouvertures doivent être positifs")
+    market = _as_market(regions)
+    units = _Units(market, _region_scores(answers, market)[0], candidate_rows(market, level))
+    weights = year_weights(years, discount_rate)
+
+    opened = np.zeros(len(units.keys), dtype=np.int64)
+    schedule = []
+    expected = total_capex = 0.0
+    carried = 0.0
+    for year in range(years):
+        available = annual_budget + carried
+        # Only the next units of each region can open this year: within a
+        # region values decrease and costs are equal, so prefixes are optimal
+        ahead = units.rank - opened[units.region]
+        pool = np.flatnonzero((ahead >= 0) & (ahead < max_openings_per_year))
+        picked = pool[_knapsack(units.value[pool], units.cost[pool], available, max_openings_per_year)]
+        np.add.at(opened, units.region[picked], 1)
+
+        spent = float(units.cost[picked].sum())
+        openings = [
+            {
+                "region": units.keys[units.region[i]],
+                "name": units.names[units.region[i]],
+                "unit": int(units.rank[i]) + 1,
+                "capex": float(units.cost[i]),
+                "value": float(units.value[i]),
+            }
+            for i in sorted(picked, key=lambda i: -units.value[i])
+        ]
+        expected += float(units.value[picked].sum()) * weights[year]
+        total_capex += spent
+        carried = available - spent if carry_over else 0.0
+        schedule.append({
+            "year": year + 1,
+            "budget": available,
+            "capex": spent,
+            "carry_over": carried,
+            "openings": openings,
+        })
+
+    # Units opened by year y fit in the cumulative budget and openings of
+    # years 1..y, and total value telescopes over the weight decrements
+    increments = weights - np.append(weights[1:], 0.0)
+    upper = 0.0
+    for year in range(years):
+        upper += increments[year] * _fractional_bound(
+            units.value, units.cost, annual_budget * (year + 1), max_openings_per_year * (year + 1)
+        )
+
+    return {
+        "schedule": schedule,
+        "units_by_region": {units.keys[j]: int(n) for j, n in enumerate(opened) if n},
+        "total_units": int(opened.sum()),
+        "total_capex": total_capex,
+        "expected_score": expected,
+        "upper_bound": upper,
+        "gap": max(0.0, 1.0 - expected / upper) if upper > 0 else 0.0,
+        "params": {
+            "annual_budget": annual_budget,
+            "years": years,
+            "max_openings_per_year": max_openings_per_year,
+            "discount_rate": discount_rate,
+            "carry_over": carry_over,
+            "regions": len(units.keys),
+        },
+    }
@@ -0,0 +1,406 @@
+"""
+job_queue.py — File locale de rapports PDF (SQLite + fichiers, sans courtier externe).
+
+``submit`` enregistre la demande et retourne aussitôt un identifiant ; des
+processus de travail réclament les tâches une à une (transaction
+exclusive), écrivent le PDF dans ``results/`` et marquent la tâche
+terminée. Une demande identique à une tâche en attente, en cours ou
+terminée retourne la même tâche. Les résultats sont évincés au-delà d'un
+âge ou d'une taille totale. Pendant le rendu, le processus de travail
+signale qu'il est vivant (``heartbeat_at``) : seule une tâche dont le
+signal s'est tu est relancée, une fois ; un rendu lent n'est jamais
+dédoublé.
+
+Le répertoire est désigné par ``BELLEPROS_JOBS_DIR`` (``.bellepros_jobs``
+par défaut).
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+JOBS_DIR_ENV = "BELLEPROS_JOBS_DIR"
+DEFAULT_JOBS_DIR = ".bellepros_jobs"
+DEFAULT_WORKERS = 1
+DEFAULT_MAX_AGE = 24 * 3600          # finished jobs kept one day
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+HEARTBEAT_INTERVAL = 5.0             # seconds between "still rendering" updates
+HEARTBEAT_TIMEOUT = 60.0             # a running job silent this long lost its worker
+MAX_ATTEMPTS = 2
+POLL_INTERVAL = 0.2
+EVICT_INTERVAL = 60.0
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker INTEGER,
+    heartbeat_at REAL,
+    result_size INTEGER NOT NULL DEFAULT 0,
+    error TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key);
+"""
+
+_COLUMNS = ("id", "key", "status", "attempts", "created_at", "started_at", "finished_at", "result_size", "error")
+
+
+def payload_key(payload: Dict[str, Any]) -> str:
+    """Empreinte de la forme canonique d'une demande."""
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class JobQueue:
+    """File de tâches partagée entre processus via un fichier SQLite."""
+
+    def __init__(
+        self,
+        directory: str = DEFAULT_JOBS_DIR,
+        max_age: float = DEFAULT_MAX_AGE,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = Path(directory)
+        self.results_dir = self.directory / "results"
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(self.directory / "jobs.sqlite3"), timeout=30.0, check_same_thread=False, isolation_level=None,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA_SQL)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "heartbeat_at" not in existing:  # queue directory from an earlier version
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+        self._last_evict = 0.0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _result_path(self, job_id: str) -> Path:
+        return self.results_dir / f"{job_id}.pdf"
+
+    def _row(self, row: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        return dict(zip(_COLUMNS, row)) if row else None
+
+    # -- clients ------------------------------------------------------------
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        """Met une demande en file et retourne son identifiant (ou celui d'une tâche identique)."""
+        key = payload_key(payload)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self._conn.execute(
+                    "SELECT id FROM jobs WHERE key = ? AND status != ? ORDER BY created_at DESC LIMIT 1",
+                    (key, FAILED),
+                ).fetchone()
+                if existing:
+                    job_id = existing[0]
+                else:
+                    job_id = uuid.uuid4().hex
+                    self._conn.execute(
+                        "INSERT INTO jobs (id, key, status, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                        (job_id, key, QUEUED, json.dumps(payload, ensure_ascii=False, default=str), time.time()),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """État d'une tâche (``None`` si inconnue ou évincée)."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row(row)
+
+    def result(self, job_id: str) -> Optional[bytes]:
+        """PDF d'une tâche terminée, sinon ``None``."""
+        job = self.status(job_id)
+        if job is None or job["status"] != DONE:
+            return None
+        try:
+            return self._result_path(job_id).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def position(self, job_id: str) -> int:
+        """Tâches en attente avant celle-ci (0 si elle est en cours ou terminée)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT count(*) FROM jobs WHERE status = ? AND created_at < "
+                "(SELECT created_at FROM jobs WHERE id = ? AND status = ?)",
+                (QUEUED, job_id, QUEUED),
+            ).fetchone()
+        return row[0]
+
+    def jobs(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,),
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    # -- workers ------------------------------------------------------------
+
+    def claim(self, worker: int) -> Optional[Dict[str, Any]]:
+        """Réclame la plus ancienne tâche en attente (atomique entre processus).
+
+        ``attempt`` identifie cette exécution auprès de ``heartbeat``,
+        ``complete`` et ``fail``.
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ?, worker = ?, attempts = attempts + 1 "
+                    "WHERE id = (SELECT id FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1) "
+                    "RETURNING id, payload, attempts",
+                    (RUNNING, now, now, worker, QUEUED),
+                ).fetchone()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if row is None:
+            return None
+        return {"id": row[0], "payload": json.loads(row[1]), "attempt": row[2]}
+
+    def heartbeat(self, job_id: str, attempt: int) -> bool:
+        """Signale que le rendu est en cours ; ``False`` si la tâche n'est plus à nous."""
+        with self._lock:
+            return self._conn.execute(
+                "UPDATE jobs SET heartbeat_at = ? WHERE id = ? AND status = ? AND attempts = ?",
+                (time.time(), job_id, RUNNING, attempt),
+            ).rowcount > 0
+
+    def complete(self, job_id: str, data: bytes, attempt: Optional[int] = None) -> bool:
+        """Publie le PDF ; ``False`` (résultat écarté) si la tâche n'est plus à nous."""
+        # Written under a per-process temporary name: a reader never sees a
+        # partial PDF and two renders of one job never share a file
+        path = self._result_path(job_id)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        try:
+            return self._finish(job_id, DONE, len(data), "", attempt, publish=lambda: os.replace(tmp, path))
+        finally:
+            tmp.unlink(missing_ok=True)
+
+    def fail(self, job_id: str, error: str, attempt: Optional[int] = None) -> bool:
+        return self._finish(job_id, FAILED, 0, error, attempt)
+
+    def _finish(
+        self,
+        job_id: str,
+        status: str,
+        size: int,
+        error: str,
+        attempt: Optional[int] = None,
+        publish: Optional[Callable[[], None]] = None,
+    ) -> bool:
+        # With ``attempt``, a run whose job was reclaimed meanwhile changes
+        # nothing. ``publish`` runs inside the write transaction, once the row
+        # is known to be ours: no reclaim can slip between check and rename.
+        sql = "UPDATE jobs SET status = ?, finished_at = ?, result_size = ?, error = ? WHERE id = ?"
+        params: List[Any] = [status, time.time(), size, error, job_id]
+        if attempt is not None:
+            sql += " AND status = ? AND attempts = ?"
+            params += [RUNNING, attempt]
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                owned = self._conn.execute(sql, params).rowcount > 0
+                if owned and publish is not None:
+                    publish()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return owned
+
+    def requeue_stale(self, timeout: float = HEARTBEAT_TIMEOUT) -> int:
+        """Relance les tâches sans signal de vie depuis ``timeout`` ; échec après ``MAX_ATTEMPTS``.
+
+        A slow render keeps its heartbeat fresh and is left alone.
+        """
+        cutoff = time.time() - timeout
+        silent = "status = ? AND coalesce(heartbeat_at, started_at) < ?"
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                failed = self._conn.execute(
+                    f"UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE {silent} AND attempts >= ?",
+                    (FAILED, time.time(), "Processus de rendu interrompu", RUNNING, cutoff, MAX_ATTEMPTS),
+                ).rowcount
+                requeued = self._conn.execute(
+                    f"UPDATE jobs SET status = ?, started_at = NULL, heartbeat_at = NULL, worker = NULL WHERE {silent}",
+                    (QUEUED, RUNNING, cutoff),
+                ).rowcount
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return failed + requeued
+
+    def evict(self, now: Optional[float] = None) -> int:
+        """Supprime les tâches finies trop anciennes, puis les plus anciennes au-delà de ``max_bytes``."""
+        now = time.time() if now is None else now
+        with self._lock:
+            finished = self._conn.execute(
+                "SELECT id, finished_at, result_size FROM jobs WHERE status IN (?, ?) ORDER BY finished_at DESC",
+                (DONE, FAILED),
+            ).fetchall()
+            total = 0
+            evicted = []
+            for job_id, finished_at, size in finished:
+                total += size
+                if now - finished_at > self.max_age or total > self.max_bytes:
+                    evicted.append(job_id)
+            if evicted:
+                self._conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in evicted])
+            self._last_evict = now
+        for job_id in evicted:
+            self._result_path(job_id).unlink(missing_ok=True)
+        return len(evicted)
+
+    def maintain(self) -> None:
+        """Relance et éviction, au plus une fois par ``EVICT_INTERVAL``."""
+        if time.time() - self._last_evict >= EVICT_INTERVAL:
+            self.requeue_stale()
+            self.evict()
+
+
+# ---------------------------------------------------------------------------
+# Processus de travail
+# ---------------------------------------------------------------------------
+
+def render_pdf(payload: Dict[str, Any]) -> bytes:
+    """PDF d'une demande : {answers, dims, org, bands} (mêmes résultats que l'interface)."""
+    from assessor import run_assessment, run_monte_carlo
+    from pdf_generator import generate_pdf
+
+    answers, dims = payload["answers"], payload.get("dims") or None
+    assessment = run_assessment(answers, dims)
+    if payload.get("bands"):
+        # Same fixed seed as the app, so the PDF shows the bands on screen
+        assessment = {**assessment, "uncertainty": run_monte_carlo(answers, dims, seed=0)}
+    return bytes(generate_pdf(assessment, org_name=payload.get("org") or "Bellepros"))
+
+
+def run_worker(
+    directory: str = DEFAULT_JOBS_DIR,
+    stop: Optional[threading.Event] = None,
+    poll_interval: float = POLL_INTERVAL,
+    parent_pid: Optional[int] = None,
+) -> None:
+    """Vide la file jusqu'à ``stop`` (ou la disparition du processus parent)."""
+    from bulk_reports import _init_worker
+
+    _init_worker()
+    queue = JobQueue(directory)
+    worker = os.getpid()
+    try:
+        while not (stop is not None and stop.is_set()):
+            if parent_pid is not None and os.getppid() != parent_pid:
+                return
+            queue.maintain()
+            job = queue.claim(worker)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            rendering = threading.Event()
+            beat = threading.Thread(
+                target=_heartbeat, args=(queue, job["id"], job["attempt"], rendering), daemon=True,
+            )
+            beat.start()
+            try:
+                data = render_pdf(job["payload"])
+            except Exception as exc:  # one bad report must not stop the worker
+                data, error = None, f"{type(exc).__name__}: {exc}"
+            finally:
+                rendering.set()
+                beat.join()
+            if data is None:
+                queue.fail(job["id"], error, job["attempt"])
+            else:
+                queue.complete(job["id"], data, job["attempt"])
+    finally:
+        queue.close()
+
+
+def _heartbeat(queue: JobQueue, job_id: str, attempt: int, done: threading.Event) -> None:
+    while not done.wait(HEARTBEAT_INTERVAL):
+        try:
+            queue.heartbeat(job_id, attempt)
+        except sqlite3.Error:  # busy database: the next beat will do
+            pass
+
+
+def start_workers(directory: str, workers: int = DEFAULT_WORKERS) -> List[multiprocessing.Process]:
+    """Démarre ``workers`` processus démons (spawn : sûr depuis un serveur multithread)."""
+    context = multiprocessing.get_context("spawn")
+    processes = []
+    for _ in range(workers):
+        process = context.Process(
+            target=run_worker, kwargs={"directory": directory, "parent_pid": os.getpid()}, daemon=True,
+        )
+        process.start()
+        processes.append(process)
+    return processes
+
+
+# ---------------------------------------------------------------------------
+# File partagée du processus, avec ses processus de travail
+# ---------------------------------------------------------------------------
+
+_queue: Optional[JobQueue] = None
+_workers: List[multiprocessing.Process] = []
+_queue_lock = threading.Lock()
+
+
+def get_job_queue(workers: Optional[int] = None) -> JobQueue:
+    """File ``BELLEPROS_JOBS_DIR`` ; démarre ses processus de travail au premier usage.
+
+    ``BELLEPROS_JOBS_WORKERS=0`` laisse la file à des processus externes
+    (``python main.py worker``).
+    """
+    global _queue, _workers
+    with _queue_lock:
+        if _queue is None:
+            _queue = JobQueue(os.environ.get(JOBS_DIR_ENV) or DEFAULT_JOBS_DIR)
+        if workers is None:
+            workers = int(os.environ.get("BELLEPROS_JOBS_WORKERS", DEFAULT_WORKERS))
+        # Restart workers that died (e.g. Chromium crash taking the process down)
+        _workers = [p for p in _workers if p.is_alive()]
+        if len(_workers) < workers:
+            _workers += start_workers(str(_queue.directory), workers - len(_workers))
+        return _queue
+
+
+def set_job_queue(queue: Optional[JobQueue]) -> None:
+    """Remplace la file partagée (``None`` : réouverture au prochain usage)."""
+    global _queue
+    with _queue_lock:
+        _queue = queue
@@ -0,0 +1,26 @@
+"""
+lazy_imports.py — Modules lourds chargés au premier usage.
+
+``pd = lazy_module("pandas")`` coûte un objet vide à l'import ; pandas est
+réellement importé au premier attribut lu (``pd.DataFrame``). Les chemins
+qui n'en ont pas besoin (questionnaire, scoring, CLI) démarrent sans lui.
+"""
+
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Tient la place du module ``name`` jusqu'au premier attribut lu."""
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        # Later lookups hit the copied attributes and skip __getattr__
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """Le module s'il est déjà importé, sinon un substitut qui l'importera au premier usage."""
+    return sys.modules.get(name) or LazyModule(name)
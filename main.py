@@ -3,21 +3,279 @@ main.py — CLI pour la Console de Croissance Bellepros.
 """
 
 import argparse
+import csv
+import json
+import os
 from rich.console import Console
 from rich.table import Table
 from rich.panel import Panel
 
 from questionnaire import default_answers
 from assessor import run_assessment
-from report_generator import generate_report
+from report_generator import iter_network_report, iter_report, write_report
+from site_scoring import DEFAULT_DRIVE_MINUTES, DEFAULT_SPEED_KMH, PointSet, score_sites, site_row
+from expansion_optimizer import (
+    DEFAULT_ANNUAL_BUDGET, DEFAULT_DISCOUNT_RATE, DEFAULT_MAX_OPENINGS, DEFAULT_YEARS, optimize_expansion,
+)
+
+# Subcommands that need process pools, SQLite or asyncio import them when
+# they run, so `--defaults` and the other scoring paths start faster
 
 console = Console()
 
 
+def run_batch_command(args):
+    from batch import DEFAULT_CHUNK_SIZE, run_batch
+    from storage import get_store
+
+    dims = [d.strip() for d in args.dims.split(",") if d.strip()] if args.dims else None
+    formats = args.report_format or (["md"] if args.reports_dir else [])
+    last_print = [0.0]
+
+    def progress(done, elapsed):
+        if elapsed - last_print[0] >= 1.0:
+            last_print[0] = elapsed
+            console.print(f"  {done:,} évaluations — {done / elapsed:,.0f}/s")
+
+    console.print(f"Évaluation en lot : {args.input} → {args.output}\n")
+    summary = run_batch(
+        args.input,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size or DEFAULT_CHUNK_SIZE,
+        dims=dims,
+        reports_dir=args.reports_dir,
+        report_formats=formats,
+        progress=progress,
+        store=get_store() if args.store else None,
+    )
+
+    table = Table(title="Répartition par Niveau")
+    table.add_column("Niveau", style="bold")
+    table.add_column("Organisations", justify="right")
+    for tier_key, count in summary["tiers"].items():
+        table.add_row(tier_key, f"{count:,}")
+    console.print(table)
+    console.print(
+        f"\n✅ {summary['count']:,} évaluations en {summary['elapsed']:.1f}s "
+        f"({summary['rate']:,.0f}/s) — résultats : {args.output}"
+    )
+    if summary["errors"]:
+        console.print(f"[red]✗ {summary['errors']:,} ligne(s) illisible(s) : voir la colonne decode_error[/red]")
+    if args.store:
+        console.print(f"💾 Historique : {get_store().path}")
+
+
+def run_reports_command(args):
+    from bulk_reports import generate_reports_from_file
+
+    dims = [d.strip() for d in args.dims.split(",") if d.strip()] if args.dims else None
+    last_print = [0.0]
+
+    def progress(ok, failed, elapsed):
+        if elapsed - last_print[0] >= 2.0:
+            last_print[0] = elapsed
+            console.print(f"  {ok:,} PDF ({failed} échecs) — {ok / elapsed:.1f} docs/s")
+
+    console.print(f"Génération des rapports PDF : {args.input} → {args.output}\n")
+    summary = generate_reports_from_file(
+        args.input,
+        args.output,
+        workers=args.workers,
+        dims=dims,
+        progress=progress,
+    )
+    for err in summary["errors"][:10]:
+        console.print(f"[red]  ✗ {err['id']} — {err['error']}[/red]")
+    console.print(
+        f"\n✅ {summary['count']:,} rapports en {summary['elapsed']:.1f}s "
+        f"({summary['docs_per_sec']:.1f} docs/s), {summary['failed']} échec(s) — {args.output}"
+    )
+
+
+def run_expansion_command(args):
+    if args.answers:
+        with open(args.answers, encoding="utf-8") as f:
+            answers = json.load(f)
+    else:
+        answers = default_answers()
+
+    plan = optimize_expansion(
+        answers,
+        annual_budget=args.budget,
+        years=args.years,
+        max_openings_per_year=args.max_per_year,
+        discount_rate=args.discount,
+        carry_over=not args.no_carry_over,
+        level=args.level,
+    )
+
+    table = Table(title="Plan d'Ouverture Optimisé")
+    table.add_column("Année", justify="center")
+    table.add_column("Ouvertures", max_width=60)
+    table.add_column("Investissement", justify="right")
+    table.add_column("Budget disponible", justify="right")
+    for year in plan["schedule"]:
+        openings = ", ".join(f"{o['name']} (#{o['unit']})" for o in year["openings"]) or "—"
+        table.add_row(str(year["year"]), openings, f"{year['capex']:,.0f}$", f"{year['budget']:,.0f}$")
+    console.print(table)
+    console.print(
+        f"\n✅ {plan['total_units']} unités, {plan['total_capex']:,.0f}$ investis — "
+        f"score attendu {plan['expected_score']:,.0f} "
+        f"(borne supérieure {plan['upper_bound']:,.0f}, écart {plan['gap']:.1%})"
+    )
+
+
+def run_sites_command(args):
+    console.print(f"Score des sites : {args.input} → {args.output}\n")
+    candidates = PointSet.load(args.input)
+    own_units = PointSet.load(args.own_units) if args.own_units else None
+    result = score_sites(
+        candidates,
+        PointSet.load(args.competitors),
+        PointSet.load(args.population),
+        own_units,
+        drive_minutes=args.minutes,
+        speed_kmh=args.speed,
+    )
+
+    rows = [site_row(result, i) for i in result["score"].argsort(kind="stable")[::-1].tolist()]
+    with open(args.output, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["id", "score"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+    table = Table(title=f"Meilleurs Sites (rayon {result['radius_km']:.1f} km)")
+    table.add_column("Site", style="bold")
+    table.add_column("Score", justify="right")
+    table.add_column("Population", justify="right")
+    table.add_column("Pression conc.", justify="right")
+    table.add_column("Cannibalisation", justify="right")
+    for row in rows[:args.top]:
+        table.add_row(
+            row["id"], f"{row['score']:.0f}", f"{row['catchment_population']:,}",
+            f"{row['competitor_pressure']:.1f}", f"{row['cannibalization']:.0%}",
+        )
+    console.print(table)
+    console.print(f"\n✅ {len(rows):,} sites scorés — résultats : {args.output}")
+
+
+def run_network_report_command(args):
+    from batch import iter_records
+
+    dims = [d.strip() for d in args.dims.split(",") if d.strip()] if args.dims else None
+    count = 0
+
+    def organizations():
+        nonlocal count
+        for respondent_id, org, answers, decode_error in iter_records(args.input):
+            if decode_error:
+                console.print(f"[red]  ✗ {respondent_id} — {decode_error}[/red]")
+                continue
+            count += 1
+            if count % 1000 == 0:
+                console.print(f"  {count:,} organisations")
+            yield org or respondent_id, run_assessment(answers, dims)
+
+    console.print(f"Rapport de réseau : {args.input} → {args.output}\n")
+    with open(args.output, "w", encoding="utf-8") as f:
+        size = write_report(
+            iter_network_report(organizations(), network_name=args.org, summary_first=not args.summary_last), f,
+        )
+    console.print(f"\n✅ {count:,} organisations — {size / 1e6:,.1f} M caractères : {args.output}")
+
+
+def run_serve_command(args):
+    from api import serve
+
+    console.print(f"Service HTTP : http://{args.host}:{args.port} — Ctrl+C pour arrêter\n")
+    serve(
+        args.host,
+        args.port,
+        pdf_workers=args.pdf_workers,
+        max_pdf_jobs=args.max_pdf_jobs,
+        max_pdf_queue=args.max_pdf_queue,
+        cache_entries=args.cache_entries,
+    )
+
+
+def run_worker_command(args):
+    from job_queue import DEFAULT_JOBS_DIR, JOBS_DIR_ENV, run_worker, start_workers
+
+    directory = args.dir or os.environ.get(JOBS_DIR_ENV) or DEFAULT_JOBS_DIR
+    console.print(f"Traitement de la file de rapports PDF : {directory} ({args.workers} processus) — Ctrl+C pour arrêter\n")
+    if args.workers == 1:
+        run_worker(directory)
+        return
+    for process in start_workers(directory, args.workers):
+        process.join()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Console de Croissance Bellepros — CLI")
     parser.add_argument("--defaults", action="store_true", help="Utiliser les réponses démo")
     parser.add_argument("--org", default="Bellepros", help="Nom de l'organisation")
+    parser.add_argument("--store", action="store_true", help="Enregistrer les évaluations dans l'historique (BELLEPROS_STORE)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    batch_parser = subparsers.add_parser("batch", help="Évaluer un fichier de questionnaires (CSV, JSONL, Parquet)")
+    batch_parser.add_argument("input", help="Fichier de réponses (.csv, .jsonl, .parquet)")
+    batch_parser.add_argument("-o", "--output", default="resultats_croissance.csv", help="Fichier de résultats (.csv ou .jsonl)")
+    batch_parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de cœurs)")
+    batch_parser.add_argument("--chunk-size", type=int, help="Répondants par paquet (défaut : 1000)")
+    batch_parser.add_argument("--dims", help="Dimensions à évaluer, séparées par des virgules")
+    batch_parser.add_argument("--reports-dir", help="Répertoire où écrire un rapport par répondant")
+    batch_parser.add_argument("--report-format", action="append", choices=["md", "pdf"], help="Format des rapports (répétable, défaut : md)")
+    # SUPPRESS: an unset subcommand flag must not reset ``main.py --store batch``
+    batch_parser.add_argument(
+        "--store", action="store_true", default=argparse.SUPPRESS,
+        help="Enregistrer les résultats dans l'historique (BELLEPROS_STORE)",
+    )
+
+    reports_parser = subparsers.add_parser("reports", help="Générer un rapport PDF par répondant, en parallèle")
+    reports_parser.add_argument("input", help="Fichier de réponses (.csv, .jsonl, .parquet)")
+    reports_parser.add_argument("-o", "--output", default="rapports_croissance.zip", help="Répertoire ou archive .zip de sortie")
+    reports_parser.add_argument("--workers", type=int, default=None, help="Nombre de processus (défaut : nb de cœurs)")
+    reports_parser.add_argument("--dims", help="Dimensions à évaluer, séparées par des virgules")
+
+    expansion_parser = subparsers.add_parser("expansion", help="Optimiser le plan d'ouverture pluriannuel")
+    expansion_parser.add_argument("--answers", help="Réponses au questionnaire (.json, défaut : réponses démo)")
+    expansion_parser.add_argument("--budget", type=float, default=DEFAULT_ANNUAL_BUDGET, help="Budget d'investissement annuel ($)")
+    expansion_parser.add_argument("--years", type=int, default=DEFAULT_YEARS, help="Horizon (années)")
+    expansion_parser.add_argument("--max-per-year", type=int, default=DEFAULT_MAX_OPENINGS, help="Ouvertures maximales par année")
+    expansion_parser.add_argument("--discount", type=float, default=DEFAULT_DISCOUNT_RATE, help="Taux d'actualisation")
+    expansion_parser.add_argument("--no-carry-over", action="store_true", help="Ne pas reporter le budget non dépensé")
+    expansion_parser.add_argument("--level", help="Niveau des territoires candidats (défaut : region)")
+
+    sites_parser = subparsers.add_parser("sites", help="Scorer des sites candidats (lat/lon) par zone de chalandise")
+    sites_parser.add_argument("input", help="Sites candidats (.csv ou .parquet : id, lat, lon)")
+    sites_parser.add_argument("--competitors", required=True, help="Emplacements concurrents (lat, lon, chain)")
+    sites_parser.add_argument("--population", required=True, help="Grille de population (lat, lon, population)")
+    sites_parser.add_argument("--own-units", help="Nos unités existantes (lat, lon)")
+    sites_parser.add_argument("-o", "--output", default="scores_sites.csv", help="Fichier CSV des scores")
+    sites_parser.add_argument("--minutes", type=float, default=DEFAULT_DRIVE_MINUTES, help="Temps de route de la zone de chalandise")
+    sites_parser.add_argument("--speed", type=float, default=DEFAULT_SPEED_KMH, help="Vitesse moyenne (km/h)")
+    sites_parser.add_argument("--top", type=int, default=10, help="Sites affichés")
+
+    serve_parser = subparsers.add_parser("serve", help="Service HTTP local : évaluation JSON, rapports Markdown et PDF")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    serve_parser.add_argument("--port", type=int, default=8000, help="Port d'écoute")
+    # Unset limits fall back to BELLEPROS_API_*, then to the api.py defaults
+    serve_parser.add_argument("--pdf-workers", type=int, help="Processus de génération PDF (défaut : 2)")
+    serve_parser.add_argument("--max-pdf-jobs", type=int, help="PDF générés simultanément (défaut : 4)")
+    serve_parser.add_argument("--max-pdf-queue", type=int, help="PDF en attente avant de répondre 503 (défaut : 64)")
+    serve_parser.add_argument("--cache-entries", type=int, help="Réponses gardées en cache (défaut : 2048)")
+
+    worker_parser = subparsers.add_parser("worker", help="Traiter la file de rapports PDF de l'interface")
+    worker_parser.add_argument("--dir", help="Répertoire de la file (défaut : BELLEPROS_JOBS_DIR ou .bellepros_jobs)")
+    worker_parser.add_argument("--workers", type=int, default=1, help="Nombre de processus")
+
+    network_parser = subparsers.add_parser("network-report", help="Rapport Markdown consolidé de tout le réseau, en flux")
+    network_parser.add_argument("input", help="Fichier de réponses (.csv, .jsonl, .parquet), une ligne par organisation")
+    network_parser.add_argument("-o", "--output", default="rapport_reseau.md", help="Fichier Markdown de sortie")
+    network_parser.add_argument("--dims", help="Dimensions à évaluer, séparées par des virgules")
+    network_parser.add_argument("--summary-last", action="store_true", help="Synthèse en fin de rapport (aucun fichier temporaire)")
+
     args = parser.parse_args()
 
     console.print(Panel(
@@ -26,6 +284,28 @@ def main():
         style="bold red",
     ))
 
+    if args.command == "batch":
+        run_batch_command(args)
+        return
+    if args.command == "reports":
+        run_reports_command(args)
+        return
+    if args.command == "expansion":
+        run_expansion_command(args)
+        return
+    if args.command == "sites":
+        run_sites_command(args)
+        return
+    if args.command == "network-report":
+        run_network_report_command(args)
+        return
+    if args.command == "serve":
+        run_serve_command(args)
+        return
+    if args.command == "worker":
+        run_worker_command(args)
+        return
+
     if args.defaults:
         console.print("Utilisation des réponses démo...\n")
         answers = default_answers()
@@ -69,12 +349,23 @@ def main():
         console.print(f"  {reg['priority']:12s}  {reg['name']}{star} — {reg['notes']}")
 
     # Save report
-    report = generate_report(assessment, org_name=args.org)
     report_path = "rapport_croissance.md"
-    with open(report_path, "w") as f:
-        f.write(report)
+    with open(report_path, "w", encoding="utf-8") as f:
+        write_report(iter_report(assessment, org_name=args.org), f)
     console.print(f"\n✅ Rapport complet sauvegardé : {report_path}")
 
+    if args.store:
+        from storage import get_store
+
+        store = get_store()
+        store.add(args.org, assessment, answers)
+        history = store.history(args.org)
+        percentile = store.percentile(overall)
+        console.print(
+            f"💾 Évaluation enregistrée ({len(history)} pour {args.org}) — "
+            f"rang centile {percentile:.0f} parmi {store.org_count():,} organisations : {store.path}"
+        )
+
 
 if __name__ == "__main__":
     main()
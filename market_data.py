@@ -0,0 +1,210 @@
+"""
+market_data.py — Données de marché (régions, MRC, municipalités) en colonnes.
+
+Le fichier est désigné par ``BELLEPROS_MARKET_DATA`` (CSV ou Parquet, une
+ligne par territoire) et chargé au premier usage ; sans fichier, les dix
+régions de ``config.QUEBEC_REGIONS`` servent de jeu de données.
+
+Colonnes : ``key``, ``name``, ``population``, ``densite_qsr``,
+``loyer_moyen_pied2``, ``potentiel`` (obligatoires), ``level``
+(``region`` par défaut), ``parent`` (clé de la région englobante) et
+``notes``. Les colonnes textuelles répétitives sont codées en catégories
+(un petit entier par ligne) ; les index par clé, par niveau et par parent
+sont construits au chargement.
+"""
+
+import csv
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+MARKET_DATA_ENV = "BELLEPROS_MARKET_DATA"
+DEFAULT_LEVEL = "region"
+REQUIRED_COLUMNS = ("key", "name", "population", "densite_qsr", "loyer_moyen_pied2", "potentiel")
+CATEGORICAL_COLUMNS = ("level", "parent", "densite_qsr", "potentiel")
+
+
+def _encode(values: Iterable[str]) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """(catégories, codes) — les catégories dans l'ordre de première apparition."""
+    categories: Dict[str, int] = {}
+    codes = [categories.setdefault(v, len(categories)) for v in values]
+    dtype = np.int8 if len(categories) <= 127 else np.int16 if len(categories) <= 32_767 else np.int32
+    return tuple(categories), np.array(codes, dtype=dtype)
+
+
+class MarketData:
+    """Territoires en colonnes numpy, avec index par clé, niveau et parent."""
+
+    def __init__(self, columns: Mapping[str, Sequence[Any]]):
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if missing:
+            raise ValueError(f"Colonnes manquantes dans les données de marché : {missing}")
+        n = len(columns["key"])
+        self.keys: List[str] = [str(k) for k in columns["key"]]
+        self.names: List[str] = [str(v) for v in columns["name"]]
+        self.notes: List[str] = [str(v or "") for v in columns.get("notes", [""] * n)]
+        self.population = np.asarray(columns["population"], dtype=np.int64)
+        self.loyer = np.asarray(columns["loyer_moyen_pied2"], dtype=np.float64)
+
+        self.categories: Dict[str, Tuple[str, ...]] = {}
+        self.codes: Dict[str, np.ndarray] = {}
+        defaults = {"level": DEFAULT_LEVEL, "parent": ""}
+        for name in CATEGORICAL_COLUMNS:
+            raw = columns.get(name, [defaults.get(name, "")] * n)
+            self.categories[name], self.codes[name] = _encode(str(v or defaults.get(name, "")) for v in raw)
+
+        self.index: Dict[str, int] = {}
+        for i, key in enumerate(self.keys):
+            if self.index.setdefault(key, i) != i:
+                raise ValueError(f"Clé de territoire en double : {key}")
+        self._by_level = self._group("level")
+        self._by_parent = self._group("parent")
+        self._lookups: Dict[Tuple[str, Tuple[Tuple[str, float], ...], float], np.ndarray] = {}
+        self._scalars: Optional[Dict[str, List[Any]]] = None
+        # Arrays computed from the columns by callers (e.g. region fit), kept with the data
+        self.derived: Dict[Any, np.ndarray] = {}
+        self._targets: Dict[str, np.ndarray] = {}
+
+    def _group(self, column: str) -> Dict[str, np.ndarray]:
+        codes = self.codes[column]
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(self.categories[column]) + 1))
+        return {
+            label: order[bounds[c]:bounds[c + 1]]
+            for c, label in enumerate(self.categories[column])
+        }
+
+    # -- construction -------------------------------------------------------
+
+    @classmethod
+    def from_mapping(cls, regions: Mapping[str, Mapping[str, Any]]) -> "MarketData":
+        """Depuis un dict au format de ``config.QUEBEC_REGIONS``."""
+        fields = REQUIRED_COLUMNS[1:] + ("level", "parent", "notes")
+        columns: Dict[str, List[Any]] = {"key": list(regions)}
+        for field in fields:
+            columns[field] = [r.get(field) for r in regions.values()]
+        return cls(columns)
+
+    @classmethod
+    def load(cls, path: str) -> "MarketData":
+        """Depuis un fichier CSV ou Parquet."""
+        return cls(_read_columns(Path(path)))
+
+    # -- lookups ------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.index
+
+    def column(self, name: str) -> List[str]:
+        """Valeurs décodées d'une colonne catégorielle."""
+        labels = self.categories[name]
+        return [labels[c] for c in self.codes[name].tolist()]
+
+    def target_rows(self, key: str) -> np.ndarray:
+        """Lignes désignées par une clé : le territoire et ceux dont il est le parent."""
+        rows = self._targets.get(key)
+        if rows is None:
+            own = [self.index[key]] if key in self.index else []
+            under = self._by_parent.get(key, ()) if key else ()
+            rows = self._targets[key] = np.unique(np.concatenate([own, under]).astype(np.intp))
+        return rows
+
+    def rows(self, level: Optional[str] = None, parent: Optional[str] = None) -> np.ndarray:
+        """Indices des lignes d'un niveau et/ou d'un parent (toutes par défaut)."""
+        selected = np.arange(len(self))
+        if level is not None:
+            selected = self._by_level.get(level, selected[:0])
+        if parent is not None:
+            under = self._by_parent.get(parent, selected[:0])
+            selected = under if level is None else np.intersect1d(selected, under)
+        return selected
+
+    def levels(self) -> Tuple[str, ...]:
+        return self.categories["level"]
+
+    def lookup(self, column: str, mapping: Mapping[str, float], default: float) -> np.ndarray:
+        """Valeur par ligne d'une table {catégorie: valeur}, une entrée par catégorie."""
+        cache_key = (column, tuple(mapping.items()), default)
+        values = self._lookups.get(cache_key)
+        if values is None:
+            table = np.array([mapping.get(label, default) for label in self.categories[column]], dtype=np.float64)
+            values = self._lookups[cache_key] = table[self.codes[column]]
+        return values
+
+    def scalars(self) -> Dict[str, List[Any]]:
+        """Colonnes en listes Python, décodées une fois (pour construire des dicts)."""
+        if self._scalars is None:
+            scalars = {name: self.column(name) for name in CATEGORICAL_COLUMNS}
+            scalars.update(
+                name=self.names, notes=self.notes,
+                population=self.population.tolist(), loyer_moyen_pied2=self.loyer.tolist(),
+            )
+            self._scalars = scalars
+        return self._scalars
+
+    def record(self, i: int) -> Dict[str, Any]:
+        """Ligne ``i`` au format de ``config.QUEBEC_REGIONS``."""
+        return {field: values[i] for field, values in self.scalars().items()}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        i = self.index.get(key)
+        return None if i is None else self.record(i)
+
+    def to_regions(self, rows: Optional[np.ndarray] = None) -> Dict[str, Dict[str, Any]]:
+        """Lignes choisies (toutes par défaut) au format de ``config.QUEBEC_REGIONS``."""
+        rows = range(len(self)) if rows is None else rows.tolist()
+        return {self.keys[i]: self.record(i) for i in rows}
+
+
+def _read_columns(path: Path) -> Dict[str, List[Any]]:
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.DictReader(f))
+        columns = {name: [row[name] for row in rows] for name in (rows[0] if rows else {})}
+        if rows and "population" in columns:
+            columns["population"] = [int(float(v)) for v in columns["population"]]
+        return columns
+    if suffix == ".parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("pyarrow est requis pour lire les fichiers Parquet (pip install pyarrow).")
+        table = pq.read_table(path)
+        return {name: table.column(name).to_pylist() for name in table.column_names}
+    raise ValueError(f"Format de données de marché non supporté : {path.suffix} (CSV ou Parquet)")
+
+
+# ---------------------------------------------------------------------------
+# Jeu de données partagé, chargé au premier usage
+# ---------------------------------------------------------------------------
+
+_market: Optional[MarketData] = None
+_market_lock = threading.Lock()
+
+
+def get_market_data() -> MarketData:
+    """Données de marché du processus : fichier ``BELLEPROS_MARKET_DATA`` ou régions intégrées."""
+    global _market
+    with _market_lock:
+        if _market is None:
+            path = os.environ.get(MARKET_DATA_ENV)
+            if path:
+                _market = MarketData.load(path)
+            else:
+                from config import QUEBEC_REGIONS
+                _market = MarketData.from_mapping(QUEBEC_REGIONS)
+        return _market
+
+
+def set_market_data(market: Optional[MarketData]) -> None:
+    """Remplace les données partagées (``None`` : rechargement au prochain usage)."""
+    global _market
+    with _market_lock:
+        _market = market
@@ -2,17 +2,29 @@
 pdf_generator.py — Génère un rapport PDF professionnel pour Bellepros.
 """
 
+import copy
 import io
 import os
-import tempfile
+import threading
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from fontTools import ttLib
 from fpdf import FPDF
+try:
+    from fpdf.fonts import SubsetMap
+except ImportError:  # other fpdf2 layout: _register_font falls back to add_font
+    SubsetMap = None
 import plotly.graph_objects as go
 
+from chart_renderer import render_many
+from config import GROWTH_TIERS
+from tracing import span, traced
 
+
+@lru_cache(maxsize=None)
 def _find_dejavu_font(style: str = "") -> str:
     """Find DejaVu font path across different OS/environments."""
     name = "DejaVuSans-Bold.ttf" if style == "B" else "DejaVuSans.ttf"
@@ -44,6 +56,54 @@ def _find_dejavu_font(style: str = "") -> str:
     return ""
 
 
+# ---------------------------------------------------------------------------
+# Registre de polices (une analyse par processus)
+# ---------------------------------------------------------------------------
+_FONT_FAMILY = "DejaVu"
+_parsed_fonts: Dict[str, Optional[Tuple[Any, bytes]]] = {}
+_parsed_fonts_lock = threading.Lock()
+
+
+def _parsed_font(style: str) -> Optional[Tuple[Any, bytes]]:
+    """Police DejaVu analysée une seule fois : (prototype TTFFont, octets du fichier)."""
+    with _parsed_fonts_lock:
+        if style not in _parsed_fonts:
+            path = _find_dejavu_font(style)
+            parsed = None
+            if path:
+                # Let fpdf2 parse metrics/glyphs on a scratch document, keep the result
+                scratch = FPDF()
+                scratch.add_font(_FONT_FAMILY, style, path)
+                parsed = (scratch.fonts[f"{_FONT_FAMILY.lower()}{style}"], Path(path).read_bytes())
+            _parsed_fonts[style] = parsed
+        return _parsed_fonts[style]
+
+
+def _register_font(pdf: FPDF, style: str) -> bool:
+    """Ajoute la police au document en réutilisant l'analyse partagée."""
+    parsed = _parsed_font(style)
+    if parsed is None:
+        return False
+    prototype, data = parsed
+    try:
+        font = copy.copy(prototype)
+        # cmap, widths and glyph ids are read-only and shared. The fontTools
+        # object is subset in place on output, so each document reopens its own
+        # (lazy: tables are only decoded when the subsetter needs them).
+        font.i = len(pdf.fonts) + 1
+        font.ttfont = ttLib.TTFont(io.BytesIO(data), recalcTimestamp=False, lazy=True)
+        font.missing_glyphs = []
+        font.biggest_size_pt = 0
+        font._hbfont = None
+        font.subset = SubsetMap(font)
+    except (AttributeError, TypeError):
+        # Private fpdf2 internals (tested on 2.8.x) changed: parse the font again
+        pdf.add_font(_FONT_FAMILY, style, _find_dejavu_font(style))
+        return True
+    pdf.fonts[prototype.fontkey] = font
+    return True
+
+
 # ---------------------------------------------------------------------------
 # Couleurs
 # ---------------------------------------------------------------------------
@@ -64,12 +124,10 @@ class BelleprosPDF(FPDF):
         self.org_name = org_name
         self.set_auto_page_break(auto=True, margin=20)
         # DejaVu for full French Unicode support
-        regular = _find_dejavu_font("")
-        bold = _find_dejavu_font("B")
-        if regular and bold:
-            self.add_font("DejaVu", "", regular, uni=True)
-            self.add_font("DejaVu", "B", bold, uni=True)
-            self._font_name = "DejaVu"
+        if _parsed_font("") and _parsed_font("B"):
+            _register_font(self, "")
+            _register_font(self, "B")
+            self._font_name = _FONT_FAMILY
         else:
             # Fallback to Helvetica (built-in, limited Unicode)
             self._font_name = "Helvetica"
@@ -137,8 +195,8 @@ def _score_color(score: float) -> tuple:
     return ROUGE_VIF
 
 
-def _render_radar_png(assessment: Dict[str, Any]) -> bytes:
-    """Render radar chart to PNG bytes."""
+def _radar_figure(assessment: Dict[str, Any]) -> go.Figure:
+    """Build radar chart figure."""
     names, scores = [], []
     for dim_key in assessment["dimensions_assessed"]:
         res = assessment["dimension_results"][dim_key]
@@ -153,6 +211,17 @@ def _render_radar_png(assessment: Dict[str, Any]) -> bytes:
         fillcolor="rgba(196, 30, 58, 0.25)",
         line_color="#c41e3a",
     ))
+    # Monte Carlo 90% band (P5-P95), when the assessment carries one
+    uncertainty = assessment.get("uncertainty")
+    if uncertainty:
+        for pct, label in (("p5", "P5"), ("p95", "P95")):
+            band = [uncertainty["dimensions"][d][pct] for d in assessment["dimensions_assessed"]]
+            fig.add_trace(go.Scatterpolar(
+                r=band + [band[0]],
+                theta=names + [names[0]],
+                line=dict(color="#1e3a5f", dash="dot", width=1),
+                name=label,
+            ))
     fig.update_layout(
         polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
         showlegend=False,
@@ -160,11 +229,16 @@ def _render_radar_png(assessment: Dict[str, Any]) -> bytes:
         margin=dict(l=60, r=60, t=30, b=30),
         paper_bgcolor="white",
     )
-    return fig.to_image(format="png", engine="kaleido")
+    return fig
 
 
-def _render_bars_png(assessment: Dict[str, Any]) -> bytes:
-    """Render horizontal bar chart to PNG bytes."""
+def _render_radar_png(assessment: Dict[str, Any]) -> bytes:
+    """Render radar chart to PNG bytes."""
+    return render_many([_radar_figure(assessment)])[0]
+
+
+def _bars_figure(assessment: Dict[str, Any]) -> go.Figure:
+    """Build horizontal bar chart figure."""
     names, scores, colors = [], [], []
     for dim_key in assessment["dimensions_assessed"]:
         res = assessment["dimension_results"][dim_key]
@@ -173,6 +247,17 @@ def _render_bars_png(assessment: Dict[str, Any]) -> bytes:
         c = _score_color(res["score"])
         colors.append(f"rgb({c[0]},{c[1]},{c[2]})")
 
+    uncertainty = assessment.get("uncertainty")
+    error_x = None
+    if uncertainty:
+        bands = [uncertainty["dimensions"][d] for d in assessment["dimensions_assessed"]]
+        error_x = dict(
+            type="data", symmetric=False,
+            array=[max(b["p95"] - s, 0) for b, s in zip(bands, scores)],
+            arrayminus=[max(s - b["p5"], 0) for b, s in zip(bands, scores)],
+            color="#1e3a5f", thickness=1.5,
+        )
+
     fig = go.Figure(go.Bar(
         x=scores,
         y=names,
@@ -180,6 +265,7 @@ def _render_bars_png(assessment: Dict[str, Any]) -> bytes:
         marker_color=colors,
         text=[f"{s:.0f}%" for s in scores],
         textposition="outside",
+        error_x=error_x,
     ))
     fig.update_layout(
         xaxis=dict(range=[0, 105]),
@@ -188,11 +274,16 @@ def _render_bars_png(assessment: Dict[str, Any]) -> bytes:
         margin=dict(l=120, r=50, t=10, b=30),
         paper_bgcolor="white",
     )
-    return fig.to_image(format="png", engine="kaleido")
+    return fig
 
 
-def _render_regions_png(assessment: Dict[str, Any]) -> bytes:
-    """Render region bar chart to PNG bytes."""
+def _render_bars_png(assessment: Dict[str, Any]) -> bytes:
+    """Render horizontal bar chart to PNG bytes."""
+    return render_many([_bars_figure(assessment)])[0]
+
+
+def _regions_figure(assessment: Dict[str, Any]) -> go.Figure:
+    """Build region bar chart figure."""
     regions = assessment["regions"]
     fig = go.Figure(go.Bar(
         x=[r["name"] for r in regions],
@@ -208,11 +299,16 @@ def _render_regions_png(assessment: Dict[str, Any]) -> bytes:
         paper_bgcolor="white",
         xaxis_tickangle=-35,
     )
-    return fig.to_image(format="png", engine="kaleido")
+    return fig
 
 
-def _render_competitive_png(assessment: Dict[str, Any]) -> bytes:
-    """Render competitive bubble chart to PNG bytes."""
+def _render_regions_png(assessment: Dict[str, Any]) -> bytes:
+    """Render region bar chart to PNG bytes."""
+    return render_many([_regions_figure(assessment)])[0]
+
+
+def _competitive_figure(assessment: Dict[str, Any]) -> go.Figure:
+    """Build competitive bubble chart figure."""
     competitors = assessment["competitors"]
     fig = go.Figure()
     for comp in competitors:
@@ -241,12 +337,27 @@ def _render_competitive_png(assessment: Dict[str, Any]) -> bytes:
         margin=dict(l=60, r=20, t=20, b=50),
         paper_bgcolor="white",
     )
-    return fig.to_image(format="png", engine="kaleido")
+    return fig
+
+
+def _render_competitive_png(assessment: Dict[str, Any]) -> bytes:
+    """Render competitive bubble chart to PNG bytes."""
+    return render_many([_competitive_figure(assessment)])[0]
 
 
+@traced("pdf.generate")
 def generate_pdf(assessment: Dict[str, Any], org_name: str = "Bellepros") -> bytes:
     """Génère le rapport PDF complet et retourne les bytes."""
 
+    # Render the four charts concurrently; a failed chart is an exception here
+    with span("pdf.charts"):
+        radar_png, bars_png, reg_png, comp_png = render_many([
+            _radar_figure(assessment),
+            _bars_figure(assessment),
+            _regions_figure(assessment),
+            _competitive_figure(assessment),
+        ], return_exceptions=True)
+
     pdf = BelleprosPDF(org_name)
     pdf.alias_nb_pages()
     tier = assessment["tier"]
@@ -285,6 +396,16 @@ def generate_pdf(assessment: Dict[str, Any], org_name: str = "Bellepros") -> byt
     pdf.set_font(pdf._font_name, "", 11)
     pdf.set_text_color(100, 100, 100)
     pdf.cell(0, 8, tier["desc"], align="C", ln=True)
+    uncertainty = assessment.get("uncertainty")
+    if uncertainty:
+        band = uncertainty["overall"]
+        tier_key = next((k for k, t in GROWTH_TIERS.items() if t == tier), None)
+        tier_prob = uncertainty["tier_probabilities"].get(tier_key, 0.0)
+        pdf.cell(
+            0, 8,
+            f"Intervalle à 90 % : {band['p5']:.0f} – {band['p95']:.0f}   ·   Probabilité du niveau : {tier_prob:.0%}",
+            align="C", ln=True,
+        )
 
     pdf.ln(15)
     pdf.set_text_color(130, 130, 130)
@@ -332,14 +453,25 @@ def generate_pdf(assessment: Dict[str, Any], org_name: str = "Bellepros") -> byt
 
     pdf.ln(8)
 
+    if uncertainty:
+        pdf.sub_title("Incertitude des Réponses (Monte Carlo)")
+        probs = ", ".join(
+            f"{GROWTH_TIERS[key]['label']} {p:.0%}"
+            for key, p in uncertainty["tier_probabilities"].items() if p >= 0.005
+        )
+        pdf.body_text(
+            f"Sur {uncertainty['n_samples']:,} simulations où chaque réponse peut glisser vers une réponse "
+            f"adjacente, le score global se situe entre {uncertainty['overall']['p5']:.0f} et "
+            f"{uncertainty['overall']['p95']:.0f} (médiane {uncertainty['overall']['p50']:.0f}). "
+            f"Probabilité par niveau : {probs}. Les graphiques montrent la bande P5–P95 par dimension."
+        )
+
     # Radar chart
     pdf.sub_title("Radar de Croissance")
     try:
-        radar_png = _render_radar_png(assessment)
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(radar_png)
-            radar_path = f.name
-        pdf.image(radar_path, x=30, w=150)
+        if isinstance(radar_png, Exception):
+            raise radar_png
+        pdf.image(io.BytesIO(radar_png), x=30, w=150)
         pdf.ln(5)
     except Exception:
         pdf.body_text("(Graphique radar non disponible)")
@@ -351,11 +483,9 @@ def generate_pdf(assessment: Dict[str, Any], org_name: str = "Bellepros") -> byt
     pdf.section_title("Scores par Dimension")
 
     try:
-        bars_png = _render_bars_png(assessment)
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(bars_png)
-            bars_path = f.name
-        pdf.image(bars_path, x=30, w=150)
+        if isinstance(bars_png, Exception):
+            raise bars_png
+        pdf.image(io.BytesIO(bars_png), x=30, w=150)
         pdf.ln(8)
     except Exception:
         pdf.body_text("(Graphique barres non disponible)")
@@ -435,11 +565,9 @@ def generate_pdf(assessment: Dict[str, Any], org_name: str = "Bellepros") -> byt
 
     # Region chart
     try:
-        reg_png = _render_regions_png(assessment)
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(reg_png)
-            reg_path = f.name
-        pdf.image(reg_path, x=15, w=180)
+        if isinstance(reg_png, Exception):
+            raise reg_png
+        pdf.image(io.BytesIO(reg_png), x=15, w=180)
         pdf.ln(8)
     except Exception:
         pass
@@ -466,11 +594,9 @@ def generate_pdf(assessment: Dict[str, Any], org_name: str = "Bellepros") -> byt
 
     # Competitive chart
     try:
-        comp_png = _render_competitive_png(assessment)
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-            f.write(comp_png)
-            comp_path = f.name
-        pdf.image(comp_path, x=15, w=180)
+        if isinstance(comp_png, Exception):
+            raise comp_png
+        pdf.image(io.BytesIO(comp_png), x=15, w=180)
         pdf.ln(8)
     except Exception:
         pass
@@ -569,4 +695,5 @@ def generate_pdf(assessment: Dict[str, Any], org_name: str = "Bellepros") -> byt
     pdf.set_text_color(150, 150, 150)
     pdf.cell(0, 6, f"Rapport généré par la Console de Croissance Bellepros — {datetime.now().strftime('%Y-%m-%d %H:%M')}", align="C")
 
-    return pdf.output()
+    with span("pdf.output"):
+        return pdf.output()
@@ -0,0 +1,199 @@
+"""
+portfolio.py — Tableau de bord du réseau : agrégats sur des milliers d'évaluations.
+
+Les évaluations (historique SQLite ou sortie de ``main.py batch``) sont
+chargées dans un DataFrame : une ligne par évaluation, une colonne par
+dimension, une colonne booléenne par région. Les agrégats sont calculés
+en colonnes (histogrammes à pas fixe, effectifs par niveau, produits
+matriciels pour les cartes de chaleur niveau × région et dimension ×
+région) et chaque graphique reçoit un nombre de points borné — classes,
+niveaux, régions, échantillon — quel que soit le nombre d'évaluations.
+"""
+
+import io
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from config import ALL_DIMENSION_KEYS, GROWTH_TIERS
+from scoring_schema import SCHEMA
+from storage import AssessmentStore
+
+SCORE_BIN_WIDTH = 2  # points per histogram bar: 50 bars from 0 to 100
+MAX_HEATMAP_REGIONS = 25
+MAX_SCATTER_POINTS = 2_000
+REGION_PREFIX = "region:"
+
+
+def _dim_column(dim_key: str) -> str:
+    return f"{dim_key}_score"
+
+
+# ---------------------------------------------------------------------------
+# Chargement
+# ---------------------------------------------------------------------------
+
+def _targeted_regions(values: pd.Series) -> pd.DataFrame:
+    """``regions_cibles`` bruts de l'historique → une colonne booléenne par option."""
+    options = SCHEMA["regions_cibles"].values
+    masks = pd.to_numeric(values, errors="coerce")
+    # JSON lists (answers holding an unknown option) are re-encoded one by one
+    for i in np.flatnonzero(masks.isna().to_numpy() & values.notna().to_numpy()):
+        try:
+            selected = json.loads(values.iat[i])
+        except (TypeError, ValueError):
+            continue
+        if isinstance(selected, list):
+            masks.iat[i] = SCHEMA.encode_multi("regions_cibles", [v for v in selected if v in options])
+    masks = masks.fillna(0).to_numpy(dtype=np.int64)
+    bits = (masks[:, None] >> np.arange(len(options))) & 1
+    return pd.DataFrame(bits.astype(bool), columns=[REGION_PREFIX + key for key in options], index=values.index)
+
+
+def _recommended_regions(values: pd.Series) -> pd.DataFrame:
+    """``top_regions`` (clés séparées par ``;``) → une colonne booléenne par région.
+
+    Batch rows share a few hundred distinct rankings: only those are split.
+    """
+    codes, uniques = pd.factorize(values.fillna(""))
+    # Rows without a recommendation would otherwise get a "" region column
+    dummies = pd.Series(uniques).str.get_dummies(sep=";").drop(columns="", errors="ignore")
+    return pd.DataFrame(
+        dummies.to_numpy(dtype=bool)[codes],
+        columns=[REGION_PREFIX + key for key in dummies.columns], index=values.index,
+    )
+
+
+def _finish(frame: pd.DataFrame, regions: pd.DataFrame) -> pd.DataFrame:
+    if "org" not in frame:
+        frame["org"] = ""
+    frame["tier"] = pd.Categorical(frame["tier"], categories=list(GROWTH_TIERS))
+    for dim_key in ALL_DIMENSION_KEYS:
+        column = _dim_column(dim_key)
+        if column in frame:
+            frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    frame["overall_score"] = pd.to_numeric(frame["overall_score"], errors="coerce")
+    return pd.concat([frame, regions], axis=1)
+
+
+def store_frame(store: AssessmentStore, latest_only: bool = True) -> pd.DataFrame:
+    """Évaluations de l'historique ; régions = régions ciblées dans les réponses."""
+    columns, rows = store.scores(latest_only)
+    frame = pd.DataFrame.from_records(rows, columns=columns)
+    regions = _targeted_regions(frame.pop("regions_cibles"))
+    return _finish(frame, regions)
+
+
+def results_frame(data: bytes, name: str) -> pd.DataFrame:
+    """Sortie de ``main.py batch`` (CSV ou JSONL) ; régions = ``top_regions`` recommandées."""
+    suffix = Path(name).suffix.lower()
+    text_columns = {"id": str, "org": str, "top_regions": str}
+    if suffix == ".csv":
+        frame = pd.read_csv(io.BytesIO(data), dtype=text_columns)
+    elif suffix in (".jsonl", ".ndjson"):
+        frame = pd.read_json(io.BytesIO(data), lines=True, dtype=text_columns)
+    else:
+        raise ValueError(f"Format non supporté : {suffix} (CSV ou JSONL de main.py batch)")
+    missing = [c for c in ("overall_score", "tier") if c not in frame]
+    if missing:
+        raise ValueError(f"Colonnes manquantes : {', '.join(missing)}")
+    if "top_regions" in frame:
+        regions = _recommended_regions(frame.pop("top_regions"))
+    else:
+        regions = pd.DataFrame(index=frame.index)
+    return _finish(frame, regions)
+
+
+# ---------------------------------------------------------------------------
+# Agrégats
+# ---------------------------------------------------------------------------
+
+def dimension_keys(frame: pd.DataFrame, dims: Optional[Sequence[str]] = None) -> List[str]:
+    """Dimensions présentes (au moins un score) parmi ``dims``, dans l'ordre de la config."""
+    wanted = set(dims) if dims else set(ALL_DIMENSION_KEYS)
+    return [
+        d for d in ALL_DIMENSION_KEYS
+        if d in wanted and _dim_column(d) in frame and frame[_dim_column(d)].notna().any()
+    ]
+
+
+def region_keys(frame: pd.DataFrame) -> List[str]:
+    return [c[len(REGION_PREFIX):] for c in frame.columns if c.startswith(REGION_PREFIX)]
+
+
+def histograms(frame: pd.DataFrame, dims: Sequence[str]) -> pd.DataFrame:
+    """Effectifs par classe de ``SCORE_BIN_WIDTH`` points ; index = borne basse de la classe."""
+    edges = np.arange(0, 100 + SCORE_BIN_WIDTH, SCORE_BIN_WIDTH)
+    counts = {}
+    for metric, column in [("overall", "overall_score"), *((d, _dim_column(d)) for d in dims)]:
+        values = frame[column].to_numpy(dtype=np.float64)
+        counts[metric], _ = np.histogram(np.clip(values[~np.isnan(values)], 0, 100), bins=edges)
+    return pd.DataFrame(counts, index=edges[:-1])
+
+
+def tier_counts(frame: pd.DataFrame) -> pd.Series:
+    """Évaluations par niveau, dans l'ordre de ``GROWTH_TIERS``."""
+    return frame["tier"].value_counts(sort=False).reindex(list(GROWTH_TIERS), fill_value=0)
+
+
+def region_heatmaps(
+    frame: pd.DataFrame,
+    dims: Sequence[str],
+    max_regions: int = MAX_HEATMAP_REGIONS,
+) -> Dict[str, pd.DataFrame]:
+    """Cartes de chaleur sur les ``max_regions`` régions les plus citées.
+
+    ``tier_share`` : part (%) des évaluations de chaque niveau qui citent la
+    région ; ``dimension_means`` : score moyen de chaque dimension parmi
+    les évaluations qui la citent. Deux produits matriciels, sans boucle.
+    """
+    regions = region_keys(frame)
+    matrix = frame[[REGION_PREFIX + r for r in regions]].to_numpy(dtype=np.float64)
+    totals = matrix.sum(axis=0)
+    keep = [i for i in np.argsort(-totals, kind="stable")[:max_regions] if totals[i] > 0]
+    regions = [regions[i] for i in keep]
+    matrix = matrix[:, keep]
+
+    tiers = pd.get_dummies(frame["tier"]).reindex(columns=list(GROWTH_TIERS), fill_value=False)
+    tier_matrix = tiers.to_numpy(dtype=np.float64)
+    per_tier = tier_matrix.sum(axis=0)[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        tier_share = 100.0 * (tier_matrix.T @ matrix) / per_tier
+
+    scores = frame[[_dim_column(d) for d in dims]].to_numpy(dtype=np.float64)
+    present = ~np.isnan(scores)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dimension_means = (np.where(present, scores, 0.0).T @ matrix) / (present.astype(np.float64).T @ matrix)
+
+    return {
+        "tier_share": pd.DataFrame(tier_share, index=list(GROWTH_TIERS), columns=regions),
+        "dimension_means": pd.DataFrame(dimension_means, index=list(dims), columns=regions),
+        "counts": pd.Series(totals[keep], index=regions),
+    }
+
+
+def sample(frame: pd.DataFrame, n: int = MAX_SCATTER_POINTS, seed: int = 0) -> pd.DataFrame:
+    """Au plus ``n`` lignes tirées au hasard (graine fixe : le nuage ne bouge pas)."""
+    return frame if len(frame) <= n else frame.sample(n, random_state=seed)
+
+
+def portfolio_view(frame: pd.DataFrame, dims: Optional[Sequence[str]] = None) -> Dict[str, Any]:
+    """Tous les agrégats du tableau de bord ; taille indépendante du nombre d'évaluations."""
+    dims = dimension_keys(frame, dims)
+    overall = frame["overall_score"]
+    columns = ["org", "tier", "overall_score", *(_dim_column(d) for d in dims)]
+    return {
+        "count": len(frame),
+        "orgs": frame["org"].nunique(),
+        "mean": float(overall.mean()) if len(frame) else None,
+        "median": float(overall.median()) if len(frame) else None,
+        "dimensions": dims,
+        "dimension_means": {d: float(frame[_dim_column(d)].mean()) for d in dims},
+        "histograms": histograms(frame, dims),
+        "tiers": tier_counts(frame),
+        "regions": region_heatmaps(frame, dims),
+        "sample": sample(frame[columns]),
+    }
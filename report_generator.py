@@ -1,41 +1,57 @@
 """
 report_generator.py — Génère le rapport Markdown de croissance Bellepros.
+
+``iter_report`` produit le rapport section par section (``generate_report``
+en est la concaténation) ; ``write_report`` l'écrit au fil de l'eau dans un
+fichier ou une réponse HTTP. ``iter_network_report`` assemble un rapport
+de réseau (une section par organisation + synthèse) en mémoire constante,
+quel que soit le nombre d'organisations.
 """
 
-from typing import Any, Dict
+import tempfile
 from datetime import datetime
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
+from config import GROWTH_TIERS
+from tracing import traced
 
-def generate_report(assessment: Dict[str, Any], org_name: str = "Bellepros") -> str:
+COPY_CHUNK = 1024 * 1024  # characters copied at a time from the spool files
+
+
+def _h(level: int, depth: int) -> str:
+    return "#" * (level + depth)
+
+
+# ---------------------------------------------------------------------------
+# Sections (listes de lignes)
+# ---------------------------------------------------------------------------
+
+def _summary_section(assessment: Dict[str, Any], depth: int = 0) -> List[str]:
     tier = assessment["tier"]
     overall = assessment["overall_score"]
     stars = "★" * assessment["stars"] + "☆" * (5 - assessment["stars"])
-
     lines = [
-        f"# Rapport de Stratégie de Croissance — {org_name}",
-        f"**Date :** {datetime.now().strftime('%Y-%m-%d %H:%M')}",
-        f"**Dimensions évaluées :** {len(assessment['dimensions_assessed'])}",
-        "",
-        "---",
+        f"{_h(2, depth)} Sommaire Exécutif",
         "",
-        "## Sommaire Exécutif",
-        "",
-        f"### Niveau de Préparation à la Croissance : {stars} ({overall:.0f}/100)",
+        f"{_h(3, depth)} Niveau de Préparation à la Croissance : {stars} ({overall:.0f}/100)",
         f"**Classification :** {tier['label']} — {tier['desc']}",
         "",
         "| Dimension | Score | Priorité |",
         "|-----------|-------|----------|",
     ]
-
     for dim_key in assessment["dimensions_assessed"]:
         res = assessment["dimension_results"][dim_key]
         lines.append(f"| {res['name']} | {res['score']:.0f}% | {res['priority']} |")
+    lines += ["", "---", ""]
+    return lines
 
-    lines += ["", "---", "", "## Analyse Détaillée par Dimension", ""]
 
+def _dimensions_section(assessment: Dict[str, Any], depth: int = 0) -> List[str]:
+    lines = [f"{_h(2, depth)} Analyse Détaillée par Dimension", ""]
     for dim_key in assessment["dimensions_assessed"]:
         res = assessment["dimension_results"][dim_key]
-        lines.append(f"### {res['name']}")
+        lines.append(f"{_h(3, depth)} {res['name']}")
         lines.append(f"**Score :** {res['score']:.0f}% | **Priorité :** {res['priority']}")
         lines.append("")
         if res["gaps"]:
@@ -50,9 +66,11 @@ def generate_report(assessment: Dict[str, Any], org_name: str = "Bellepros") ->
             lines.append("")
         lines.append("---")
         lines.append("")
+    return lines
+
 
-    # Regional analysis
-    lines += ["## Analyse Régionale — Marchés Prioritaires", ""]
+def _regions_section(assessment: Dict[str, Any], depth: int = 0) -> List[str]:
+    lines = [f"{_h(2, depth)} Analyse Régionale — Marchés Prioritaires", ""]
     lines.append("| Région | Population | Densité QSR | Loyer moy. $/pi² | Potentiel | Priorité |")
     lines.append("|--------|-----------|-------------|-------------------|-----------|----------|")
     for reg in assessment["regions"]:
@@ -63,13 +81,15 @@ def generate_report(assessment: Dict[str, Any], org_name: str = "Bellepros") ->
         )
     lines += ["", "*⭐ = région ciblée par le client*", ""]
 
-    lines.append("### Notes par région")
+    lines.append(f"{_h(3, depth)} Notes par région")
     for reg in assessment["regions"][:5]:
         lines.append(f"- **{reg['name']}** — {reg['notes']}")
     lines += ["", "---", ""]
+    return lines
 
-    # Competitive analysis
-    lines += ["## Analyse Concurrentielle", ""]
+
+def _competitors_section(assessment: Dict[str, Any], depth: int = 0) -> List[str]:
+    lines = [f"{_h(2, depth)} Analyse Concurrentielle", ""]
     lines.append("| Concurrent | Unités QC | Menace | Vulnérabilité | Opportunité |")
     lines.append("|------------|-----------|--------|---------------|-------------|")
     for comp in assessment["competitors"]:
@@ -79,38 +99,223 @@ def generate_report(assessment: Dict[str, Any], org_name: str = "Bellepros") ->
             f"{comp['vulnerabilite']}% | {opp} |"
         )
     lines += ["", "---", ""]
+    return lines
+
+
+_ROADMAP_HEADINGS = (
+    ("critique", "🔴 Actions Immédiates (0-3 mois) — Critique"),
+    ("court_terme", "🟠 Court Terme (3-6 mois) — Priorité Élevée"),
+    ("moyen_terme", "🟡 Moyen Terme (6-12 mois) — Priorité Moyenne"),
+    ("long_terme", "🟢 Long Terme (12+ mois) — Amélioration Continue"),
+)
 
-    # Roadmap
+
+def _roadmap_section(assessment: Dict[str, Any], depth: int = 0) -> List[str]:
     roadmap = assessment["roadmap"]
-    lines += ["## Feuille de Route d'Expansion", ""]
+    lines = [f"{_h(2, depth)} Feuille de Route d'Expansion", ""]
+    for key, heading in _ROADMAP_HEADINGS:
+        if roadmap[key]:
+            lines.append(f"{_h(3, depth)} {heading}")
+            for item in roadmap[key]:
+                lines.append(f"- [ ] {item}")
+            lines.append("")
+    return lines
 
-    if roadmap["critique"]:
-        lines.append("### 🔴 Actions Immédiates (0-3 mois) — Critique")
-        for item in roadmap["critique"]:
-            lines.append(f"- [ ] {item}")
-        lines.append("")
 
-    if roadmap["court_terme"]:
-        lines.append("### 🟠 Court Terme (3-6 mois) — Priorité Élevée")
-        for item in roadmap["court_terme"]:
-            lines.append(f"- [ ] {item}")
-        lines.append("")
+_BODY_SECTIONS = (_summary_section, _dimensions_section, _regions_section, _competitors_section, _roadmap_section)
 
-    if roadmap["moyen_terme"]:
-        lines.append("### 🟡 Moyen Terme (6-12 mois) — Priorité Moyenne")
-        for item in roadmap["moyen_terme"]:
-            lines.append(f"- [ ] {item}")
-        lines.append("")
 
-    if roadmap["long_terme"]:
-        lines.append("### 🟢 Long Terme (12+ mois) — Amélioration Continue")
-        for item in roadmap["long_terme"]:
-            lines.append(f"- [ ] {item}")
-        lines.append("")
+def _join_sections(sections: Iterable[List[str]]) -> Iterator[str]:
+    """Chaque section en un bloc de texte ; la concaténation des blocs vaut ``"\\n".join`` des lignes."""
+    first = True
+    for lines in sections:
+        text = "\n".join(lines)
+        yield text if first else "\n" + text
+        first = False
 
-    lines += [
+
+# ---------------------------------------------------------------------------
+# Rapport d'une organisation
+# ---------------------------------------------------------------------------
+
+def _report_sections(assessment: Dict[str, Any], org_name: str) -> Iterator[List[str]]:
+    yield [
+        f"# Rapport de Stratégie de Croissance — {org_name}",
+        f"**Date :** {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        f"**Dimensions évaluées :** {len(assessment['dimensions_assessed'])}",
+        "",
+        "---",
+        "",
+    ]
+    for section in _BODY_SECTIONS:
+        yield section(assessment)
+    yield [
         "---",
         f"*Rapport généré par la Console de Croissance Bellepros — {datetime.now().strftime('%Y-%m-%d %H:%M')}*",
     ]
 
-    return "\n".join(lines)
+
+def iter_report(assessment: Dict[str, Any], org_name: str = "Bellepros") -> Iterator[str]:
+    """Le rapport Markdown, section par section."""
+    return _join_sections(_report_sections(assessment, org_name))
+
+
+@traced("report.markdown")
+def generate_report(assessment: Dict[str, Any], org_name: str = "Bellepros") -> str:
+    # Same text as "".join(iter_report(...)), in a single join
+    return "\n".join(chain.from_iterable(_report_sections(assessment, org_name)))
+
+
+def write_report(chunks: Iterable[str], out: TextIO) -> int:
+    """Écrit des sections (``iter_report``, ``iter_network_report``) dans ``out`` ; retourne le nombre de caractères."""
+    written = 0
+    for chunk in chunks:
+        out.write(chunk)
+        written += len(chunk)
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Rapport de réseau (plusieurs organisations)
+# ---------------------------------------------------------------------------
+
+class _NetworkSummary:
+    """Agrégats du réseau en mémoire constante (médiane par histogramme au point près)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.low: Optional[Tuple[float, str]] = None
+        self.high: Optional[Tuple[float, str]] = None
+        self.histogram = [0] * 101
+        self.tiers = {key: 0 for key in GROWTH_TIERS}
+        self.dimensions: Dict[str, List[Any]] = {}  # key -> [name, score sum, count]
+
+    def add(self, org_name: str, assessment: Dict[str, Any]) -> None:
+        overall = assessment["overall_score"]
+        self.count += 1
+        self.total += overall
+        self.histogram[min(100, max(0, int(overall)))] += 1
+        if self.low is None or overall < self.low[0]:
+            self.low = (overall, org_name)
+        if self.high is None or overall > self.high[0]:
+            self.high = (overall, org_name)
+        tier_key = next((k for k, t in GROWTH_TIERS.items() if t == assessment["tier"]), None)
+        if tier_key is not None:
+            self.tiers[tier_key] += 1
+        for dim_key in assessment["dimensions_assessed"]:
+            res = assessment["dimension_results"][dim_key]
+            entry = self.dimensions.setdefault(dim_key, [res["name"], 0.0, 0])
+            entry[1] += res["score"]
+            entry[2] += 1
+
+    def median(self) -> int:
+        seen = 0
+        for score, n in enumerate(self.histogram):
+            seen += n
+            if 2 * seen >= self.count:
+                return score
+        return 100
+
+    def lines(self, depth: int = 0) -> List[str]:
+        if not self.count:
+            return [f"{_h(2, depth)} Synthèse du Réseau", "", "*Aucune organisation évaluée.*", ""]
+        lines = [
+            f"{_h(2, depth)} Synthèse du Réseau",
+            "",
+            f"**Organisations évaluées :** {self.count:,}",
+            f"**Score moyen :** {self.total / self.count:.1f}/100 — **médiane :** {self.median()}/100",
+            f"**Plus bas :** {self.low[1]} ({self.low[0]:.0f}) — **plus haut :** {self.high[1]} ({self.high[0]:.0f})",
+            "",
+            "| Niveau | Organisations | Part |",
+            "|--------|---------------|------|",
+        ]
+        for key, n in self.tiers.items():
+            lines.append(f"| {GROWTH_TIERS[key]['label']} | {n:,} | {n / self.count:.0%} |")
+        lines += ["", "| Dimension | Score moyen | Organisations |", "|-----------|-------------|---------------|"]
+        for name, total, n in sorted(self.dimensions.values(), key=lambda entry: entry[1] / entry[2]):
+            lines.append(f"| {name} | {total / n:.0f}% | {n:,} |")
+        lines.append("")
+        return lines
+
+
+def _network_row(org_name: str, assessment: Dict[str, Any]) -> str:
+    results = assessment["dimension_results"]
+    weakest = min(assessment["dimensions_assessed"], key=lambda d: results[d]["score"], default=None)
+    top_region = assessment["regions"][0]["name"] if assessment["regions"] else "—"
+    weakest_text = f"{results[weakest]['short']} ({results[weakest]['score']:.0f}%)" if weakest else "—"
+    return (
+        f"| {org_name} | {assessment['overall_score']:.0f} | {assessment['tier']['label']} | "
+        f"{weakest_text} | {top_region} |"
+    )
+
+
+_NETWORK_TABLE_HEADER = [
+    "| Organisation | Score | Niveau | Dimension la plus faible | Marché prioritaire |",
+    "|--------------|-------|--------|--------------------------|--------------------|",
+]
+
+
+def _org_section(org_name: str, assessment: Dict[str, Any]) -> List[str]:
+    lines = [f"## {org_name}", ""]
+    for section in _BODY_SECTIONS:
+        lines += section(assessment, depth=1)
+    return lines
+
+
+def _copy(spool: TextIO) -> Iterator[str]:
+    spool.seek(0)
+    while True:
+        chunk = spool.read(COPY_CHUNK)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_network_report(
+    organizations: Iterable[Tuple[str, Dict[str, Any]]],
+    network_name: str = "Bellepros",
+    summary_first: bool = True,
+) -> Iterator[str]:
+    """Rapport consolidé : synthèse du réseau, tableau par organisation, puis une section chacune.
+
+    ``organizations`` : paires (nom, résultat de ``run_assessment``), lues
+    une seule fois. Avec ``summary_first``, sections et lignes du tableau
+    transitent par des fichiers temporaires pour placer la synthèse en
+    tête ; sinon tout sort au fil de l'eau et la synthèse vient à la fin.
+    La mémoire ne dépend pas du nombre d'organisations.
+    """
+    date = datetime.now().strftime("%Y-%m-%d %H:%M")
+    header = [
+        f"# Rapport de Réseau — {network_name}",
+        f"**Date :** {date}",
+        "",
+        "---",
+        "",
+    ]
+    footer = ["---", f"*Rapport généré par la Console de Croissance Bellepros — {date}*"]
+    summary = _NetworkSummary()
+
+    if not summary_first:
+        yield "\n".join(header)
+        for org_name, assessment in organizations:
+            summary.add(org_name, assessment)
+            yield "\n" + "\n".join(_org_section(org_name, assessment))
+        yield "\n" + "\n".join(summary.lines())
+        yield "\n" + "\n".join(footer)
+        return
+
+    with tempfile.TemporaryFile("w+", encoding="utf-8") as rows, \
+            tempfile.TemporaryFile("w+", encoding="utf-8") as sections:
+        for org_name, assessment in organizations:
+            summary.add(org_name, assessment)
+            rows.write("\n" + _network_row(org_name, assessment))
+            sections.write("\n" + "\n".join(_org_section(org_name, assessment)))
+
+        yield "\n".join(header)
+        yield "\n" + "\n".join(summary.lines() + ["---", "", "## Organisations", ""] + _NETWORK_TABLE_HEADER)
+        yield from _copy(rows)
+        if summary.count:
+            yield "\n\n---\n"
+            yield from _copy(sections)
+        yield "\n" + "\n".join(footer)
@@ -0,0 +1,130 @@
+"""
+scoring_schema.py — Schéma des questions dérivé de ``questionnaire.QUESTION_MAP``.
+
+Valeurs valides, nombre d'options, appartenance aux dimensions et codage
+binaire des choix multiples viennent d'une seule source : le questionnaire.
+``validate_scoring_tables`` vérifie au chargement que les tables de scoring
+concordent avec lui, pour qu'une option ajoutée ne fasse pas dériver les
+scores en silence.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from questionnaire import QUESTIONS, Question
+
+
+class SchemaError(ValueError):
+    """Les tables de scoring ne concordent pas avec le questionnaire."""
+
+
+class QuestionSchema:
+    __slots__ = ("qid", "answer_type", "dimension", "values", "bits")
+
+    def __init__(self, question: Question):
+        self.qid = question.qid
+        self.answer_type = question.answer_type
+        self.dimension = question.dimension
+        self.values: Tuple[str, ...] = tuple(opt["value"] for opt in question.options)
+        # Bit i of a multi-select answer stands for the i-th option
+        self.bits: Dict[str, int] = {value: 1 << i for i, value in enumerate(self.values)}
+
+    @property
+    def option_count(self) -> int:
+        return len(self.values)
+
+
+class Schema:
+    """Questions indexées par identifiant, dans l'ordre du questionnaire."""
+
+    def __init__(self, questions: Iterable[Question]):
+        self.questions: Dict[str, QuestionSchema] = {q.qid: QuestionSchema(q) for q in questions}
+        self.multi_qids: Tuple[str, ...] = tuple(q.qid for q in self.questions.values() if q.answer_type == "multi")
+
+    def __getitem__(self, qid: str) -> QuestionSchema:
+        return self.questions[qid]
+
+    def __contains__(self, qid: str) -> bool:
+        return qid in self.questions
+
+    def option_counts(self, answer_type: str = "multi") -> Dict[str, int]:
+        return {q.qid: q.option_count for q in self.questions.values() if q.answer_type == answer_type}
+
+    def dimension_questions(self) -> Dict[str, List[str]]:
+        dims: Dict[str, List[str]] = {}
+        for q in self.questions.values():
+            dims.setdefault(q.dimension, []).append(q.qid)
+        return dims
+
+    def encode_multi(self, qid: str, values: Iterable[str]) -> int:
+        """Réponse à choix multiples → entier (un bit par option)."""
+        bits = self.questions[qid].bits
+        mask = 0
+        for value in values:
+            try:
+                mask |= bits[value]
+            except KeyError:
+                raise ValueError(f"Option inconnue pour {qid} : {value!r}") from None
+        return mask
+
+    def decode_multi(self, qid: str, mask: int) -> List[str]:
+        """Entier → liste des options cochées, dans l'ordre du questionnaire."""
+        values = self.questions[qid].values
+        if mask >> len(values):
+            raise ValueError(f"Bits hors des {len(values)} options de {qid} : {mask}")
+        return [value for i, value in enumerate(values) if mask >> i & 1]
+
+
+def load_schema(questions: Optional[Iterable[Question]] = None) -> Schema:
+    return Schema(QUESTIONS if questions is None else questions)
+
+
+def validate_scoring_tables(
+    schema: Schema,
+    score_maps: Dict[str, Dict[str, Any]],
+    multi_config: Dict[str, Dict[str, Any]],
+    dimension_questions: Dict[str, List[str]],
+    scale_questions: Dict[str, int],
+) -> None:
+    """Lève ``SchemaError`` avec la liste complète des écarts, s'il y en a."""
+    problems = []
+    for qid, mapping in score_maps.items():
+        if qid not in schema:
+            problems.append(f"SCORE_MAPS : question inconnue {qid}")
+            continue
+        q = schema[qid]
+        if q.answer_type != "single":
+            problems.append(f"SCORE_MAPS : {qid} est de type {q.answer_type}")
+        missing = [v for v in q.values if v not in mapping]
+        extra = [v for v in mapping if v not in q.bits]
+        if missing:
+            problems.append(f"SCORE_MAPS[{qid}] : options sans score {missing}")
+        if extra:
+            problems.append(f"SCORE_MAPS[{qid}] : valeurs absentes du questionnaire {extra}")
+    for qid, config in multi_config.items():
+        if qid not in schema:
+            problems.append(f"MULTI_SCORE_CONFIG : question inconnue {qid}")
+        elif schema[qid].answer_type != "multi":
+            problems.append(f"MULTI_SCORE_CONFIG : {qid} est de type {schema[qid].answer_type}")
+        elif config.get("dimension", schema[qid].dimension) != schema[qid].dimension:
+            problems.append(f"MULTI_SCORE_CONFIG[{qid}] : dimension {config['dimension']} ≠ {schema[qid].dimension}")
+    for qid in scale_questions:
+        if qid not in schema or schema[qid].answer_type != "scale":
+            problems.append(f"SCALE_QUESTIONS : {qid} n'est pas une question à échelle")
+
+    scored = set(score_maps) | set(multi_config) | set(scale_questions)
+    for q in schema.questions.values():
+        if q.qid not in scored:
+            problems.append(f"{q.qid} n'a aucune règle de scoring (score fixe de 50)")
+    expected = schema.dimension_questions()
+    for dim_key in sorted(set(expected) | set(dimension_questions)):
+        declared = set(dimension_questions.get(dim_key, []))
+        derived = set(expected.get(dim_key, []))
+        if declared != derived:
+            problems.append(
+                f"DIMENSION_QUESTIONS[{dim_key}] : {sorted(declared)} ≠ questionnaire {sorted(derived)}"
+            )
+    if problems:
+        raise SchemaError("Tables de scoring incohérentes avec le questionnaire :\n- " + "\n- ".join(problems))
+
+
+SCHEMA = load_schema()
@@ -0,0 +1,130 @@
+"""
+sensitivity.py — Analyse « et si ? » : effet d'un changement de réponse sur le score.
+
+Les scores de dimension de référence sont calculés une fois ; un scénario
+ne recalcule que les dimensions qui contiennent les questions modifiées,
+puis le score global pondéré. Quelques microsecondes par scénario, ce qui
+permet de balayer toutes les options de toutes les questions.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from assessor import DEFAULT_MODEL, ScoringModel, _MULTI, _SCALE, _decode_bitsets
+from config import ALL_DIMENSION_KEYS, DIMENSIONS, get_growth_tier
+from questionnaire import QUESTION_MAP
+
+
+class WhatIf:
+    """Scénarios sur un jeu de réponses de référence (mêmes scores que ``run_assessment``)."""
+
+    def __init__(
+        self,
+        answers: Dict[str, Any],
+        dimensions: Optional[List[str]] = None,
+        model: Optional[ScoringModel] = None,
+    ):
+        self.model = model or DEFAULT_MODEL
+        self.answers = dict(_decode_bitsets(answers, self.model.schema))
+        self.dims = list(dimensions or ALL_DIMENSION_KEYS)
+        for dim_key in self.dims:
+            if dim_key not in DIMENSIONS:
+                raise KeyError(dim_key)
+        self._weights = [self.model.weights[d] for d in self.dims]
+        self._total_weight = sum(self._weights)
+        self.dimension_scores = [self.model.dimension_score(d, self.answers) for d in self.dims]
+        self.overall = self._overall(self.dimension_scores)
+
+        # Question -> positions (in self.dims) of the dimensions it feeds
+        self._touched: Dict[str, List[int]] = {}
+        for j, dim_key in enumerate(self.dims):
+            for i in self.model.dimension_plans.get(dim_key, ()):
+                self._touched.setdefault(self.model.question_ids[i], []).append(j)
+        self.questions = list(self._touched)
+
+    def _overall(self, dim_scores: List[float]) -> float:
+        # Same summation order as run_assessment, so results match exactly
+        if self._total_weight <= 0:
+            return 0
+        return sum(score * weight for score, weight in zip(dim_scores, self._weights)) / self._total_weight
+
+    def score(self, changes: Dict[str, Any]) -> float:
+        """Score global si les réponses ``changes`` remplaçaient celles de référence."""
+        touched = {j for qid in changes for j in self._touched.get(qid, ())}
+        if not touched:
+            return self.overall
+        answers = {**self.answers, **changes}
+        dim_scores = list(self.dimension_scores)
+        for j in touched:
+            dim_scores[j] = self.model.dimension_score(self.dims[j], answers)
+        return self._overall(dim_scores)
+
+    def what_if(self, changes: Dict[str, Any]) -> Dict[str, Any]:
+        """Scénario détaillé : score, écart, niveau et dimensions modifiées."""
+        overall = self.score(changes)
+        touched = sorted({j for qid in changes for j in self._touched.get(qid, ())})
+        answers = {**self.answers, **changes}
+        return {
+            "overall_score": overall,
+            "delta": overall - self.overall,
+            "tier": get_growth_tier(overall),
+            "dimension_scores": {
+                self.dims[j]: self.model.dimension_score(self.dims[j], answers) for j in touched
+            },
+        }
+
+    def candidate_values(self, qid: str) -> List[Any]:
+        """Réponses possibles pour une question (une option de plus pour un choix multiple)."""
+        i = self.model.question_index[qid]
+        kind = self.model.kinds[i]
+        if kind == _SCALE:
+            return list(range(1, self.model.payloads[i] + 1))
+        values = [opt["value"] for opt in QUESTION_MAP[qid].options] if qid in QUESTION_MAP else list(self.model.codes[i])
+        if kind == _MULTI:
+            current = self.answers.get(qid)
+            current = current if isinstance(current, list) else []
+            # Every extra option scores the same: one candidate is enough
+            extra = [v for v in values if v not in current]
+            return [current + extra[:1]] if extra else []
+        return values
+
+    def sweep(self, qid: str) -> List[Dict[str, Any]]:
+        """Score global pour chaque réponse possible à ``qid``."""
+        return [
+            {"value": value, "overall_score": overall, "delta": overall - self.overall}
+            for value in self.candidate_values(qid)
+            for overall in (self.score({qid: value}),)
+        ]
+
+    def rank_improvements(self) -> List[Dict[str, Any]]:
+        """Meilleur changement d'une seule réponse par question, trié par gain décroissant."""
+        ranking = []
+        for qid in self.questions:
+            current = self.answers.get(qid)
+            best = None
+            for row in self.sweep(qid):
+                if row["value"] == current:
+                    continue
+                if best is None or row["delta"] > best["delta"]:
+                    best = row
+            if best is not None and best["delta"] > 0:
+                ranking.append({
+                    "qid": qid,
+                    "current": current,
+                    "best_value": best["value"],
+                    "overall_score": best["overall_score"],
+                    "gain": best["delta"],
+                    "tier": get_growth_tier(best["overall_score"]),
+                })
+        ranking.sort(key=lambda row: -row["gain"])
+        return ranking
+
+
+def answer_label(qid: str, value: Any) -> str:
+    """Libellé lisible d'une réponse (options du questionnaire)."""
+    q = QUESTION_MAP.get(qid)
+    if q is None or value is None:
+        return "—" if value is None else str(value)
+    labels = {opt["value"]: opt["label"] for opt in q.options}
+    if isinstance(value, list):
+        return ", ".join(labels.get(v, str(v)) for v in value) or "—"
+    return labels.get(value, str(value))
@@ -0,0 +1,409 @@
+"""
+storage.py — Historique des évaluations (SQLite local).
+
+Une ligne par évaluation : organisation, répondant, horodatage, score
+global, niveau, score de chaque dimension et réponses (choix multiples
+codés bit à bit, ``scoring_schema.SCHEMA.encode_multi``). L'index
+(org, created_at) sert les séries temporelles d'une organisation ; un
+histogramme des scores (pas de 0,1 point) sert les rangs centiles entre
+organisations sans parcourir la table : quelques millisecondes, même sur
+un million d'évaluations. L'histogramme ne compte que la dernière
+évaluation de chaque organisation (table ``org_latest``) : une
+organisation réévaluée dix fois pèse autant qu'une autre.
+
+Le fichier est désigné par ``BELLEPROS_STORE``
+(``bellepros_evaluations.sqlite3`` par défaut).
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from config import ALL_DIMENSION_KEYS, GROWTH_TIERS
+from scoring_schema import SCHEMA
+
+STORE_ENV = "BELLEPROS_STORE"
+DEFAULT_STORE_PATH = "bellepros_evaluations.sqlite3"
+OVERALL = "overall"
+# Histogram resolution: scores are bucketed to 1 / HISTOGRAM_SCALE point
+HISTOGRAM_SCALE = 10
+INSERT_BATCH = 10_000
+
+_SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS assessments (
+    id INTEGER PRIMARY KEY,
+    org TEXT NOT NULL,
+    respondent TEXT NOT NULL DEFAULT '',
+    created_at REAL NOT NULL,
+    overall_score REAL NOT NULL,
+    tier TEXT NOT NULL,
+    answers TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS assessments_org_time ON assessments (org, created_at);
+CREATE TABLE IF NOT EXISTS score_histogram (
+    metric TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    n INTEGER NOT NULL,
+    PRIMARY KEY (metric, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS org_latest (
+    org TEXT PRIMARY KEY,
+    assessment_id INTEGER NOT NULL,
+    created_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+# Orgs looked up per query when updating the latest assessments
+LOOKUP_BATCH = 500
+
+
+def _dim_column(dim_key: str) -> str:
+    if not dim_key.isidentifier():
+        raise ValueError(f"Clé de dimension invalide : {dim_key}")
+    return f"{dim_key}_score"
+
+
+def _bucket(score: float) -> int:
+    return int(math.floor(score * HISTOGRAM_SCALE + 1e-9))
+
+
+def tier_key(tier: Mapping[str, Any]) -> str:
+    """Clé de ``config.GROWTH_TIERS`` d'un niveau retourné par ``run_assessment``."""
+    return next((key for key, t in GROWTH_TIERS.items() if t == tier), "")
+
+
+def encode_answers(answers: Mapping[str, Any]) -> str:
+    """JSON compact ; les choix multiples connus du schéma deviennent un entier."""
+    compact = {}
+    for qid, value in answers.items():
+        if isinstance(value, list) and qid in SCHEMA and SCHEMA[qid].answer_type == "multi":
+            try:
+                value = SCHEMA.encode_multi(qid, value)
+            except ValueError:  # unknown option: keep the list as is
+                pass
+        compact[qid] = value
+    return json.dumps(compact, ensure_ascii=False, separators=(",", ":"))
+
+
+def decode_answers(text: str) -> Dict[str, Any]:
+    answers = json.loads(text)
+    for qid, value in answers.items():
+        if isinstance(value, int) and not isinstance(value, bool) and qid in SCHEMA and SCHEMA[qid].answer_type == "multi":
+            answers[qid] = SCHEMA.decode_multi(qid, value)
+    return answers
+
+
+class AssessmentStore:
+    """Évaluations persistées dans un fichier SQLite (un seul écrivain à la fois)."""
+
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        has_latest = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'org_latest'"
+        ).fetchone() is not None
+        self._conn.executescript(_SCHEMA_SQL)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(assessments)")}
+        # Dimensions added to config after the file was created get a column
+        for dim_key in ALL_DIMENSION_KEYS:
+            if _dim_column(dim_key) not in existing:
+                self._conn.execute(f"ALTER TABLE assessments ADD COLUMN {_dim_column(dim_key)} REAL")
+        self.dimensions: List[str] = list(ALL_DIMENSION_KEYS)
+        self._columns = [
+            "org", "respondent", "created_at", "overall_score", "tier", "answers",
+            *(_dim_column(d) for d in self.dimensions),
+        ]
+        self._insert_sql = (
+            f"INSERT INTO assessments ({', '.join(self._columns)}) "
+            f"VALUES ({', '.join('?' * len(self._columns))})"
+        )
+        self._metrics = [OVERALL, *self.dimensions]
+        self._score_columns = ["overall_score", *(_dim_column(d) for d in self.dimensions)]
+        if not has_latest:
+            # Files from before org_latest counted every assessment
+            self._rebuild_latest()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # -- writes -------------------------------------------------------------
+
+    def _bump(self, histogram: Counter, scores: Sequence[Optional[float]], delta: int) -> None:
+        for metric, score in zip(self._metrics, scores):
+            if score is not None:
+                histogram[metric, _bucket(score)] += delta
+
+    def _save_histogram(self, histogram: Counter) -> None:
+        self._conn.executemany(
+            "INSERT INTO score_histogram (metric, bucket, n) VALUES (?, ?, ?) "
+            "ON CONFLICT (metric, bucket) DO UPDATE SET n = n + excluded.n",
+            [(metric, bucket, n) for (metric, bucket), n in histogram.items() if n],
+        )
+        if any(n < 0 for n in histogram.values()):
+            self._conn.execute("DELETE FROM score_histogram WHERE n <= 0")
+
+    def _current_latest(self, orgs: List[str]) -> Dict[str, tuple]:
+        """org → (created_at, scores…) de la dernière évaluation déjà enregistrée."""
+        columns = ", ".join(f"a.{c}" for c in self._score_columns)
+        latest = {}
+        for start in range(0, len(orgs), LOOKUP_BATCH):
+            chunk = orgs[start:start + LOOKUP_BATCH]
+            for row in self._conn.execute(
+                f"SELECT l.org, l.created_at, {columns} FROM org_latest l "
+                f"JOIN assessments a ON a.id = l.assessment_id WHERE l.org IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            ):
+                latest[row[0]] = row[1:]
+        return latest
+
+    def _write(self, values: List[Sequence[Any]]) -> None:
+        dim_offset = len(self._columns) - len(self.dimensions)
+        # Most recent new row per org; on equal timestamps the later row wins
+        newest: Dict[str, int] = {}
+        for i, row in enumerate(values):
+            j = newest.get(row[0])
+            if j is None or row[2] >= values[j][2]:
+                newest[row[0]] = i
+        with self._lock:
+            # IMMEDIATE: no other writer between reading max(id) and inserting
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Rows are never deleted, so new ids follow max(id) in order
+                first_id = self._conn.execute("SELECT coalesce(max(id), 0) + 1 FROM assessments").fetchone()[0]
+                self._conn.executemany(self._insert_sql, values)
+                previous = self._current_latest(list(newest))
+                histogram: Counter = Counter()
+                latest = []
+                for org, i in newest.items():
+                    row = values[i]
+                    old = previous.get(org)
+                    if old is not None:
+                        if row[2] < old[0]:
+                            continue  # back-filled history: the stored one stays the latest
+                        self._bump(histogram, old[1:], -1)
+                    self._bump(histogram, (row[3], *row[dim_offset:]), 1)
+                    latest.append((org, first_id + i, row[2]))
+                self._conn.executemany(
+                    "INSERT INTO org_latest (org, assessment_id, created_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (org) DO UPDATE SET assessment_id = excluded.assessment_id, "
+                    "created_at = excluded.created_at",
+                    latest,
+                )
+                self._save_histogram(histogram)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _rebuild_latest(self) -> None:
+        """Recalcule ``org_latest`` et l'histogramme à partir des évaluations."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # SQLite bare columns: with max(), they come from the row holding the max
+                rows = self._conn.execute(
+                    f"SELECT org, id, created_at, {', '.join(self._score_columns)}, max(created_at) "
+                    "FROM assessments GROUP BY org"
+                ).fetchall()
+                histogram: Counter = Counter()
+                for row in rows:
+                    self._bump(histogram, row[3:-1], 1)
+                self._conn.execute("DELETE FROM org_latest")
+                self._conn.execute("DELETE FROM score_histogram")
+                self._conn.executemany(
+                    "INSERT INTO org_latest (org, assessment_id, created_at) VALUES (?, ?, ?)",
+                    [row[:3] for row in rows],
+                )
+                self._save_histogram(histogram)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def add(
+        self,
+        org: str,
+        assessment: Dict[str, Any],
+        answers: Mapping[str, Any],
+        respondent: str = "",
+        created_at: Optional[float] = None,
+    ) -> None:
+        """Enregistre un résultat de ``run_assessment``."""
+        results = assessment["dimension_results"]
+        self._write([(
+            org, respondent, time.time() if created_at is None else created_at,
+            float(assessment["overall_score"]), tier_key(assessment["tier"]), encode_answers(answers),
+            *(float(results[d]["score"]) if d in results else None for d in self.dimensions),
+        )])
+
+    def add_many(
+        self,
+        rows: Iterable[Mapping[str, Any]],
+        answers: Optional[Iterable[Mapping[str, Any]]] = None,
+        created_at: Optional[float] = None,
+    ) -> int:
+        """Insertion en lot de lignes au format de ``batch.score_chunk``.
+
+        Colonnes lues : ``id``, ``org``, ``overall_score``, ``tier`` et
+        ``<dimension>_score`` ; ``answers`` (même ordre que ``rows``) est
+        facultatif. Une transaction par tranche de ``INSERT_BATCH`` lignes.
+        """
+        created_at = time.time() if created_at is None else created_at
+        answers_iter = iter(answers) if answers is not None else None
+        dim_columns = [_dim_column(d) for d in self.dimensions]
+        pending: List[Sequence[Any]] = []
+        count = 0
+        for row in rows:
+            encoded = encode_answers(next(answers_iter)) if answers_iter is not None else "{}"
+            pending.append((
+                row.get("org") or "", str(row.get("id") or ""), row.get("created_at", created_at),
+                float(row["overall_score"]), row["tier"], encoded,
+                *(row.get(column) for column in dim_columns),
+            ))
+            if len(pending) >= INSERT_BATCH:
+                self._write(pending)
+                count += len(pending)
+                pending = []
+        if pending:
+            self._write(pending)
+            count += len(pending)
+        return count
+
+    # -- queries ------------------------------------------------------------
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def count(self) -> int:
+        """Nombre d'évaluations enregistrées (les lignes ne sont jamais supprimées)."""
+        return self._query("SELECT coalesce(max(id), 0) FROM assessments")[0][0]
+
+    def org_count(self) -> int:
+        """Nombre d'organisations, soit la taille du groupe de pairs des rangs centiles."""
+        return self._query("SELECT coalesce(sum(n), 0) FROM score_histogram WHERE metric = ?", (OVERALL,))[0][0]
+
+    def orgs(self) -> List[str]:
+        """Organisations présentes (parcourt l'index org, created_at)."""
+        return [row[0] for row in self._query("SELECT DISTINCT org FROM assessments ORDER BY org")]
+
+    def history(
+        self,
+        org: str,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Évaluations d'une organisation, de la plus ancienne à la plus récente."""
+        columns = ["id", "respondent", "created_at", "overall_score", "tier", *(_dim_column(d) for d in self.dimensions)]
+        sql = f"SELECT {', '.join(columns)} FROM assessments WHERE org = ? AND created_at >= ? AND created_at <= ?"
+        params: List[Any] = [org, -math.inf if since is None else since, math.inf if until is None else until]
+        if limit is not None:
+            # The most recent ``limit`` rows, returned in chronological order
+            sql = f"SELECT * FROM ({sql} ORDER BY created_at DESC LIMIT ?) ORDER BY created_at"
+            params.append(limit)
+        else:
+            sql += " ORDER BY created_at"
+        return [dict(zip(columns, row)) for row in self._query(sql, params)]
+
+    def latest(self, org: str) -> Optional[Dict[str, Any]]:
+        rows = self.history(org, limit=1)
+        return rows[0] if rows else None
+
+    def answers(self, assessment_id: int) -> Optional[Dict[str, Any]]:
+        rows = self._query("SELECT answers FROM assessments WHERE id = ?", (assessment_id,))
+        return decode_answers(rows[0][0]) if rows else None
+
+    def scores(self, latest_only: bool = True) -> Tuple[List[str], List[tuple]]:
+        """(colonnes, lignes) de toutes les évaluations, pour un tableau de bord de réseau.
+
+        Avec ``latest_only``, la plus récente par organisation (celle de
+        ``org_latest``, comptée dans les rangs centiles). ``regions_cibles``
+        est le champ brut des réponses : entier codé bit à bit, liste JSON
+        ou ``None``.
+        """
+        columns = ["org", "created_at", "overall_score", "tier", *(_dim_column(d) for d in self.dimensions)]
+        sql = f"SELECT {', '.join(columns)}, json_extract(answers, '$.regions_cibles') FROM assessments"
+        if latest_only:
+            sql += " WHERE id IN (SELECT assessment_id FROM org_latest)"
+        return columns + ["regions_cibles"], self._query(sql)
+
+    def _histogram(self, metric: str) -> List[tuple]:
+        return self._query("SELECT bucket, n FROM score_histogram WHERE metric = ? ORDER BY bucket", (metric,))
+
+    def percentile(self, score: float, metric: str = OVERALL) -> Optional[float]:
+        """Rang centile (0–100) d'un score parmi les organisations ; à 0,1 point près.
+
+        Chaque organisation compte une fois, par sa dernière évaluation.
+        ``metric`` : ``overall`` ou une clé de dimension. Les ex æquo comptent pour moitié.
+        """
+        bucket = _bucket(score)
+        below, equal, total = self._query(
+            "SELECT coalesce(sum(CASE WHEN bucket < ? THEN n END), 0), "
+            "coalesce(sum(CASE WHEN bucket = ? THEN n END), 0), coalesce(sum(n), 0) "
+            "FROM score_histogram WHERE metric = ?",
+            (bucket, bucket, metric),
+        )[0]
+        if not total:
+            return None
+        return 100.0 * (below + 0.5 * equal) / total
+
+    def quantiles(self, qs: Sequence[float] = (0.25, 0.5, 0.75), metric: str = OVERALL) -> Optional[List[float]]:
+        """Quantiles des dernières évaluations par organisation (borne basse du pas de 0,1 point)."""
+        histogram = self._histogram(metric)
+        total = sum(n for _, n in histogram)
+        if not total:
+            return None
+        result = []
+        for q in qs:
+            target = q * total
+            seen = 0
+            value = histogram[-1][0]
+            for bucket, n in histogram:
+                seen += n
+                if seen >= target:
+                    value = bucket
+                    break
+            result.append(value / HISTOGRAM_SCALE)
+        return result
+
+    def peer_summary(self, row: Mapping[str, Any]) -> Dict[str, Optional[float]]:
+        """Rang centile du score global et de chaque dimension d'une ligne de ``history``."""
+        summary = {OVERALL: self.percentile(row["overall_score"])}
+        for dim_key in self.dimensions:
+            score = row.get(_dim_column(dim_key))
+            if score is not None:
+                summary[dim_key] = self.percentile(score, dim_key)
+        return summary
+
+
+# ---------------------------------------------------------------------------
+# Base partagée, ouverte au premier usage
+# ---------------------------------------------------------------------------
+
+_store: Optional[AssessmentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> AssessmentStore:
+    """Base du processus : fichier ``BELLEPROS_STORE`` ou ``bellepros_evaluations.sqlite3``."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = AssessmentStore(os.environ.get(STORE_ENV) or DEFAULT_STORE_PATH)
+        return _store
+
+
+def set_store(store: Optional[AssessmentStore]) -> None:
+    """Remplace la base partagée (``None`` : réouverture au prochain usage)."""
+    global _store
+    with _store_lock:
+        _store = store
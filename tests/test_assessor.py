@@ -0,0 +1,70 @@
+"""
+test_assessor.py — Monte Carlo et calcul par lot face au calcul unitaire.
+"""
+
+import pytest
+
+from assessor import DEFAULT_MODEL, _neighbor_scores, run_assessment, run_assessment_batch, run_monte_carlo
+from questionnaire import default_answers
+from scoring_schema import SCHEMA
+
+REGIONS = SCHEMA["regions_cibles"]
+
+
+@pytest.mark.parametrize("count, expected", [
+    (3, (16.0, 24.0, 32.0)),
+    (5, (32.0, 40.0, 48.0)),
+    (0, (None, 0.0, 8.0)),
+    (len(REGIONS.values), (72.0, 80.0, None)),
+])
+@pytest.mark.parametrize("encode", [list, lambda v: SCHEMA.encode_multi("regions_cibles", v)], ids=["list", "bitset"])
+def test_multi_neighbors_are_one_option_apart(count, expected, encode):
+    answer = encode(REGIONS.values[:count])
+    assert _neighbor_scores(DEFAULT_MODEL, "regions_cibles", answer) == expected
+
+
+def test_monte_carlo_multi_band():
+    answers = {"regions_cibles": list(REGIONS.values[:3])}
+    result = run_monte_carlo(
+        answers, dimensions=[REGIONS.dimension], uncertainty={"regions_cibles": 1.0},
+        n_samples=1_000, seed=0,
+    )
+    band = result["dimensions"][REGIONS.dimension]
+    assert (band["p5"], band["p95"]) == (16.0, 32.0)
+
+
+def _bitset_answers():
+    """Réponses démo, choix multiples en listes, en entiers et mélangés."""
+    base = default_answers()
+    encoded = {**base, **{q: SCHEMA.encode_multi(q, base[q]) for q in SCHEMA.multi_qids if q in base}}
+    return [
+        base,
+        encoded,
+        {**base, "regions_cibles": 0},
+        {**encoded, "differenciateur": ["qualite"]},
+        {**base, "regions_cibles": (1 << len(REGIONS.values)) - 1},
+        {"differenciateur": 0, "nb_unites": 3},
+    ]
+
+
+@pytest.mark.parametrize("mixed", [False, True], ids=["bitsets", "mixed"])
+def test_batch_matches_single_on_bitsets(mixed):
+    answers_list = _bitset_answers()
+    if not mixed:
+        answers_list = answers_list[1:3] + answers_list[4:5]
+    batch = run_assessment_batch(answers_list)
+    for i, answers in enumerate(answers_list):
+        single = run_assessment(answers)
+        assert batch["overall_scores"][i] == single["overall_score"]
+        assert batch["tiers"][i] == single["tier"]
+        for j, dim_key in enumerate(batch["dimensions_assessed"]):
+            assert batch["dimension_scores"][i, j] == single["dimension_results"][dim_key]["score"]
+
+
+@pytest.mark.parametrize("value", [1 << len(REGIONS.values), 1 << 70], ids=["bit", "wide"])
+@pytest.mark.parametrize("others", [[], [["montreal"]]], ids=["ints", "mixed"])
+def test_out_of_range_bits_rejected_like_single(value, others):
+    with pytest.raises(ValueError, match="Bits hors"):
+        run_assessment({"regions_cibles": value})
+    with pytest.raises(ValueError, match="Bits hors"):
+        run_assessment_batch([{"regions_cibles": v} for v in [*others, value]])
@@ -0,0 +1,90 @@
+"""
+test_batch.py — Lot : une ligne illisible n'interrompt pas l'évaluation.
+"""
+
+import csv
+import json
+
+import pytest
+
+from batch import _top_regions, run_batch
+from config import QUEBEC_REGIONS
+from market_data import MarketData, get_market_data, set_market_data
+from storage import AssessmentStore
+
+
+def _write_jsonl(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_out_of_range_bits_become_an_error_row(tmp_path):
+    source = tmp_path / "reponses.jsonl"
+    _write_jsonl(source, [
+        {"id": 1, "regions_cibles": 4096},
+        {"id": 2, "regions_cibles": 3, "nb_unites": "6-15"},
+    ])
+    store = AssessmentStore(str(tmp_path / "store.sqlite3"))
+    summary = run_batch(str(source), str(tmp_path / "resultats.csv"), workers=1, store=store)
+
+    rows = _read_csv(tmp_path / "resultats.csv")
+    assert [row["id"] for row in rows] == ["1", "2"]
+    assert "Bits hors" in rows[0]["decode_error"] and rows[0]["overall_score"] == ""
+    assert rows[1]["decode_error"] == "" and float(rows[1]["overall_score"]) > 0
+    assert summary["count"] == 2 and summary["errors"] == 1
+    assert sum(summary["tiers"].values()) == 1
+    assert store.count() == 1
+
+
+def test_malformed_cells_and_lines_become_error_rows(tmp_path):
+    source = tmp_path / "reponses.csv"
+    source.write_text(
+        "id,regions_cibles,maturite_globale\n"
+        "a,[bad,3\n"
+        "b,montreal;laval,inf\n"
+        "c,montreal,4\n",
+        encoding="utf-8",
+    )
+    summary = run_batch(str(source), str(tmp_path / "resultats.csv"), workers=1)
+    rows = _read_csv(tmp_path / "resultats.csv")
+    assert [row["id"] for row in rows] == ["a", "b", "c"]
+    assert rows[0]["decode_error"].startswith("ValueError: Liste JSON invalide pour regions_cibles")
+    assert [row["decode_error"] for row in rows[1:]] == ["", ""]
+    assert summary["errors"] == 1
+
+    lines = tmp_path / "reponses.jsonl"
+    lines.write_text('{"id": "a", "nb_unites": "6-15"}\n{"id": "b", \n[1, 2]\n', encoding="utf-8")
+    summary = run_batch(str(lines), str(tmp_path / "resultats.jsonl"), workers=1)
+    with open(tmp_path / "resultats.jsonl", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["id"] for row in rows] == ["a", "2", "3"]
+    assert rows[0]["decode_error"] == "" and rows[1]["decode_error"].startswith("JSONDecodeError")
+    assert rows[2]["overall_score"] is None and summary["errors"] == 2
+
+
+def test_ids_sharing_a_slug_get_distinct_reports(tmp_path):
+    source = tmp_path / "reponses.csv"
+    source.write_text("id,org,nb_unites\nA-1,Alpha,1\na 1,Beta,6-15\n", encoding="utf-8")
+    reports = tmp_path / "rapports"
+    run_batch(str(source), str(tmp_path / "resultats.csv"), workers=1, reports_dir=str(reports), report_formats=["md"])
+    texts = [f.read_text(encoding="utf-8") for f in reports.iterdir()]
+    assert len(texts) == 2
+    assert any("Alpha" in text for text in texts) and any("Beta" in text for text in texts)
+
+
+@pytest.fixture
+def restore_market():
+    previous = get_market_data()
+    yield
+    set_market_data(previous)
+
+
+def test_top_regions_follow_a_swapped_market(restore_market):
+    answers = {"regions_cibles": ["montreal"], "nb_unites": "1"}
+    assert _top_regions(answers, 50.0).split(";")[0] in QUEBEC_REGIONS
+    set_market_data(MarketData.from_mapping({"nouvelle": QUEBEC_REGIONS["montreal"]}))
+    assert _top_regions(answers, 50.0) == "nouvelle"
@@ -0,0 +1,39 @@
+"""
+test_bulk_reports.py — Un rapport qui fait tomber le pool n'emporte pas les autres.
+"""
+
+import os
+import time
+
+import bulk_reports
+
+POISON = "poison"
+
+
+def _init_worker() -> None:
+    pass
+
+
+def _build_pdf(record, dims):
+    respondent_id = record[0]
+    if respondent_id == POISON:
+        os._exit(1)  # like a Chromium crash taking the worker down
+    time.sleep(0.05)
+    return respondent_id, f"{respondent_id}.pdf", b"%PDF-1.4", ""
+
+
+def test_only_the_record_crashing_alone_fails(tmp_path, monkeypatch):
+    monkeypatch.setattr(bulk_reports, "_init_worker", _init_worker)
+    monkeypatch.setattr(bulk_reports, "_build_pdf", _build_pdf)
+    ids = [f"r{i}" for i in range(3)] + [POISON] + [f"r{i}" for i in range(3, 8)]
+    calls = []
+
+    summary = bulk_reports.generate_reports_bulk(
+        ((i, i, {}, "") for i in ids), str(tmp_path / "rapports"), workers=3,
+        progress=lambda ok, failed, _: calls.append((ok, failed)),
+    )
+
+    assert (summary["count"], summary["failed"]) == (8, 1)
+    assert [e["id"] for e in summary["errors"]] == [POISON]
+    assert sorted(p.stem for p in (tmp_path / "rapports").iterdir()) == sorted(set(ids) - {POISON})
+    assert calls[-1] == (8, 1) and len(calls) == len(ids)
@@ -0,0 +1,47 @@
+"""
+test_job_queue.py — Un rendu dont la tâche a été reprise ne touche pas au résultat.
+"""
+
+import pytest
+
+from job_queue import DONE, FAILED, MAX_ATTEMPTS, JobQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = JobQueue(str(tmp_path / "jobs"))
+    yield queue
+    queue.close()
+
+
+def _reclaim(queue, job_id):
+    """Tâche jugée silencieuse puis relancée : la tentative courante change."""
+    queue.requeue_stale(timeout=-1)
+    return queue.claim(worker=2)
+
+
+def test_late_finisher_keeps_the_owner_result(queue):
+    job_id = queue.submit({"org": "Alpha"})
+    first = queue.claim(worker=1)
+    second = _reclaim(queue, job_id)
+    assert second["attempt"] == first["attempt"] + 1
+
+    assert queue.complete(job_id, b"%PDF owner", second["attempt"])
+    assert not queue.complete(job_id, b"%PDF late", first["attempt"])
+    assert not queue.fail(job_id, "late", first["attempt"])
+
+    assert queue.status(job_id)["status"] == DONE
+    assert queue.result(job_id) == b"%PDF owner"
+    assert [p.name for p in queue.results_dir.iterdir()] == [f"{job_id}.pdf"]
+
+
+def test_late_finisher_leaves_no_file_for_a_failed_job(queue):
+    job_id = queue.submit({"org": "Beta"})
+    job = queue.claim(worker=1)
+    for _ in range(MAX_ATTEMPTS - 1):
+        job = _reclaim(queue, job_id)
+    queue.requeue_stale(timeout=-1)
+    assert queue.status(job_id)["status"] == FAILED
+
+    assert not queue.complete(job_id, b"%PDF late", job["attempt"])
+    assert list(queue.results_dir.iterdir()) == []
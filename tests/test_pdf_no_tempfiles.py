@@ -0,0 +1,73 @@
+"""
+test_pdf_no_tempfiles.py — La génération PDF ne laisse aucun fichier temporaire.
+"""
+
+import os
+import struct
+import tempfile
+import zlib
+
+import pytest
+
+import pdf_generator
+from assessor import run_assessment
+from chart_renderer import ChartRenderer, get_renderer, set_renderer
+from questionnaire import default_answers
+
+REPORTS = 3
+
+
+def _png(width: int = 4, height: int = 4) -> bytes:
+    """PNG RVB uni, sans dépendance d'image."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+    raw = b"".join(b"\x00" + b"\xc4\x1e\x3a" * width for _ in range(height))
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(raw))
+        + chunk(b"IEND", b"")
+    )
+
+
+@pytest.fixture
+def temp_dir(tmp_path, monkeypatch):
+    """``tempfile.gettempdir()`` isolé : seuls nos PDF peuvent y écrire."""
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    for name in ("TMPDIR", "TEMP", "TMP"):
+        monkeypatch.setenv(name, str(tmp_path))
+    previous = get_renderer()
+    set_renderer(ChartRenderer(workers=0))
+    yield tmp_path
+    set_renderer(previous)
+
+
+@pytest.fixture(scope="module")
+def assessment():
+    return run_assessment(default_answers())
+
+
+def _fake_charts(figs, fmt="png", return_exceptions=False):
+    return [_png() for _ in figs]
+
+
+def _failed_charts(figs, fmt="png", return_exceptions=False):
+    errors = [RuntimeError("kaleido indisponible") for _ in figs]
+    if not return_exceptions:
+        raise errors[0]
+    return errors
+
+
+@pytest.mark.parametrize("render", [_fake_charts, _failed_charts, None], ids=["charts", "chart-failure", "renderer"])
+def test_no_tempfiles_after_reports(temp_dir, assessment, monkeypatch, render):
+    if render is not None:
+        monkeypatch.setattr(pdf_generator, "render_many", render)
+    before = set(os.listdir(tempfile.gettempdir()))
+    assert tempfile.gettempdir() == str(temp_dir)
+
+    for i in range(REPORTS):
+        pdf = bytes(pdf_generator.generate_pdf(assessment, org_name=f"Organisation {i}"))
+        assert pdf.startswith(b"%PDF")
+
+    assert set(os.listdir(tempfile.gettempdir())) == before
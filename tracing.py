@@ -0,0 +1,298 @@
+"""
+tracing.py — Mesure optionnelle des étapes du pipeline évaluation → PDF.
+
+Désactivé par défaut : ``span()`` retourne alors un gestionnaire de
+contexte partagé qui ne fait rien, et ``@traced`` appelle directement la
+fonction. Une fois activé, chaque span enregistre le temps réel, le temps
+CPU du thread et (optionnellement) le pic de mémoire Python, puis est
+exporté en JSON Lines ou en OTLP/JSON (lisible par le récepteur
+``otlpjsonfile`` d'un collecteur OpenTelemetry).
+
+Activation par variables d'environnement :
+
+    BELLEPROS_TRACE=1                   spans gardés en mémoire (panneau Streamlit)
+    BELLEPROS_TRACE_FILE=spans.jsonl    export fichier (implique BELLEPROS_TRACE)
+    BELLEPROS_TRACE_FORMAT=otlp         format OTLP/JSON au lieu de JSON Lines
+    BELLEPROS_TRACE_MEMORY=1            pic mémoire via tracemalloc (plus coûteux)
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+SERVICE_NAME = "bellepros-growth-tool"
+RECENT_SPANS = 500
+
+_enabled = False
+_track_memory = False
+_owns_tracemalloc = False
+_exporter: Optional["_FileExporter"] = None
+_recent: deque = deque(maxlen=RECENT_SPANS)
+_current: contextvars.ContextVar = contextvars.ContextVar("bellepros_span", default=None)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    """Étape chronométrée ; les spans imbriqués partagent la même trace."""
+
+    __slots__ = (
+        "name", "attributes", "trace_id", "span_id", "parent_id",
+        "start_ns", "end_ns", "wall_s", "cpu_s", "mem_peak_bytes", "error",
+        "_parent", "_token", "_t0", "_cpu0", "_mem0", "_peak",
+    )
+
+    def __init__(self, name: str, attributes: Dict[str, Any]):
+        self.name = name
+        self.attributes = attributes
+        self.error: Optional[str] = None
+        self.mem_peak_bytes: Optional[int] = None
+
+    def set(self, **attributes: Any) -> None:
+        """Ajoute des attributs (p. ex. nombre de graphiques, hits du cache)."""
+        self.attributes.update(attributes)
+
+    def __enter__(self) -> "Span":
+        parent = _current.get()
+        self._parent = parent
+        self.trace_id = parent.trace_id if parent else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent else None
+        if _track_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                # Resetting the peak below would hide the parent's own peak so far
+                parent._peak = max(parent._peak, peak)
+            tracemalloc.reset_peak()
+            self._mem0, self._peak = current, current
+        else:
+            self._mem0 = None
+        self._token = _current.set(self)
+        self.start_ns = time.time_ns()
+        self._cpu0 = time.thread_time()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.wall_s = time.perf_counter() - self._t0
+        self.cpu_s = time.thread_time() - self._cpu0
+        self.end_ns = self.start_ns + int(self.wall_s * 1e9)
+        if self._mem0 is not None and tracemalloc.is_tracing():
+            self._peak = max(self._peak, tracemalloc.get_traced_memory()[1])
+            self.mem_peak_bytes = self._peak - self._mem0
+            if self._parent is not None and self._parent._mem0 is not None:
+                self._parent._peak = max(self._parent._peak, self._peak)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        _current.reset(self._token)
+        _record(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "wall_s": self.wall_s,
+            "cpu_s": self.cpu_s,
+            "mem_peak_bytes": self.mem_peak_bytes,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+def span(name: str, **attributes: Any):
+    """``with span("pdf.output"):`` — ne coûte qu'un test de booléen si désactivé."""
+    if not _enabled:
+        return _NOOP
+    return Span(name, attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Décorateur : un span par appel de la fonction."""
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(spans: List[Span]) -> Dict[str, Any]:
+    """Spans au format OTLP/JSON (ExportTraceServiceRequest)."""
+    otlp_spans = []
+    for s in spans:
+        attributes = {f"bellepros.{k}": v for k, v in s.attributes.items()}
+        attributes["bellepros.cpu_s"] = s.cpu_s
+        if s.mem_peak_bytes is not None:
+            attributes["bellepros.mem_peak_bytes"] = s.mem_peak_bytes
+        otlp_span = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {},
+        }
+        if s.parent_id:
+            otlp_span["parentSpanId"] = s.parent_id
+        otlp_spans.append(otlp_span)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": __name__}, "spans": otlp_spans}],
+        }]
+    }
+
+
+class _FileExporter:
+    """Une ligne par span (JSON Lines) ou par span OTLP, ajoutée au fichier."""
+
+    def __init__(self, path: str, fmt: str = "jsonl"):
+        if fmt not in ("jsonl", "otlp"):
+            raise ValueError(f"Format de trace inconnu : {fmt} (jsonl ou otlp)")
+        self.fmt = fmt
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, s: Span) -> None:
+        payload = to_otlp([s]) if self.fmt == "otlp" else s.to_dict()
+        line = json.dumps(payload, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def _record(s: Span) -> None:
+    _recent.append(s)
+    if _exporter is not None:
+        try:
+            _exporter.export(s)
+        except (OSError, ValueError):
+            pass  # tracing must never break report generation
+
+
+# ---------------------------------------------------------------------------
+# Configuration
+# ---------------------------------------------------------------------------
+
+def enable(path: Optional[str] = None, fmt: str = "jsonl", memory: bool = False) -> None:
+    """Active le traçage ; ``path`` ajoute un export fichier."""
+    global _enabled, _track_memory, _owns_tracemalloc, _exporter
+    disable()
+    if path:
+        _exporter = _FileExporter(path, fmt)
+    _track_memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _owns_tracemalloc = True
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled, _track_memory, _owns_tracemalloc, _exporter
+    _enabled = False
+    if _owns_tracemalloc:
+        tracemalloc.stop()
+    _track_memory = _owns_tracemalloc = False
+    if _exporter is not None:
+        _exporter.close()
+        _exporter = None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def recent_spans(limit: Optional[int] = None) -> List[Span]:
+    """Derniers spans terminés (au plus ``RECENT_SPANS``), du plus ancien au plus récent."""
+    spans = list(_recent)
+    return spans[-limit:] if limit else spans
+
+
+def clear() -> None:
+    _recent.clear()
+
+
+def summarize(spans: List[Span]) -> List[Dict[str, Any]]:
+    """Statistiques par étape (nombre, p50/p95/max du temps réel, CPU moyen)."""
+    import statistics  # only the timing panel needs it
+
+    by_name: Dict[str, List[Span]] = {}
+    for s in spans:
+        by_name.setdefault(s.name, []).append(s)
+    rows = []
+    for name, group in by_name.items():
+        walls = sorted(s.wall_s for s in group)
+        peaks = [s.mem_peak_bytes for s in group if s.mem_peak_bytes is not None]
+        rows.append({
+            "name": name,
+            "count": len(group),
+            "p50_s": statistics.median(walls),
+            "p95_s": walls[min(len(walls) - 1, int(round(0.95 * (len(walls) - 1))))],
+            "max_s": walls[-1],
+            "cpu_mean_s": statistics.fmean(s.cpu_s for s in group),
+            "mem_peak_max_bytes": max(peaks) if peaks else None,
+            "errors": sum(1 for s in group if s.error),
+        })
+    rows.sort(key=lambda row: -row["p50_s"])
+    return rows
+
+
+def _configure_from_env() -> None:
+    path = os.environ.get("BELLEPROS_TRACE_FILE")
+    if path or os.environ.get("BELLEPROS_TRACE", "") not in ("", "0"):
+        enable(
+            path=path or None,
+            fmt=os.environ.get("BELLEPROS_TRACE_FORMAT", "jsonl"),
+            memory=os.environ.get("BELLEPROS_TRACE_MEMORY", "") not in ("", "0"),
+        )
+
+
+_configure_from_env()